@@ -0,0 +1 @@
+"""Micro-benchmarks for the decoding hot paths. Run from the repository root, e.g. `python -m benchmarks.slab`."""
@@ -0,0 +1,64 @@
+"""Compare parse and build times of the compiled and interpreted construct layouts.
+
+Usage: python -m benchmarks.layouts
+"""
+import base64
+import timeit
+
+from pyserum._layouts.account_flags import ACCOUNT_FLAGS_LAYOUT
+from pyserum._layouts.compiled import compiled
+from pyserum._layouts.instructions import INSTRUCTIONS_LAYOUT
+from pyserum._layouts.market import MARKET_LAYOUT, MINT_LAYOUT
+from pyserum._layouts.open_orders import OPEN_ORDERS_LAYOUT
+from pyserum._layouts.queue import EVENT_LAYOUT, QUEUE_HEADER_LAYOUT, REQUEST_LAYOUT
+from pyserum._layouts.slab import SLAB_LAYOUT
+
+from tests.binary_file_path import ASK_ORDER_BIN_PATH, EVENT_QUEUE_BIN_PATH
+
+
+def _read(path: str) -> bytes:
+    with open(path, "r") as input_file:
+        return base64.decodebytes(input_file.read().encode("ascii"))
+
+
+def _time(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    event_queue = _read(EVENT_QUEUE_BIN_PATH)
+    cases = [
+        ("ACCOUNT_FLAGS_LAYOUT", ACCOUNT_FLAGS_LAYOUT, bytes(8), 2000),
+        ("MARKET_LAYOUT", MARKET_LAYOUT, bytes(MARKET_LAYOUT.sizeof()), 1000),
+        ("MINT_LAYOUT", MINT_LAYOUT, bytes(MINT_LAYOUT.sizeof()), 2000),
+        ("OPEN_ORDERS_LAYOUT", OPEN_ORDERS_LAYOUT, bytes(OPEN_ORDERS_LAYOUT.sizeof()), 100),
+        ("QUEUE_HEADER_LAYOUT", QUEUE_HEADER_LAYOUT, event_queue[: QUEUE_HEADER_LAYOUT.sizeof()], 2000),
+        ("EVENT_LAYOUT", EVENT_LAYOUT, event_queue[37 : 37 + EVENT_LAYOUT.sizeof()], 2000),  # noqa: E203
+        ("REQUEST_LAYOUT", REQUEST_LAYOUT, bytes(REQUEST_LAYOUT.sizeof()), 2000),
+        ("SLAB_LAYOUT", SLAB_LAYOUT, _read(ASK_ORDER_BIN_PATH)[13:], 20),
+        (
+            "INSTRUCTIONS_LAYOUT",
+            INSTRUCTIONS_LAYOUT,
+            bytes.fromhex("00010000000100000001000000000000000200000000000000020000000300000000000000"),
+            2000,
+        ),
+    ]
+    print("| layout | interpreted parse (us) | compiled parse (us) | interpreted build (us) | compiled build (us) |")
+    print("|---|---:|---:|---:|---:|")
+    for name, layout, data, number in cases:
+        fast = compiled(layout)
+        parsed = layout.parse(data)
+        print(
+            "| %s | %.1f | %.1f | %.1f | %.1f |"
+            % (
+                name,
+                _time(lambda: layout.parse(data), number),  # pylint: disable=cell-var-from-loop
+                _time(lambda: fast.parse(data), number),  # pylint: disable=cell-var-from-loop
+                _time(lambda: layout.build(parsed), number),  # pylint: disable=cell-var-from-loop
+                _time(lambda: fast.build(parsed), number),  # pylint: disable=cell-var-from-loop
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark event queue decoding: construct layout, precompiled structs and NumPy columns.
+
+The recorded event queue only holds one unconsumed event, its header is rewritten so every slot of the ring is read.
+
+Usage: python -m benchmarks.queue
+"""
+import base64
+import timeit
+from typing import List
+
+from solana.publickey import PublicKey
+
+from pyserum._layouts.queue import EVENT_LAYOUT, QUEUE_HEADER_LAYOUT
+from pyserum.market._internal.queue import decode_event_queue
+from pyserum.market.columnar import decode_event_queue_columns
+from pyserum.market.types import Event, EventFlags
+
+from tests.binary_file_path import EVENT_QUEUE_BIN_PATH
+
+
+def _decode_with_construct(buffer: bytes) -> List[Event]:
+    """The construct based decoder that `decode_event_queue` used before."""
+    header = QUEUE_HEADER_LAYOUT.parse(buffer)
+    layout_size = EVENT_LAYOUT.sizeof()
+    alloc_len = (len(buffer) - QUEUE_HEADER_LAYOUT.sizeof()) // layout_size
+    events = []
+    for i in range(header.count):
+        offset = QUEUE_HEADER_LAYOUT.sizeof() + ((header.head + i) % alloc_len) * layout_size
+        parsed = EVENT_LAYOUT.parse(buffer[offset : offset + layout_size])  # noqa: E203
+        flags = parsed.event_flags
+        events.append(
+            Event(
+                event_flags=EventFlags(fill=flags.fill, out=flags.out, bid=flags.bid, maker=flags.maker),
+                open_order_slot=parsed.open_order_slot,
+                fee_tier=parsed.fee_tier,
+                native_quantity_released=parsed.native_quantity_released,
+                native_quantity_paid=parsed.native_quantity_paid,
+                native_fee_or_rebate=parsed.native_fee_or_rebate,
+                order_id=int.from_bytes(parsed.order_id, "little"),
+                public_key=PublicKey(parsed.public_key),
+                client_order_id=parsed.client_order_id,
+            )
+        )
+    return events
+
+
+def _full_queue() -> bytes:
+    with open(EVENT_QUEUE_BIN_PATH, "r") as input_file:
+        data = base64.decodebytes(input_file.read().encode("ascii"))
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    header.count = (len(data) - QUEUE_HEADER_LAYOUT.sizeof()) // EVENT_LAYOUT.sizeof()
+    return QUEUE_HEADER_LAYOUT.build(header) + data[QUEUE_HEADER_LAYOUT.sizeof() :]  # noqa: E203
+
+
+def main() -> None:
+    data = _full_queue()
+    candidates = [
+        ("construct", lambda: _decode_with_construct(data)),
+        ("struct", lambda: decode_event_queue(data)),
+        ("numpy columns", lambda: decode_event_queue_columns(data)),
+        ("numpy + Event objects", lambda: list(decode_event_queue_columns(data))),
+    ]
+    print("%d events" % QUEUE_HEADER_LAYOUT.parse(data).count)
+    baseline = None
+    for name, func in candidates:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        baseline = baseline or elapsed
+        print("%-24s %9.3f ms  speedup: %6.1fx" % (name, elapsed * 1e3, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the struct based slab decoder against the construct layout.
+
+Usage: python -m benchmarks.slab [number_of_nodes]
+"""
+import base64
+import sys
+import timeit
+
+from pyserum._layouts.slab import SLAB_LAYOUT, NodeType
+from pyserum.market._internal.slab import Slab
+
+from tests.binary_file_path import ASK_ORDER_BIN_PATH
+
+
+def _synthetic_slab(num_nodes: int) -> bytes:
+    """Build a slab of `num_nodes` nodes, half leaves, a quarter inner nodes and a quarter free nodes."""
+    nodes = []
+    for i in range(num_nodes):
+        if i % 4 in (0, 1):
+            node = dict(
+                owner_slot=i % 128,
+                fee_tier=0,
+                key=((1000 + i) << 64 | i).to_bytes(16, "little"),
+                owner=bytes([i % 256]) * 32,
+                quantity=i + 1,
+                client_order_id=i,
+            )
+            nodes.append(dict(tag=NodeType.LEAF_NODE, node=node))
+        elif i % 4 == 2:
+            node = dict(prefix_len=i % 128, key=i.to_bytes(16, "little"), children=[i, i + 1])
+            nodes.append(dict(tag=NodeType.INNER_NODE, node=node))
+        else:
+            nodes.append(dict(tag=NodeType.FREE_NODE, node=dict(next=i)))
+    header = dict(bump_index=num_nodes, free_list_length=0, free_list_head=0, root=0, leaf_count=num_nodes // 2)
+    return SLAB_LAYOUT.build(dict(header=header, nodes=nodes))
+
+
+def _bench(name: str, data: bytes) -> None:
+    number = max(1, 20000 // max(1, len(data) // 72))
+    construct_time = timeit.timeit(lambda: Slab.from_container(SLAB_LAYOUT.parse(data)), number=number) / number
+    struct_time = timeit.timeit(lambda: Slab.from_bytes(data), number=number) / number
+    print(
+        "%-24s construct: %9.3f ms  struct: %9.3f ms  speedup: %5.1fx"
+        % (name, construct_time * 1e3, struct_time * 1e3, construct_time / struct_time)
+    )
+
+
+def _bench_top_of_book(data: bytes) -> None:
+    number = 200
+    eager_time = timeit.timeit(lambda: next(iter(Slab.from_bytes(data).items())), number=number) / number
+    lazy_time = timeit.timeit(lambda: next(iter(Slab.from_bytes(data, lazy=True).items())), number=number) / number
+    print(
+        "%-24s eager:     %9.3f ms  lazy:   %9.3f ms  speedup: %5.1fx"
+        % ("best level", eager_time * 1e3, lazy_time * 1e3, eager_time / lazy_time)
+    )
+
+
+def main() -> None:
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    with open(ASK_ORDER_BIN_PATH, "r") as input_file:
+        ask_data = base64.decodebytes(input_file.read().encode("ascii"))[13:]
+    _bench("ask_order_binary.bin", ask_data)
+    _bench("synthetic %d nodes" % num_nodes, _synthetic_slab(num_nodes))
+    _bench_top_of_book(ask_data)
+
+
+if __name__ == "__main__":
+    main()
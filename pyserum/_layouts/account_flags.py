@@ -13,3 +13,12 @@ ACCOUNT_FLAGS_LAYOUT = BitsSwapped(  # Swap to little endian
         Const(0, BitsInteger(57)),  # Padding
     )
 )
+
+# Bit masks of the flags above, for decoders that read the account flags as a little endian u64.
+INITIALIZED_FLAG = 1 << 0
+MARKET_FLAG = 1 << 1
+OPEN_ORDERS_FLAG = 1 << 2
+REQUEST_QUEUE_FLAG = 1 << 3
+EVENT_QUEUE_FLAG = 1 << 4
+BIDS_FLAG = 1 << 5
+ASKS_FLAG = 1 << 6
@@ -0,0 +1,39 @@
+"""Registry of compiled construct layouts.
+
+Construct can compile a layout into generated Python code that parses and builds faster than the interpreted layout.
+Each layout is compiled once, on first use. Layouts that construct cannot compile (e.g. a `Switch` on a lambda) fall
+back to the interpreted layout.
+"""
+import logging
+import threading
+from typing import Dict, Tuple
+
+from construct import Construct  # type: ignore
+
+_logger = logging.getLogger("pyserum._layouts.compiled")
+_lock = threading.Lock()
+# Keyed by id(layout), the layout is kept in the value so that the id cannot be reused.
+_registry: Dict[int, Tuple[Construct, Construct]] = {}
+
+
+def compiled(layout: Construct) -> Construct:
+    """Compiled version of `layout`, or `layout` itself if it cannot be compiled."""
+    entry = _registry.get(id(layout))
+    if entry is not None:
+        return entry[1]
+    with _lock:
+        entry = _registry.get(id(layout))
+        if entry is None:
+            try:
+                result = layout.compile()
+            except Exception as err:  # pylint: disable=broad-except
+                # Construct surfaces unsupported classes as a variety of errors from the generated code.
+                _logger.debug("Cannot compile layout %r, using the interpreted layout: %s", layout, err)
+                result = layout
+            entry = (layout, result)
+            _registry[id(layout)] = entry
+    return entry[1]
+
+
+def is_compiled(layout: Construct) -> bool:
+    return compiled(layout) is not layout
@@ -4,6 +4,7 @@ from enum import IntEnum
 from construct import Switch  # type: ignore
 from construct import Bytes, Const, Int8ul, Int16ul, Int32ul, Int64ul, Pass
 from construct import Struct as cStruct
+from construct import this
 
 from .slab import KEY
 
@@ -70,23 +71,24 @@ _CANCEL_ORDER_V2 = cStruct(
 
 _CANCEL_ORDER_BY_CLIENTID_V2 = cStruct("client_id" / Int64ul)
 
+# The switch uses a `this` expression and int keys, so that the layout can be compiled by construct.
 INSTRUCTIONS_LAYOUT = cStruct(
     "version" / Const(_VERSION, Int8ul),
     "instruction_type" / Int32ul,
     "args"
     / Switch(
-        lambda this: this.instruction_type,
+        this.instruction_type,
         {
-            InstructionType.INITIALIZE_MARKET: _INITIALIZE_MARKET,
-            InstructionType.NEW_ORDER: _NEW_ORDER,
-            InstructionType.MATCH_ORDER: _MATCH_ORDERS,
-            InstructionType.CONSUME_EVENTS: _CONSUME_EVENTS,
-            InstructionType.CANCEL_ORDER: _CANCEL_ORDER,
-            InstructionType.SETTLE_FUNDS: Pass,  # Empty list
-            InstructionType.CANCEL_ORDER_BY_CLIENT_ID: _CANCEL_ORDER_BY_CLIENTID,
-            InstructionType.NEW_ORDER_V3: _NEW_ORDER_V3,
-            InstructionType.CANCEL_ORDER_V2: _CANCEL_ORDER_V2,
-            InstructionType.CANCEL_ORDER_BY_CLIENT_ID_V2: _CANCEL_ORDER_BY_CLIENTID_V2,
+            int(InstructionType.INITIALIZE_MARKET): _INITIALIZE_MARKET,
+            int(InstructionType.NEW_ORDER): _NEW_ORDER,
+            int(InstructionType.MATCH_ORDER): _MATCH_ORDERS,
+            int(InstructionType.CONSUME_EVENTS): _CONSUME_EVENTS,
+            int(InstructionType.CANCEL_ORDER): _CANCEL_ORDER,
+            int(InstructionType.SETTLE_FUNDS): Pass,  # Empty list
+            int(InstructionType.CANCEL_ORDER_BY_CLIENT_ID): _CANCEL_ORDER_BY_CLIENTID,
+            int(InstructionType.NEW_ORDER_V3): _NEW_ORDER_V3,
+            int(InstructionType.CANCEL_ORDER_V2): _CANCEL_ORDER_V2,
+            int(InstructionType.CANCEL_ORDER_BY_CLIENT_ID_V2): _CANCEL_ORDER_BY_CLIENTID_V2,
         },
     ),
 )
@@ -1,3 +1,5 @@
+from struct import Struct
+
 from construct import Bytes, Int64ul, Padding  # type: ignore
 from construct import Struct as cStruct
 
@@ -19,3 +21,12 @@ OPEN_ORDERS_LAYOUT = cStruct(
     "referrer_rebate_accrued" / Int64ul,
     Padding(7),
 )
+
+# Precompiled `struct` equivalents of OPEN_ORDERS_LAYOUT. The account flags are read as one u64 and the u128 bit
+# fields as two little endian u64 (low, high).
+OPEN_ORDERS_SLOTS = 128
+OPEN_ORDERS_HEADER_STRUCT = Struct("<5xQ32s32sQQQQQQQQ")
+OPEN_ORDERS_ORDER_STRUCT = Struct("<QQ")
+OPEN_ORDERS_CLIENT_ID_STRUCT = Struct("<Q")
+OPEN_ORDERS_ORDERS_OFFSET = OPEN_ORDERS_HEADER_STRUCT.size
+OPEN_ORDERS_CLIENT_IDS_OFFSET = OPEN_ORDERS_ORDERS_OFFSET + OPEN_ORDERS_SLOTS * OPEN_ORDERS_ORDER_STRUCT.size
@@ -1,3 +1,5 @@
+from struct import Struct
+
 from construct import BitStruct  # type: ignore
 from construct import BitsInteger, BitsSwapped, Bytes, Const, Flag, Int8ul, Int32ul, Int64ul, Padding
 from construct import Struct as cStruct  # type: ignore
@@ -60,3 +62,19 @@ EVENT_LAYOUT = cStruct(
     "public_key" / Bytes(32),
     "client_order_id" / Int64ul,
 )
+
+# Precompiled `struct` equivalents of the record layouts above, the flags byte is decoded with the masks below.
+# The 128-bit order id is read as two little endian u64 (low, high).
+EVENT_STRUCT = Struct("<BBB5xQQQQQ32sQ")
+REQUEST_STRUCT = Struct("<BBB5xQQQQ32sQ")
+
+EVENT_FILL_FLAG = 1 << 0
+EVENT_OUT_FLAG = 1 << 1
+EVENT_BID_FLAG = 1 << 2
+EVENT_MAKER_FLAG = 1 << 3
+
+REQUEST_NEW_ORDER_FLAG = 1 << 0
+REQUEST_CANCEL_ORDER_FLAG = 1 << 1
+REQUEST_BID_FLAG = 1 << 2
+REQUEST_POST_ONLY_FLAG = 1 << 3
+REQUEST_IOC_FLAG = 1 << 4
@@ -0,0 +1,199 @@
+"""Cache of raw account data with per account kind time to live, aware of commitment and slot."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from solana.publickey import PublicKey
+from solana.rpc.commitment import Commitment
+from solana.transaction import Transaction
+
+# Seconds an account of each kind is served from the cache. Markets and mints do not change once created, while order
+# books and queues change every few hundred milliseconds on an active market.
+DEFAULT_TTLS: Dict[str, float] = {
+    "market": 3600.0,
+    "mint": 3600.0,
+    "order_book": 0.2,
+    "event_queue": 0.2,
+    "request_queue": 0.2,
+    "open_orders": 1.0,
+}
+
+
+class AccountCacheStats(NamedTuple):
+    hits: int
+    """"""
+    misses: int
+    """Reads that found no entry, an expired one or one older than the slot asked for."""
+    expired: int
+    """Misses due to an entry older than its time to live."""
+    invalidations: int
+    """Entries dropped by `invalidate` or `invalidate_transaction`."""
+    size: int
+    """Number of entries held."""
+
+
+class CachedAccount(NamedTuple):
+    data: bytes
+    """"""
+    slot: int
+    """Slot of the response the data comes from."""
+    fetched_at: float
+    """Time of the clock of the cache when the data was stored."""
+
+
+class _CacheCounters:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def hit(self) -> None:
+        self.hits += 1
+
+    def miss(self, expired: bool) -> None:
+        self.misses += 1
+        if expired:
+            self.expired += 1
+
+    def stats(self, size: int) -> AccountCacheStats:
+        return AccountCacheStats(
+            hits=self.hits, misses=self.misses, expired=self.expired, invalidations=self.invalidations, size=size
+        )
+
+
+class _InvalidationLog:
+    """Generation of the last invalidation of each address, so that reads that started before an invalidation of
+    their account do not store their data."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._cleared_at = -1
+        self._invalidated_at: Dict[str, int] = {}
+
+    def invalidate(self, addresses: Optional[Iterable[str]]) -> None:
+        """Record the invalidation of `addresses`, or of every address."""
+        if addresses is None:
+            self._invalidated_at.clear()
+            self._cleared_at = self.generation
+        else:
+            self._invalidated_at.update(dict.fromkeys(addresses, self.generation))
+        self.generation += 1
+
+    def is_stale(self, address: str, generation: int) -> bool:
+        """Whether `address` was invalidated since `generation`."""
+        return max(self._cleared_at, self._invalidated_at.get(address, -1)) >= generation
+
+
+class AccountCache:
+    """LRU cache of account data keyed by address and commitment, shared by threads and asyncio tasks.
+
+    An entry is served until the time to live of its kind runs out. A read can also ask for data at least as recent as
+    a slot, e.g. the slot of a previous read of another account. Sending a transaction with `Market` drops the entries
+    of the accounts it writes to, so that a read that follows does not see the state before the transaction.
+
+    :param ttls: Time to live in seconds per account kind, updating `DEFAULT_TTLS`.
+    :param default_ttl: Time to live of the accounts of other kinds, by default they are not cached.
+    :param max_size: Number of entries kept, the least recently used one is evicted first.
+    :param clock: Source of the time in seconds the time to live is measured with.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 0.0,
+        max_size: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        # The time to live of the accounts of other kinds is kept under None.
+        self._ttls: Dict[Optional[str], float] = {None: default_ttl}
+        self._ttls.update(DEFAULT_TTLS)
+        self._ttls.update(ttls or {})
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Commitment], Tuple[CachedAccount, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = _CacheCounters()
+        self._invalidations = _InvalidationLog()
+
+    def ttl(self, kind: Optional[str]) -> float:
+        """Time to live of the accounts of `kind`."""
+        return self._ttls.get(kind, self._ttls[None])
+
+    def get(
+        self, address: PublicKey, commitment: Commitment, min_slot: Optional[int] = None
+    ) -> Optional[CachedAccount]:
+        """The data of `address` read at `commitment`, None if missing, expired or older than `min_slot`."""
+        key = (str(address), commitment)
+        with self._lock:
+            item = self._entries.get(key)
+            expired = item is not None and self._clock() >= item[1]
+            if expired:
+                del self._entries[key]
+                item = None
+            if item is None or (min_slot is not None and item[0].slot < min_slot):
+                self._counters.miss(expired)
+                return None
+            self._entries.move_to_end(key)
+            self._counters.hit()
+            return item[0]
+
+    def generation(self) -> int:
+        """Take it before sending a read and pass it to `put`, so that the data is dropped if the account is
+        invalidated while the read is in flight."""
+        with self._lock:
+            return self._invalidations.generation
+
+    def put(  # pylint: disable=too-many-arguments
+        self,
+        address: PublicKey,
+        commitment: Commitment,
+        data: bytes,
+        slot: int,
+        kind: Optional[str],
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store the data of `address` read at `slot`, unless accounts of `kind` are not cached, the account was
+        invalidated since `generation` or a more recent read is held already."""
+        ttl = self.ttl(kind)
+        if ttl <= 0:
+            return
+        key = (str(address), commitment)
+        now = self._clock()
+        with self._lock:
+            if generation is not None and self._invalidations.is_stale(key[0], generation):
+                return
+            item = self._entries.get(key)
+            if item is not None and item[0].slot > slot and now < item[1]:
+                return
+            self._entries[key] = (CachedAccount(data, slot, now), now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, addresses: Optional[Iterable[PublicKey]] = None) -> None:
+        """Drop the entries of `addresses` at every commitment, or every entry."""
+        with self._lock:
+            if addresses is None:
+                self._invalidations.invalidate(None)
+                self._counters.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            dropped = {str(address) for address in addresses}
+            self._invalidations.invalidate(dropped)
+            for key in [key for key in self._entries if key[0] in dropped]:
+                del self._entries[key]
+                self._counters.invalidations += 1
+
+    def invalidate_transaction(self, transaction: Transaction) -> None:
+        """Drop the entries of the accounts `transaction` writes to."""
+        self.invalidate(
+            meta.pubkey for instruction in transaction.instructions for meta in instruction.keys if meta.is_writable
+        )
+
+    def stats(self) -> AccountCacheStats:
+        with self._lock:
+            return self._counters.stats(len(self._entries))
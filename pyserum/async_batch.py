@@ -0,0 +1,88 @@
+"""Awaitable twin of `pyserum.batch`: calls awaited in the same event loop tick share one JSON RPC batch."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from solana.rpc.types import RPCMethod, RPCResponse
+
+from .async_utils import AsyncClient
+from .batch import batch_request, route_batch_responses
+
+
+async def send_batch(conn: AsyncClient, batch: Sequence[Dict[str, Any]]) -> List[RPCResponse]:
+    """Send the requests built with `batch.batch_request` and return their responses in order.
+
+    The batch is one POST on the `httpx.AsyncClient` session of the provider. Providers without a session get one
+    concurrent request per call.
+    """
+    if not batch:
+        return []
+    provider = conn._provider  # pylint: disable=protected-access
+    if getattr(provider, "session", None) is None:
+        return list(
+            await asyncio.gather(*(provider.make_request(request["method"], *request["params"]) for request in batch))
+        )
+    return route_batch_responses(batch, await _post_batch(provider, batch))
+
+
+async def _post_batch(provider: Any, batch: Sequence[Dict[str, Any]]) -> Any:
+    """Post a batch to the endpoint of `provider` with its session, see `batch._post_batch`."""
+    headers = {"Content-Type": "application/json", **(getattr(provider, "extra_headers", None) or {})}
+    # Without a timeout of its own, the provider set one on its session.
+    timeout = getattr(provider, "timeout", None)
+    options = {} if timeout is None else {"timeout": timeout}
+    raw_response = await provider.session.post(
+        provider.endpoint_uri, headers=headers, content=json.dumps(list(batch)), **options
+    )
+    raw_response.raise_for_status()
+    return raw_response.json()
+
+
+class AsyncRequestBatcher:
+    """Send the calls awaited in the same event loop tick as one batch and route each response to its caller.
+
+    >>> rent, blockhash = await asyncio.gather(
+    ...     batcher.request(RPCMethod("getMinimumBalanceForRentExemption"), 165),
+    ...     batcher.request(RPCMethod("getRecentBlockhash")),
+    ... )
+
+    :param max_batch_size: Larger batches are split, most RPC nodes cap the size of a batch.
+    """
+
+    def __init__(self, conn: AsyncClient, max_batch_size: int = 100) -> None:
+        self._conn = conn
+        self._max_batch_size = max_batch_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # The event loop only keeps weak references to tasks, the batches being sent are kept here until they are done.
+        self._sending: Set[asyncio.Future] = set()
+
+    async def request(self, method: RPCMethod, *params: Any) -> RPCResponse:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((batch_request(method, *params), future))
+        if self._flush_handle is None:
+            # The flush runs once every task ready in this tick has queued its calls.
+            self._flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        pending, self._pending, self._flush_handle = self._pending, [], None
+        for start in range(0, len(pending), self._max_batch_size):
+            task = asyncio.ensure_future(self._send(pending[start : start + self._max_batch_size]))  # noqa: E203
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            responses = await send_batch(self._conn, [request for request, _ in pending])
+        except Exception as err:  # pylint: disable=broad-except
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for (_, future), response in zip(pending, responses):
+            if not future.done():
+                future.set_result(response)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from solana.publickey import PublicKey
+from solana.rpc.commitment import Max, Recent
+from solana.rpc.types import Commitment
+
+from ._layouts.open_orders import OPEN_ORDERS_LAYOUT
+from .account_cache import AccountCache
+from .async_utils import AsyncClient, load_bytes_data
+from .open_orders_account import OpenOrdersAccount
+from .single_flight import SingleFlight
+
+
+class AsyncOpenOrdersAccount(OpenOrdersAccount):
+    """`OpenOrdersAccount` with awaitable loaders for an asyncio RPC client."""
+
+    @staticmethod
+    async def find_for_market_and_owner(  # type: ignore # pylint: disable=invalid-overridden-method
+        conn: AsyncClient,
+        market: PublicKey,
+        owner: PublicKey,
+        program_id: PublicKey,
+        commitment: Commitment = Recent,
+    ) -> List[OpenOrdersAccount]:
+        resp = await conn.get_program_accounts(
+            program_id,
+            commitment=commitment,
+            encoding="base64",
+            memcmp_opts=OpenOrdersAccount._market_and_owner_filters(market, owner),
+            data_size=OPEN_ORDERS_LAYOUT.sizeof(),
+        )
+        return OpenOrdersAccount._process_get_program_accounts_resp(resp)
+
+    @staticmethod
+    async def load(  # type: ignore # pylint: disable=invalid-overridden-method
+        conn: AsyncClient,
+        address: str,
+        single_flight: Optional[SingleFlight] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> OpenOrdersAccount:
+        addr_pub_key = PublicKey(address)
+
+        async def load() -> OpenOrdersAccount:
+            bytes_data = await load_bytes_data(addr_pub_key, conn, cache=account_cache, kind="open_orders")
+            return OpenOrdersAccount.from_bytes(addr_pub_key, bytes_data)
+
+        if single_flight is None:
+            return await load()
+        return await single_flight.run_async((str(addr_pub_key), Max, "open_orders"), load)
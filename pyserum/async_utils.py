@@ -0,0 +1,88 @@
+"""Awaitable twins of `pyserum.utils` for an asyncio RPC client."""
+from typing import Any, List, Optional, Sequence, Tuple
+
+from solana.publickey import PublicKey
+from solana.rpc.commitment import Commitment, Max
+from solana.rpc.types import DataSliceOpts, RPCMethod
+
+try:
+    from solana.rpc.async_api import AsyncClient  # type: ignore
+except ImportError:  # solana-py only ships an asyncio client from 0.7 on.
+    # Any object with the awaitable methods of `solana.rpc.async_api.AsyncClient` that pyserum calls.
+    AsyncClient = Any  # type: ignore
+
+from spl.token.constants import WRAPPED_SOL_MINT  # type: ignore # TODO: Remove ignore.
+
+from ._layouts.compiled import compiled
+from ._layouts.market import MINT_LAYOUT
+from .account_cache import AccountCache
+from .single_flight import SingleFlight
+from .utils import (
+    MAX_MULTIPLE_ACCOUNTS,
+    cached_bytes_data,
+    multiple_accounts_params,
+    parse_and_cache_bytes_data,
+    parse_bytes_data,
+    parse_multiple_bytes_data,
+)
+
+
+async def load_bytes_data(  # pylint: disable=too-many-arguments
+    addr: PublicKey,
+    conn: AsyncClient,
+    commitment: Commitment = Max,
+    single_flight: Optional[SingleFlight] = None,
+    cache: Optional[AccountCache] = None,
+    kind: Optional[str] = None,
+    min_slot: Optional[int] = None,
+) -> bytes:
+    """Load the data of an account, see `utils.load_bytes_data`."""
+    cached = cached_bytes_data(addr, commitment, cache, min_slot)
+    if cached is not None:
+        return cached
+
+    async def load() -> bytes:
+        generation = None if cache is None else cache.generation()
+        res = await conn.get_account_info(addr, commitment)
+        return parse_and_cache_bytes_data(res, addr, commitment, cache, kind, generation)
+
+    if single_flight is None:
+        return await load()
+    return await single_flight.run_async((str(addr), commitment, min_slot), load)
+
+
+async def load_bytes_slice(
+    addr: PublicKey, conn: AsyncClient, offset: int, length: int, commitment: Commitment = Max
+) -> bytes:
+    """Load `length` bytes of the data of an account from `offset` on, see `utils.load_bytes_slice`."""
+    res = await conn.get_account_info(addr, commitment, data_slice=DataSliceOpts(offset=offset, length=length))
+    return parse_bytes_data(res)
+
+
+async def load_multiple_bytes_data(
+    addrs: Sequence[PublicKey], conn: AsyncClient, commitment: Commitment = Max
+) -> Tuple[int, List[Optional[bytes]]]:
+    """Load the data of several accounts with one getMultipleAccounts request, see `utils.load_multiple_bytes_data`."""
+    params = multiple_accounts_params(addrs, commitment)
+    res = await conn._provider.make_request(  # pylint: disable=protected-access
+        RPCMethod("getMultipleAccounts"), *params
+    )
+    return parse_multiple_bytes_data(res, len(addrs))
+
+
+async def load_many_bytes_data(addrs: Sequence[PublicKey], conn: AsyncClient) -> List[Optional[bytes]]:
+    """Like `load_multiple_bytes_data` for any number of accounts, the requests are sent one after the other."""
+    datas: List[Optional[bytes]] = []
+    for start in range(0, len(addrs), MAX_MULTIPLE_ACCOUNTS):
+        chunk = addrs[start : start + MAX_MULTIPLE_ACCOUNTS]  # noqa: E203
+        datas.extend((await load_multiple_bytes_data(chunk, conn))[1])
+    return datas
+
+
+async def get_mint_decimals(conn: AsyncClient, mint_pub_key: PublicKey) -> int:
+    """Get the mint decimals for a token mint"""
+    if mint_pub_key == WRAPPED_SOL_MINT:
+        return 9
+
+    bytes_data = await load_bytes_data(mint_pub_key, conn)
+    return compiled(MINT_LAYOUT).parse(bytes_data).decimals
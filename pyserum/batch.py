@@ -0,0 +1,124 @@
+"""JSON RPC batches: calls that cannot share a getMultipleAccounts request sent as one array body."""
+from __future__ import annotations
+
+import itertools
+import json
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Sequence, Type, cast
+
+import requests
+from solana.rpc.api import Client
+from solana.rpc.providers.http import HTTPProvider
+from solana.rpc.types import RPCMethod, RPCResponse
+
+from .utils import RPCError
+
+_REQUEST_IDS = itertools.count(1)
+
+# Timeout in seconds of a batch sent through a provider that does not set one.
+BATCH_TIMEOUT = 30.0
+
+
+def batch_request(method: RPCMethod, *params: Any) -> Dict[str, Any]:
+    """A JSON RPC request with an id unique in this process."""
+    return {"jsonrpc": "2.0", "id": next(_REQUEST_IDS), "method": method, "params": list(params)}
+
+
+def route_batch_responses(batch: Sequence[Dict[str, Any]], responses: Any) -> List[RPCResponse]:
+    """Responses of a batch in the order of its requests, the node may answer in any order."""
+    if not isinstance(responses, list):
+        raise RPCError("Invalid batch response.", responses)
+    by_id = {response.get("id"): cast(RPCResponse, response) for response in responses if isinstance(response, dict)}
+    if any(request["id"] not in by_id for request in batch):
+        raise RPCError("Missing responses in batch.", responses)
+    return [by_id[request["id"]] for request in batch]
+
+
+def _post_batch(provider: HTTPProvider, batch: Sequence[Dict[str, Any]]) -> Any:
+    """Post a batch to the endpoint of `provider`, with its session, headers and timeout when it has them."""
+    # The HTTP provider of older solana-py versions has no session, headers or timeout of its own.
+    session = getattr(provider, "session", None)
+    post = requests.post if session is None else session.post
+    headers = {"Content-Type": "application/json", **(getattr(provider, "extra_headers", None) or {})}
+    timeout = getattr(provider, "timeout", None) or BATCH_TIMEOUT
+    raw_response = post(provider.endpoint_uri, headers=headers, data=json.dumps(list(batch)), timeout=timeout)
+    raw_response.raise_for_status()
+    return raw_response.json()
+
+
+def send_batch(conn: Client, batch: Sequence[Dict[str, Any]]) -> List[RPCResponse]:
+    """Send the requests built with `batch_request` in one HTTP round trip and return their responses in order.
+
+    Providers with a `make_batch_request` method, like `PooledHTTPProvider`, send the batch themselves. Other providers
+    than the solana HTTP provider get one request per call.
+    """
+    if not batch:
+        return []
+    provider = conn._provider  # pylint: disable=protected-access
+    make_batch_request = getattr(provider, "make_batch_request", None)
+    if make_batch_request is not None:
+        responses = make_batch_request(batch)
+    elif isinstance(provider, HTTPProvider):
+        responses = _post_batch(provider, batch)
+    else:
+        return [provider.make_request(request["method"], *request["params"]) for request in batch]
+    return route_batch_responses(batch, responses)
+
+
+class BatchResult:
+    """Response of one call of a `RequestBatch`, available once the batch is executed."""
+
+    def __init__(self) -> None:
+        self._response: Optional[RPCResponse] = None
+
+    def set_result(self, response: RPCResponse) -> None:
+        self._response = response
+
+    def result(self) -> RPCResponse:
+        if self._response is None:
+            raise RPCError("The batch has not been executed.")
+        return self._response
+
+
+class RequestBatch:
+    """Collect calls and send them together with `execute`, or when leaving the `with` block.
+
+    >>> with RequestBatch(conn) as batch:
+    ...     rent = batch.add(RPCMethod("getMinimumBalanceForRentExemption"), 165)
+    ...     blockhash = batch.add(RPCMethod("getRecentBlockhash"))
+    >>> rent.result()["result"]
+    """
+
+    def __init__(self, conn: Client) -> None:
+        self._conn = conn
+        self._requests: List[Dict[str, Any]] = []
+        self._results: List[BatchResult] = []
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def add(self, method: RPCMethod, *params: Any) -> BatchResult:
+        """Queue a call, the parameters are the JSON RPC ones, e.g. as built by `solana.rpc.api.Client`."""
+        result = BatchResult()
+        self._requests.append(batch_request(method, *params))
+        self._results.append(result)
+        return result
+
+    def execute(self) -> None:
+        """Send the queued calls in one round trip, the batch can be reused afterwards."""
+        batch, results = self._requests, self._results
+        self._requests, self._results = [], []
+        for result, response in zip(results, send_batch(self._conn, batch)):
+            result.set_result(response)
+
+    def __enter__(self) -> RequestBatch:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.execute()
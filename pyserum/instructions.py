@@ -7,6 +7,7 @@ from solana.transaction import AccountMeta, TransactionInstruction
 from solana.utils.validate import validate_instruction_keys, validate_instruction_type
 from spl.token.constants import TOKEN_PROGRAM_ID  # type: ignore # TODO: Fix and remove ignore.
 
+from ._layouts.compiled import compiled
 from ._layouts.instructions import INSTRUCTIONS_LAYOUT, InstructionType
 from .enums import OrderType, SelfTradeBehavior, Side
 
@@ -281,7 +282,7 @@ def __parse_and_validate_instruction(instruction: TransactionInstruction, instru
         InstructionType.CANCEL_ORDER_BY_CLIENT_ID_V2: 6,
     }
     validate_instruction_keys(instruction, instruction_type_to_length_map[instruction_type])
-    data = INSTRUCTIONS_LAYOUT.parse(instruction.data)
+    data = compiled(INSTRUCTIONS_LAYOUT).parse(instruction.data)
     validate_instruction_type(data, instruction_type)
     return data
 
@@ -457,7 +458,7 @@ def initialize_market(params: InitializeMarketParams) -> TransactionInstruction:
             AccountMeta(pubkey=params.quote_mint, is_signer=False, is_writable=False),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.INITIALIZE_MARKET,
                 args=dict(
@@ -487,7 +488,7 @@ def new_order(params: NewOrderParams) -> TransactionInstruction:
             AccountMeta(pubkey=SYSVAR_RENT_PUBKEY, is_signer=False, is_writable=False),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.NEW_ORDER,
                 args=dict(
@@ -515,7 +516,7 @@ def match_orders(params: MatchOrdersParams) -> TransactionInstruction:
             AccountMeta(pubkey=params.quote_vault, is_signer=False, is_writable=True),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(instruction_type=InstructionType.MATCH_ORDER, args=dict(limit=params.limit))
         ),
     )
@@ -530,7 +531,7 @@ def consume_events(params: ConsumeEventsParams) -> TransactionInstruction:
     return TransactionInstruction(
         keys=keys,
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(instruction_type=InstructionType.CONSUME_EVENTS, args=dict(limit=params.limit))
         ),
     )
@@ -546,7 +547,7 @@ def cancel_order(params: CancelOrderParams) -> TransactionInstruction:
             AccountMeta(pubkey=params.owner, is_signer=True, is_writable=False),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.CANCEL_ORDER,
                 args=dict(
@@ -575,7 +576,7 @@ def settle_funds(params: SettleFundsParams) -> TransactionInstruction:
             AccountMeta(pubkey=TOKEN_PROGRAM_ID, is_signer=False, is_writable=False),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(dict(instruction_type=InstructionType.SETTLE_FUNDS, args=dict())),
+        data=compiled(INSTRUCTIONS_LAYOUT).build(dict(instruction_type=InstructionType.SETTLE_FUNDS, args=dict())),
     )
 
 
@@ -589,7 +590,7 @@ def cancel_order_by_client_id(params: CancelOrderByClientIDParams) -> Transactio
             AccountMeta(pubkey=params.owner, is_signer=True, is_writable=False),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.CANCEL_ORDER_BY_CLIENT_ID,
                 args=dict(
@@ -623,7 +624,7 @@ def new_order_v3(params: NewOrderV3Params) -> TransactionInstruction:
     return TransactionInstruction(
         keys=touched_keys,
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.NEW_ORDER_V3,
                 args=dict(
@@ -653,7 +654,7 @@ def cancel_order_v2(params: CancelOrderV2Params) -> TransactionInstruction:
             AccountMeta(pubkey=params.event_queue, is_signer=False, is_writable=True),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.CANCEL_ORDER_V2,
                 args=dict(
@@ -677,7 +678,7 @@ def cancel_order_by_client_id_v2(params: CancelOrderByClientIDV2Params) -> Trans
             AccountMeta(pubkey=params.event_queue, is_signer=False, is_writable=True),
         ],
         program_id=params.program_id,
-        data=INSTRUCTIONS_LAYOUT.build(
+        data=compiled(INSTRUCTIONS_LAYOUT).build(
             dict(
                 instruction_type=InstructionType.CANCEL_ORDER_BY_CLIENT_ID_V2,
                 args=dict(
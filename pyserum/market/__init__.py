@@ -1,3 +1,12 @@
+from ._internal.queue import EventQueueCursor, EventQueueUpdate  # noqa: F401
+from ._internal.slab import SlabHeader  # noqa: F401
+from .async_market import AsyncMarket  # noqa: F401
+from .decode_cache import DecodeCache, DecodeCacheStats  # noqa: F401
+from .levels import PriceLevelIndex  # noqa: F401
 from .market import Market  # noqa: F401
 from .orderbook import OrderBook  # noqa: F401
+from .poller import MarketBookUpdate, MarketPoller, MarketPollStats  # noqa: F401
+from .snapshot import MarketSnapshot  # noqa: F401
 from .state import MarketState as State  # noqa: F401
+from .stream import MarketStream, MarketStreamUpdate  # noqa: F401
+from .two_sided_book import TwoSidedBook  # noqa: F401
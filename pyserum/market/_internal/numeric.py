@@ -0,0 +1,13 @@
+"""NumPy helpers shared by `MarketState` and the columnar decoders, this module does not import anything else from
+pyserum.
+"""
+import numpy as np
+
+
+def lots_to_number(lots: np.ndarray, numerator: int, denominator: int) -> np.ndarray:
+    """Vectorized `float(lots * numerator) / denominator`.
+
+    The result matches the scalar conversion as long as `lots` and `numerator` are below 2**53: the product is
+    rounded once and the division is correctly rounded, like the int arithmetic of the scalar path.
+    """
+    return (np.asarray(lots, dtype=np.float64) * float(numerator)) / float(denominator)
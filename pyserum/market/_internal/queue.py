@@ -1,11 +1,26 @@
 import math
 from enum import IntEnum
-from typing import List, Optional, Sequence, Tuple, Union, cast
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union, cast
 
 from construct import Container  # type: ignore
 from solana.publickey import PublicKey
 
-from ..._layouts.queue import EVENT_LAYOUT, QUEUE_HEADER_LAYOUT, REQUEST_LAYOUT
+from ..._layouts.compiled import compiled
+from ..._layouts.queue import (
+    EVENT_BID_FLAG,
+    EVENT_FILL_FLAG,
+    EVENT_MAKER_FLAG,
+    EVENT_OUT_FLAG,
+    EVENT_STRUCT,
+    QUEUE_HEADER_LAYOUT,
+    REQUEST_BID_FLAG,
+    REQUEST_CANCEL_ORDER_FLAG,
+    REQUEST_IOC_FLAG,
+    REQUEST_NEW_ORDER_FLAG,
+    REQUEST_POST_ONLY_FLAG,
+    REQUEST_STRUCT,
+)
+from ...utils import as_memoryview
 from ..types import Event, EventFlags, Request, ReuqestFlags
 
 
@@ -14,69 +29,105 @@ class QueueType(IntEnum):
     REQUEST = 2
 
 
+# `next_seq_num` is read as a u32, sequence number arithmetic is done modulo 2**32.
+_SEQ_NUM_MODULUS = 1 << 32
+
+
 def __from_bytes(
     buffer: Sequence[int], queue_type: QueueType, history: Optional[int]
 ) -> Tuple[Container, List[Union[Event, Request]]]:
-    header = QUEUE_HEADER_LAYOUT.parse(buffer)
-    layout_size = EVENT_LAYOUT.sizeof() if queue_type == QueueType.EVENT else REQUEST_LAYOUT.sizeof()
-    alloc_len = math.floor((len(buffer) - QUEUE_HEADER_LAYOUT.sizeof()) / layout_size)
+    header = compiled(QUEUE_HEADER_LAYOUT).parse(buffer)
+    view = as_memoryview(buffer)
+    header_size = QUEUE_HEADER_LAYOUT.sizeof()
+    layout_size = EVENT_STRUCT.size if queue_type == QueueType.EVENT else REQUEST_STRUCT.size
+    alloc_len = math.floor((len(buffer) - header_size) / layout_size)
     nodes: List[Union[Event, Request]] = []
     if history:
         for i in range(min(history, alloc_len)):
             node_index = (header.head + header.count + alloc_len - 1 - i) % alloc_len
-            offset = QUEUE_HEADER_LAYOUT.sizeof() + node_index * layout_size
-            nodes.append(__parse_queue_item(buffer[offset : offset + layout_size], queue_type))  # noqa: E203
+            offset = header_size + node_index * layout_size
+            nodes.append(__parse_queue_item(view, offset, queue_type))
     else:
         for i in range(header.count):
             node_index = (header.head + i) % alloc_len
-            offset = QUEUE_HEADER_LAYOUT.sizeof() + node_index * layout_size
-            nodes.append(__parse_queue_item(buffer[offset : offset + layout_size], queue_type))  # noqa: E203
+            offset = header_size + node_index * layout_size
+            nodes.append(__parse_queue_item(view, offset, queue_type))
     return header, nodes
 
 
-def __parse_queue_item(buffer: Sequence[int], queue_type: QueueType) -> Union[Event, Request]:
-    if queue_type == QueueType.EVENT:  # pylint: disable=no-else-return
-        parsed_item = EVENT_LAYOUT.parse(buffer)
-        parsed_event_flags = parsed_item.event_flags
-        event_flags = EventFlags(
-            fill=parsed_event_flags.fill,
-            out=parsed_event_flags.out,
-            bid=parsed_event_flags.bid,
-            maker=parsed_event_flags.maker,
-        )
-
-        return Event(
-            event_flags=event_flags,
-            open_order_slot=parsed_item.open_order_slot,
-            fee_tier=parsed_item.fee_tier,
-            native_quantity_released=parsed_item.native_quantity_released,
-            native_quantity_paid=parsed_item.native_quantity_paid,
-            native_fee_or_rebate=parsed_item.native_fee_or_rebate,
-            order_id=int.from_bytes(parsed_item.order_id, "little"),
-            public_key=PublicKey(parsed_item.public_key),
-            client_order_id=parsed_item.client_order_id,
-        )
-    else:
-        parsed_item = REQUEST_LAYOUT.parse(buffer)
-        parsed_request_flags = parsed_item.request_flags
-        request_flags = ReuqestFlags(
-            new_order=parsed_request_flags.new_order,
-            cancel_order=parsed_request_flags.cancel_order,
-            bid=parsed_request_flags.bid,
-            post_only=parsed_request_flags.post_only,
-            ioc=parsed_request_flags.ioc,
-        )
-
-        return Request(
-            request_flags=request_flags,
-            open_order_slot=parsed_item.open_order_slot,
-            fee_tier=parsed_item.fee_tier,
-            max_base_size_or_cancel_id=parsed_item.max_base_size_or_cancel_id,
-            native_quote_quantity_locked=parsed_item.native_quote_quantity_locked,
-            order_id=int.from_bytes(parsed_item.order_id, "little"),
-            open_orders=PublicKey(parsed_item.open_orders),
-            client_order_id=parsed_item.client_order_id,
-        )
+def decode_event_flags(flags: int) -> EventFlags:
+    return EventFlags(
+        fill=bool(flags & EVENT_FILL_FLAG),
+        out=bool(flags & EVENT_OUT_FLAG),
+        bid=bool(flags & EVENT_BID_FLAG),
+        maker=bool(flags & EVENT_MAKER_FLAG),
+    )
+
+
+def decode_request_flags(flags: int) -> ReuqestFlags:
+    return ReuqestFlags(
+        new_order=bool(flags & REQUEST_NEW_ORDER_FLAG),
+        cancel_order=bool(flags & REQUEST_CANCEL_ORDER_FLAG),
+        bid=bool(flags & REQUEST_BID_FLAG),
+        post_only=bool(flags & REQUEST_POST_ONLY_FLAG),
+        ioc=bool(flags & REQUEST_IOC_FLAG),
+    )
+
+
+def __parse_queue_item(view: memoryview, offset: int, queue_type: QueueType) -> Union[Event, Request]:
+    if queue_type == QueueType.EVENT:
+        return __parse_event(view, offset)
+    return __parse_request(view, offset)
+
+
+def __parse_event(view: memoryview, offset: int) -> Event:
+    (
+        flags,
+        open_order_slot,
+        fee_tier,
+        native_quantity_released,
+        native_quantity_paid,
+        native_fee_or_rebate,
+        order_id_lo,
+        order_id_hi,
+        public_key,
+        client_order_id,
+    ) = EVENT_STRUCT.unpack_from(view, offset)
+    return Event(
+        event_flags=decode_event_flags(flags),
+        open_order_slot=open_order_slot,
+        fee_tier=fee_tier,
+        native_quantity_released=native_quantity_released,
+        native_quantity_paid=native_quantity_paid,
+        native_fee_or_rebate=native_fee_or_rebate,
+        order_id=(order_id_hi << 64) | order_id_lo,
+        public_key=PublicKey(public_key),
+        client_order_id=client_order_id,
+    )
+
+
+def __parse_request(view: memoryview, offset: int) -> Request:
+    (
+        flags,
+        open_order_slot,
+        fee_tier,
+        max_base_size_or_cancel_id,
+        native_quote_quantity_locked,
+        order_id_lo,
+        order_id_hi,
+        open_orders,
+        client_order_id,
+    ) = REQUEST_STRUCT.unpack_from(view, offset)
+    return Request(
+        request_flags=decode_request_flags(flags),
+        open_order_slot=open_order_slot,
+        fee_tier=fee_tier,
+        max_base_size_or_cancel_id=max_base_size_or_cancel_id,
+        native_quote_quantity_locked=native_quote_quantity_locked,
+        order_id=(order_id_hi << 64) | order_id_lo,
+        open_orders=PublicKey(open_orders),
+        client_order_id=client_order_id,
+    )
 
 
 def decode_request_queue(buffer: bytes, history: Optional[int] = None) -> List[Request]:
@@ -91,3 +142,107 @@ def decode_event_queue(buffer: bytes, history: Optional[int] = None) -> List[Eve
     if not header.account_flags.initialized or not header.account_flags.event_queue:
         raise Exception("Invalid events queue, either not initialized or not a event queue.")
     return cast(List[Event], nodes)
+
+
+# Size of the queue header, the ring of events or requests starts right after it.
+QUEUE_HEADER_SIZE = QUEUE_HEADER_LAYOUT.sizeof()
+
+
+def decode_event_queue_header(buffer: Sequence[int]) -> Container:
+    """Header of an event queue, from the account data or just its first `QUEUE_HEADER_SIZE` bytes."""
+    header = compiled(QUEUE_HEADER_LAYOUT).parse(buffer)
+    if not header.account_flags.initialized or not header.account_flags.event_queue:
+        raise Exception("Invalid events queue, either not initialized or not a event queue.")
+    return header
+
+
+def event_queue_alloc_len(account_size: int) -> int:
+    """Number of events the ring of an event queue account of `account_size` bytes holds."""
+    return (account_size - QUEUE_HEADER_SIZE) // EVENT_STRUCT.size
+
+
+def recent_event_slices(header: Container, alloc_len: int, limit: int) -> List[Tuple[int, int]]:
+    """Offset and length of the bytes holding the `limit` newest ring slots, the slots `decode_event_queue(buffer,
+    limit)` decodes.
+
+    There are two slices when the slots wrap around the end of the ring, the older one first.
+    """
+    count = min(limit, alloc_len)
+    if count <= 0:
+        return []
+    newest = (header.head + header.count - 1) % alloc_len
+    oldest = (newest - count + 1) % alloc_len
+    if oldest <= newest:
+        ranges = [(oldest, count)]
+    else:
+        ranges = [(oldest, alloc_len - oldest), (0, newest + 1)]
+    return [(QUEUE_HEADER_SIZE + index * EVENT_STRUCT.size, length * EVENT_STRUCT.size) for index, length in ranges]
+
+
+def decode_recent_events(
+    header: Container, later_header: Container, alloc_len: int, slices: Sequence[Sequence[int]]
+) -> Optional[List[Event]]:
+    """Decode the slices of `recent_event_slices`, newest event first.
+
+    `later_header` is read after the slices. Returns None when enough events were pushed in between that some of the
+    slots may have been overwritten while they were read, or when it is older than `header`.
+    """
+    view = memoryview(b"".join(bytes(data) for data in slices))
+    count = len(view) // EVENT_STRUCT.size
+    pushed = (later_header.next_seq_num - header.next_seq_num) % _SEQ_NUM_MODULUS
+    if pushed > alloc_len - count:
+        return None
+    return [__parse_event(view, index * EVENT_STRUCT.size) for index in reversed(range(count))]
+
+
+class EventQueueUpdate(NamedTuple):
+    events: List[Event]
+    """Events pushed since the previous poll, oldest first."""
+    seq_num: int
+    """Sequence number of the first event in `events`."""
+    missed: int
+    """Number of events that were overwritten in the ring before they could be read."""
+
+
+def _decode_events_since(buffer: Sequence[int], header: Container, seq_num: int, limit: int) -> List[Event]:
+    """Decode the `limit` events starting at sequence number `seq_num`."""
+    header_size = QUEUE_HEADER_LAYOUT.sizeof()
+    layout_size = EVENT_STRUCT.size
+    alloc_len = (len(buffer) - header_size) // layout_size
+    # The newest event, numbered next_seq_num - 1, sits right before head + count in the ring.
+    first_index = header.head + header.count - (header.next_seq_num - seq_num) % _SEQ_NUM_MODULUS
+    view = as_memoryview(buffer)
+    nodes: List[Event] = []
+    for i in range(limit):
+        offset = header_size + ((first_index + i) % alloc_len) * layout_size
+        nodes.append(__parse_event(view, offset))
+    return nodes
+
+
+class EventQueueCursor:  # pylint: disable=too-few-public-methods
+    """Reads the events pushed to an event queue since the previous poll.
+
+    The cursor remembers the `next_seq_num` of the queue header, so each poll only decodes the ring slots that were
+    written in between, including across the end of the ring. If more events were pushed than the ring holds, the
+    oldest ones are lost and reported in `EventQueueUpdate.missed`.
+
+    :param seq_num: Sequence number of the first event to return. By default the first poll returns the events
+        that are still in the queue, i.e. not consumed yet.
+    """
+
+    def __init__(self, seq_num: Optional[int] = None) -> None:
+        self.seq_num = seq_num
+
+    def poll(self, buffer: Sequence[int]) -> EventQueueUpdate:
+        header = decode_event_queue_header(buffer)
+        alloc_len = event_queue_alloc_len(len(buffer))
+        seq_num = (header.next_seq_num - header.count) % _SEQ_NUM_MODULUS if self.seq_num is None else self.seq_num
+        pending = (header.next_seq_num - seq_num) % _SEQ_NUM_MODULUS
+        if pending > _SEQ_NUM_MODULUS // 2:
+            # The queue is older than what we have already seen, e.g. served by a lagging node.
+            return EventQueueUpdate(events=[], seq_num=seq_num, missed=0)
+        missed = max(pending - alloc_len, 0)
+        seq_num = (seq_num + missed) % _SEQ_NUM_MODULUS
+        events = _decode_events_since(buffer, header, seq_num, pending - missed)
+        self.seq_num = header.next_seq_num
+        return EventQueueUpdate(events=events, seq_num=seq_num, missed=missed)
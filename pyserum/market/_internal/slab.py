@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List, NamedTuple, Optional, Sequence
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union, overload
 
 from construct import Container  # type: ignore
 from solana.publickey import PublicKey
 
-from ..._layouts.slab import SLAB_LAYOUT, NodeType
+from ..._layouts.slab import (
+    FREE_NODE_STRUCT,
+    INNER_NODE_STRUCT,
+    LEAF_NODE_STRUCT,
+    SLAB_HEADER_STRUCT,
+    SLAB_NODE_TAG_STRUCT,
+    NodeType,
+)
+from ...utils import as_memoryview
 
 
 class SlabHeader(NamedTuple):
@@ -45,10 +53,88 @@ class SlabInnerNode(SlabNode):
     children: List[int]
 
 
+# Nodes without payload are immutable, so a single instance is shared by every slot of that type.
+_UNINITIALIZED_NODE = SlabNode(is_initialized=False, next=NONE_NEXT)
+_LAST_FREE_NODE = SlabNode(is_initialized=True, next=NONE_NEXT)
+
+
+def _decode_node(view: memoryview, offset: int, node_type: int) -> SlabNode:
+    if node_type == NodeType.LEAF_NODE:
+        owner_slot, fee_tier, key_lo, key_hi, owner, quantity, client_order_id = LEAF_NODE_STRUCT.unpack_from(
+            view, offset + 4
+        )
+        return SlabLeafNode(
+            owner_slot=owner_slot,
+            fee_tier=fee_tier,
+            key=(key_hi << 64) | key_lo,
+            owner=PublicKey(owner),
+            quantity=quantity,
+            client_order_id=client_order_id,
+            is_initialized=True,
+            next=NONE_NEXT,
+        )
+    if node_type == NodeType.INNER_NODE:
+        prefix_len, key_lo, key_hi, left, right = INNER_NODE_STRUCT.unpack_from(view, offset + 4)
+        return SlabInnerNode(
+            prefix_len=prefix_len,
+            key=(key_hi << 64) | key_lo,
+            children=[left, right],
+            is_initialized=True,
+            next=NONE_NEXT,
+        )
+    if node_type == NodeType.UNINTIALIZED:
+        return _UNINITIALIZED_NODE
+    if node_type == NodeType.FREE_NODE:
+        return SlabNode(is_initialized=True, next=FREE_NODE_STRUCT.unpack_from(view, offset + 4)[0])
+    if node_type == NodeType.LAST_FREE_NODE:
+        return _LAST_FREE_NODE
+    raise RuntimeError("Unrecognized node type " + str(node_type))
+
+
+class _LazySlabNodes(Sequence[SlabNode]):
+    """Node list of a slab that decodes a node from the raw buffer the first time it is accessed."""
+
+    def __init__(self, view: memoryview, count: int) -> None:
+        self._view = view
+        self._nodes: List[Optional[SlabNode]] = [None] * count
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @overload
+    def __getitem__(self, index: int) -> SlabNode:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[SlabNode]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SlabNode, List[SlabNode]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._nodes)))]
+        node = self._nodes[index]
+        if node is None:
+            offset = SLAB_HEADER_STRUCT.size + index * SLAB_NODE_TAG_STRUCT.size
+            node = _decode_node(self._view, offset, SLAB_NODE_TAG_STRUCT.unpack_from(self._view, offset)[0])
+            self._nodes[index] = node
+        return node
+
+    def decoded_count(self) -> int:
+        return sum(1 for node in self._nodes if node is not None)
+
+
 class Slab:
-    def __init__(self, header: SlabHeader, nodes: List[SlabNode]):
+    def __init__(self, header: SlabHeader, nodes: Sequence[SlabNode], buffer: Optional[memoryview] = None):
         self._header: SlabHeader = header
-        self._nodes: List[SlabNode] = nodes
+        self._nodes: Sequence[SlabNode] = nodes
+        self._buffer: Optional[memoryview] = buffer
+
+    @staticmethod
+    def __decode_nodes(view: memoryview, count: int) -> List[SlabNode]:
+        node_size = SLAB_NODE_TAG_STRUCT.size
+        start = SLAB_HEADER_STRUCT.size
+        tags = SLAB_NODE_TAG_STRUCT.iter_unpack(view[start : start + count * node_size])  # noqa: E203
+        return [_decode_node(view, start + i * node_size, node_type) for i, (node_type,) in enumerate(tags)]
 
     @staticmethod
     def __build(nodes: Container) -> List[SlabNode]:
@@ -90,8 +176,41 @@ class Slab:
         return res
 
     @staticmethod
-    def from_bytes(buffer: Sequence[int]) -> Slab:
-        parsed_slab = SLAB_LAYOUT.parse(buffer)
+    def from_bytes(buffer: Sequence[int], lazy: bool = False) -> Slab:
+        """Decode a slab from the raw bytes of the slab region.
+
+        The header and nodes are read straight from a memoryview with precompiled structs instead of going through
+        the construct layout. With `lazy` the nodes are only decoded when `get` or `items` visits them, so reading
+        the top of the book costs O(depth * tree height) instead of O(slab size).
+        """
+        view = as_memoryview(buffer)
+        header = Slab.header_from_bytes(view)
+        bump_index = header.bump_index
+        if len(view) < SLAB_HEADER_STRUCT.size + bump_index * SLAB_NODE_TAG_STRUCT.size:
+            raise ValueError("Slab buffer is too short for %d nodes." % bump_index)
+        return Slab(
+            header,
+            _LazySlabNodes(view, bump_index) if lazy else Slab.__decode_nodes(view, bump_index),
+            view,
+        )
+
+    @staticmethod
+    def header_from_bytes(buffer: Sequence[int]) -> SlabHeader:
+        """Decode the header of a slab, only the first `SLAB_HEADER_STRUCT.size` bytes of the slab region are read."""
+        bump_index, free_list_length, free_list_head, root, leaf_count = SLAB_HEADER_STRUCT.unpack_from(
+            as_memoryview(buffer)
+        )
+        return SlabHeader(
+            bump_index=bump_index,
+            free_list_length=free_list_length,
+            free_list_root=free_list_head,
+            root=root,
+            leaf_count=leaf_count,
+        )
+
+    @staticmethod
+    def from_container(parsed_slab: Container) -> Slab:
+        """Build a slab from the output of `SLAB_LAYOUT.parse`."""
         header = parsed_slab.header
         nodes = parsed_slab.nodes
         return Slab(
@@ -105,6 +224,16 @@ class Slab:
             Slab.__build(nodes),
         )
 
+    def header(self) -> SlabHeader:
+        return self._header
+
+    def node_buffer(self) -> memoryview:
+        """Raw bytes of the `bump_index` nodes, only available for slabs decoded with `from_bytes`."""
+        if self._buffer is None:
+            raise ValueError("Slab was not decoded from raw bytes.")
+        start = SLAB_HEADER_STRUCT.size
+        return self._buffer[start : start + self._header.bump_index * SLAB_NODE_TAG_STRUCT.size]  # noqa: E203
+
     def get(self, search_key: int) -> Optional[SlabLeafNode]:
         if self._header.leaf_count == 0:
             return None
@@ -121,6 +250,24 @@ class Slab:
             else:
                 raise RuntimeError("Should not go here! Node type not recognize.")
 
+    def find_min(self) -> Optional[SlabLeafNode]:
+        """Leaf with the smallest key, found by descending the left children only."""
+        return self.__descend(0)
+
+    def find_max(self) -> Optional[SlabLeafNode]:
+        """Leaf with the largest key, found by descending the right children only."""
+        return self.__descend(1)
+
+    def __descend(self, child: int) -> Optional[SlabLeafNode]:
+        if self._header.leaf_count == 0:
+            return None
+        node: SlabNode = self._nodes[self._header.root]
+        while isinstance(node, SlabInnerNode):
+            node = self._nodes[node.children[child]]
+        if not isinstance(node, SlabLeafNode):
+            raise RuntimeError("Neither of leaf node or tree node!")
+        return node
+
     def __iter__(self) -> Iterable[SlabLeafNode]:
         return self.items(False)
 
@@ -0,0 +1,266 @@
+"""Market module to interact with Serum DEX from asyncio."""
+# This module mirrors the imports and methods of `pyserum.market.market` for an asyncio client.
+# pylint: disable=duplicate-code
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional, Sequence
+
+from solana.account import Account
+from solana.publickey import PublicKey
+from solana.rpc.types import RPCResponse, TxOpts
+from solana.transaction import Transaction
+
+import pyserum.instructions as instructions
+import pyserum.market.types as t
+
+from .. import async_utils
+from ..account_cache import AccountCache
+from ..async_batch import AsyncRequestBatcher
+from ..async_open_orders_account import AsyncOpenOrdersAccount
+from ..async_utils import AsyncClient
+from ..enums import OrderType, Side
+from ..mint_decimals import MintDecimalsRegistry
+from ..open_orders_account import OpenOrdersAccount
+from ..single_flight import SingleFlight
+from ._internal.queue import QUEUE_HEADER_SIZE, EventQueueCursor, EventQueueUpdate, decode_event_queue_header
+from ._internal.slab import SlabHeader
+from .core import AccountLoad, MarketCore, T
+from .decode_cache import DecodeCache
+from .orderbook import ORDER_BOOK_HEADER_SIZE, OrderBook
+from .snapshot import MarketSnapshot
+from .state import MarketState
+from .two_sided_book import TwoSidedBook
+
+
+# pylint: disable=too-many-public-methods
+class AsyncMarket(MarketCore):
+    """Represents a Serum Market, all the RPC calls are awaitable.
+
+    The connection is any asyncio client with the interface of `solana.rpc.async_api.AsyncClient`.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        conn: AsyncClient,
+        market_state: MarketState,
+        force_use_request_queue: bool = False,
+        decode_cache: Optional[DecodeCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> None:
+        super().__init__(market_state, force_use_request_queue, decode_cache, single_flight, account_cache)
+        self._conn = conn
+        self._batcher = AsyncRequestBatcher(conn)
+
+    @staticmethod
+    async def load(  # pylint: disable=too-many-arguments
+        conn: AsyncClient,
+        market_address: PublicKey,
+        program_id: PublicKey = instructions.DEFAULT_DEX_PROGRAM_ID,
+        force_use_request_queue: bool = False,
+        decode_cache: Optional[DecodeCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> AsyncMarket:
+        """Factory method to create an AsyncMarket.
+
+        :param conn: The asyncio connection that we use to load the data.
+        :param market_address: The market address that you want to connect to.
+        :param program_id: The program id of the given market, it will use the default value if not provided.
+        :param decode_cache: Where decoded order books and queues are kept, so that unchanged accounts are not decoded
+            again.
+        :param single_flight: Lets tasks loading the same account at the same time share one request and one decoded
+            value.
+        :param account_cache: Where account data is kept for the time to live of its kind, see `Market.load`.
+        """
+        market_state = await MarketState.async_load(conn, market_address, program_id, account_cache=account_cache)
+        return AsyncMarket(conn, market_state, force_use_request_queue, decode_cache, single_flight, account_cache)
+
+    @staticmethod
+    async def load_many(  # pylint: disable=too-many-arguments
+        conn: AsyncClient,
+        market_addresses: Sequence[PublicKey],
+        program_id: PublicKey = instructions.DEFAULT_DEX_PROGRAM_ID,
+        force_use_request_queue: bool = False,
+        registry: Optional[MintDecimalsRegistry] = None,
+        decode_cache: Optional[DecodeCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> List[AsyncMarket]:
+        """Factory method to create many markets with a few bulk requests, see `Market.load_many`."""
+        market_states = await MarketState.async_load_many(conn, market_addresses, program_id, registry)
+        return [
+            AsyncMarket(conn, market_state, force_use_request_queue, decode_cache, single_flight, account_cache)
+            for market_state in market_states
+        ]
+
+    async def _load_bytes_data(self, address: PublicKey, account_kind: str, min_slot: Optional[int] = None) -> bytes:
+        return await async_utils.load_bytes_data(
+            address, self._conn, **self._load_bytes_options(account_kind, min_slot)
+        )
+
+    async def _load_decoded(self, account: AccountLoad[T], min_slot: Optional[int] = None) -> T:
+        """Load and decode an account, see `Market._load_decoded`."""
+
+        async def load() -> T:
+            return account.parse(await self._load_bytes_data(account.address, account.account_kind, min_slot))
+
+        if self.single_flight is None:
+            return await load()
+        return await self.single_flight.run_async(self._single_flight_key(account, min_slot), load)
+
+    async def _send_transaction(self, transaction: Transaction, *signers: Account, opts: TxOpts) -> RPCResponse:
+        """Sign and send a transaction, then drop the cached data of the accounts it writes to."""
+        try:
+            return await self._conn.send_transaction(transaction, *signers, opts=opts)
+        finally:
+            self._invalidate_written_accounts(transaction)
+
+    async def _send_signed_transaction(self, transaction: Transaction, opts: TxOpts) -> RPCResponse:
+        """Send a signed transaction, then drop the cached data of the accounts it writes to."""
+        try:
+            return await self._conn.send_raw_transaction(transaction.serialize(), opts=opts)
+        finally:
+            self._invalidate_written_accounts(transaction)
+
+    async def find_open_orders_accounts_for_owner(self, owner_address: PublicKey) -> List[OpenOrdersAccount]:
+        return await AsyncOpenOrdersAccount.find_for_market_and_owner(
+            self._conn, self.state.public_key(), owner_address, self.state.program_id()
+        )
+
+    async def load_bids(self, lazy: bool = False, min_slot: Optional[int] = None) -> OrderBook:
+        """Load the bid order book.
+
+        :param lazy: Only decode the slab nodes that are visited, use it when reading the top of the book.
+        :param min_slot: With an account cache, do not use data read before this slot.
+        """
+        return await self._load_decoded(self._order_book_load(self.state.bids(), lazy), min_slot)
+
+    async def load_asks(self, lazy: bool = False, min_slot: Optional[int] = None) -> OrderBook:
+        """Load the ask order book.
+
+        :param lazy: Only decode the slab nodes that are visited, use it when reading the top of the book.
+        :param min_slot: With an account cache, do not use data read before this slot.
+        """
+        return await self._load_decoded(self._order_book_load(self.state.asks(), lazy), min_slot)
+
+    async def load_bids_header(self) -> SlabHeader:
+        """Load only the slab header of the bid order book, see `Market.load_bids_header`."""
+        return OrderBook.header_from_bytes(
+            await async_utils.load_bytes_slice(self.state.bids(), self._conn, 0, ORDER_BOOK_HEADER_SIZE)
+        )
+
+    async def load_asks_header(self) -> SlabHeader:
+        """Load only the slab header of the ask order book."""
+        return OrderBook.header_from_bytes(
+            await async_utils.load_bytes_slice(self.state.asks(), self._conn, 0, ORDER_BOOK_HEADER_SIZE)
+        )
+
+    async def load_two_sided_book(self) -> TwoSidedBook:
+        """Load both order books with a single getMultipleAccounts request, see `Market.load_two_sided_book`."""
+        slot, datas = await async_utils.load_multiple_bytes_data([self.state.bids(), self.state.asks()], self._conn)
+        return self._parse_two_sided_book(slot, datas)
+
+    async def load_orders_for_owner(self, owner_address: PublicKey) -> List[t.Order]:
+        """Load orders for owner."""
+        bids = await self.load_bids()
+        asks = await self.load_asks()
+        open_orders_accounts = await self.find_open_orders_accounts_for_owner(owner_address)
+        return self._filter_orders_for_owner(bids, asks, open_orders_accounts)
+
+    async def load_snapshot(self, open_orders_addresses: Sequence[PublicKey] = ()) -> MarketSnapshot:
+        """Load the market account, both order books and both queues with a single getMultipleAccounts request.
+
+        :param open_orders_addresses: Open orders accounts to read along with the market accounts.
+        """
+        slot, datas = await async_utils.load_multiple_bytes_data(
+            self._snapshot_addresses(open_orders_addresses), self._conn
+        )
+        return self._parse_snapshot(slot, datas, open_orders_addresses)
+
+    async def load_event_queue(self, min_slot: Optional[int] = None) -> List[t.Event]:
+        """Load the event queue, see `Market.load_event_queue`."""
+        return await self._load_decoded(self._event_queue_load(), min_slot)
+
+    async def load_new_events(self, cursor: EventQueueCursor) -> EventQueueUpdate:
+        """Load the events pushed to the event queue since the previous call with the same cursor."""
+        return cursor.poll(await self._load_bytes_data(self.state.event_queue(), "event_queue"))
+
+    async def load_request_queue(self, min_slot: Optional[int] = None) -> List[t.Request]:
+        return await self._load_decoded(self._request_queue_load(), min_slot)
+
+    async def load_fills(self, limit=100, min_slot: Optional[int] = None) -> List[t.FilledOrder]:
+        return await self._load_decoded(self._fills_load(limit), min_slot)
+
+    async def load_recent_events(self, limit: int = 100) -> List[t.Event]:
+        """Load the `limit` newest events of the event queue, newest first, see `Market.load_recent_events`."""
+        event_queue = self.state.event_queue()
+        for _ in range(self._recent_events_attempts(limit)):
+            header = decode_event_queue_header(
+                await async_utils.load_bytes_slice(event_queue, self._conn, 0, QUEUE_HEADER_SIZE)
+            )
+            responses = await asyncio.gather(
+                *(
+                    self._batcher.request(method, *params)
+                    for method, params in self._recent_event_requests(header, limit)
+                )
+            )
+            events = self._parse_recent_events(header, responses)
+            if events is not None:
+                return events
+        return self._parse_whole_event_queue(await self._load_bytes_data(event_queue, "event_queue"), limit)
+
+    async def load_recent_fills(self, limit: int = 100) -> List[t.FilledOrder]:
+        """Like `load_fills`, reading only the slots of the `limit` newest events, see `load_recent_events`."""
+        return self._fills_from_events(await self.load_recent_events(limit))
+
+    async def place_order(  # pylint: disable=too-many-arguments
+        self,
+        payer: PublicKey,
+        owner: Account,
+        order_type: OrderType,
+        side: Side,
+        limit_price: float,
+        max_quantity: float,
+        client_id: int = 0,
+        opts: TxOpts = TxOpts(),
+    ) -> RPCResponse:
+        responses = await asyncio.gather(
+            *(
+                self._batcher.request(method, *params)
+                for method, params in self._place_order_requests(owner.public_key())
+            )
+        )
+        transaction = self._build_place_order_tx(
+            payer, owner, order_type, side, limit_price, max_quantity, client_id, responses
+        )
+        return await self._send_signed_transaction(transaction, opts)
+
+    async def cancel_order_by_client_id(
+        self, owner: Account, open_orders_account: PublicKey, client_id: int, opts: TxOpts = TxOpts()
+    ) -> RPCResponse:
+        txs = Transaction().add(self.make_cancel_order_by_client_id_instruction(owner, open_orders_account, client_id))
+        return await self._send_transaction(txs, owner, opts=opts)
+
+    async def cancel_order(self, owner: Account, order: t.Order, opts: TxOpts = TxOpts()) -> RPCResponse:
+        txn = Transaction().add(self.make_cancel_order_instruction(owner.public_key(), order))
+        return await self._send_transaction(txn, owner, opts=opts)
+
+    async def match_orders(self, fee_payer: Account, limit: int, opts: TxOpts = TxOpts()) -> RPCResponse:
+        txn = Transaction().add(self.make_match_orders_instruction(limit))
+        return await self._send_transaction(txn, fee_payer, opts=opts)
+
+    async def settle_funds(  # pylint: disable=too-many-arguments
+        self,
+        owner: Account,
+        open_orders: OpenOrdersAccount,
+        base_wallet: PublicKey,
+        quote_wallet: PublicKey,
+        opts: TxOpts = TxOpts(),
+    ) -> RPCResponse:
+        responses = await asyncio.gather(
+            *(self._batcher.request(method, *params) for method, params in self._settle_funds_requests())
+        )
+        transaction = self._build_signed_settle_funds_tx(owner, open_orders, base_wallet, quote_wallet, responses)
+        return await self._send_signed_transaction(transaction, opts)
@@ -0,0 +1,525 @@
+"""Columnar (NumPy) representation of the order book and the event and request queues.
+
+NumPy is an optional dependency, install it with `pip install pyserum[numpy]`.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from fractions import Fraction
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from construct import Container  # type: ignore
+from solana.publickey import PublicKey
+
+import pyserum.market.types as t
+
+from .._layouts.compiled import compiled
+from .._layouts.queue import (
+    EVENT_BID_FLAG,
+    EVENT_FILL_FLAG,
+    EVENT_MAKER_FLAG,
+    EVENT_OUT_FLAG,
+    EVENT_STRUCT,
+    QUEUE_HEADER_LAYOUT,
+    REQUEST_BID_FLAG,
+    REQUEST_CANCEL_ORDER_FLAG,
+    REQUEST_IOC_FLAG,
+    REQUEST_NEW_ORDER_FLAG,
+    REQUEST_POST_ONLY_FLAG,
+    REQUEST_STRUCT,
+)
+from .._layouts.slab import SLAB_HEADER_STRUCT, SLAB_NODE_TAG_STRUCT, NodeType
+from ..enums import Side
+from ._internal.numeric import lots_to_number
+from ._internal.queue import decode_event_flags, decode_request_flags
+from ._internal.slab import Slab
+from .state import MarketState
+
+# Every slab node is 72 bytes, this maps the fields of a leaf node. Other node types are filtered out with the tag.
+SLAB_LEAF_DTYPE = np.dtype(
+    {
+        "names": ["tag", "owner_slot", "fee_tier", "key_lo", "key_hi", "owner", "quantity", "client_order_id"],
+        "formats": ["<u4", "u1", "u1", "<u8", "<u8", ("u1", 32), "<u8", "<u8"],
+        "offsets": [0, 4, 5, 8, 16, 24, 56, 64],
+        "itemsize": SLAB_NODE_TAG_STRUCT.size,
+    }
+)
+
+EVENT_DTYPE = np.dtype(
+    {
+        "names": [
+            "flags",
+            "open_order_slot",
+            "fee_tier",
+            "native_quantity_released",
+            "native_quantity_paid",
+            "native_fee_or_rebate",
+            "order_id_lo",
+            "order_id_hi",
+            "public_key",
+            "client_order_id",
+        ],
+        "formats": ["u1", "u1", "u1", "<u8", "<u8", "<u8", "<u8", "<u8", ("u1", 32), "<u8"],
+        "offsets": [0, 1, 2, 8, 16, 24, 32, 40, 48, 80],
+        "itemsize": EVENT_STRUCT.size,
+    }
+)
+
+REQUEST_DTYPE = np.dtype(
+    {
+        "names": [
+            "flags",
+            "open_order_slot",
+            "fee_tier",
+            "max_base_size_or_cancel_id",
+            "native_quote_quantity_locked",
+            "order_id_lo",
+            "order_id_hi",
+            "open_orders",
+            "client_order_id",
+        ],
+        "formats": ["u1", "u1", "u1", "<u8", "<u8", "<u8", "<u8", ("u1", 32), "<u8"],
+        "offsets": [0, 1, 2, 8, 16, 24, 32, 40, 72],
+        "itemsize": REQUEST_STRUCT.size,
+    }
+)
+
+_U64_MAX = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Integers up to this bound are exactly representable as float64.
+_EXACT_FLOAT_BOUND = float(2 ** 53)
+
+
+def decode_leaf_nodes(node_buffer: Union[bytes, memoryview], is_bids: bool) -> np.ndarray:
+    """Map the node region of a slab and return its leaf nodes sorted by the 128-bit key.
+
+    Asks are sorted in ascending and bids in descending key order, which is the price-time priority of the book.
+    """
+    nodes = np.frombuffer(node_buffer, dtype=SLAB_LEAF_DTYPE)
+    leaves = nodes[nodes["tag"] == NodeType.LEAF_NODE]
+    order = np.lexsort((leaves["key_lo"], leaves["key_hi"]))
+    if is_bids:
+        order = order[::-1]
+    return leaves[order]
+
+
+class ColumnarOrderBook:
+    """Leaf orders of one side of the book as NumPy columns in price-time priority."""
+
+    def __init__(self, market_state: MarketState, is_bids: bool, leaves: np.ndarray) -> None:
+        self._market_state = market_state
+        self._is_bids = is_bids
+        self._leaves = leaves
+
+    @staticmethod
+    def from_bytes(market_state: MarketState, buffer: bytes) -> ColumnarOrderBook:
+        """Decode the bids or asks account data without building a node object per order."""
+        account_flags = t.AccountFlags.from_bytes(buffer[5:13])
+        if not account_flags.initialized or not account_flags.bids ^ account_flags.asks:
+            raise Exception("Invalid order book, either not initialized or neither of bids or asks")
+        slab_view = memoryview(buffer)[13:]
+        start = SLAB_HEADER_STRUCT.size
+        end = start + SLAB_HEADER_STRUCT.unpack_from(slab_view)[0] * SLAB_NODE_TAG_STRUCT.size
+        leaves = decode_leaf_nodes(slab_view[start:end], account_flags.bids)
+        return ColumnarOrderBook(market_state, account_flags.bids, leaves)
+
+    @staticmethod
+    def from_slab(market_state: MarketState, is_bids: bool, slab: Slab) -> ColumnarOrderBook:
+        return ColumnarOrderBook(market_state, is_bids, decode_leaf_nodes(slab.node_buffer(), is_bids))
+
+    def __len__(self) -> int:
+        return len(self._leaves)
+
+    @property
+    def price_lots(self) -> np.ndarray:
+        """The price is the upper 64 bits of the order key."""
+        return self._leaves["key_hi"]
+
+    @property
+    def quantity(self) -> np.ndarray:
+        return self._leaves["quantity"]
+
+    @property
+    def seq_no(self) -> np.ndarray:
+        """The lower 64 bits of the key, which hold the bitwise not of the sequence number for bids."""
+        key_lo = self._leaves["key_lo"]
+        return key_lo ^ _U64_MAX if self._is_bids else key_lo
+
+    @property
+    def owner_slot(self) -> np.ndarray:
+        return self._leaves["owner_slot"]
+
+    @property
+    def fee_tier(self) -> np.ndarray:
+        return self._leaves["fee_tier"]
+
+    @property
+    def client_order_id(self) -> np.ndarray:
+        return self._leaves["client_order_id"]
+
+    @property
+    def owner(self) -> np.ndarray:
+        """Raw 32 bytes of the open orders account of each order, as a (n, 32) uint8 array."""
+        return self._leaves["owner"]
+
+    def order_ids(self) -> List[int]:
+        """128-bit order ids, which do not fit in a NumPy integer column."""
+        return [(int(hi) << 64) | int(lo) for hi, lo in zip(self._leaves["key_hi"], self._leaves["key_lo"])]
+
+    def l2_arrays(self, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Aggregate the orders into at most `depth` price levels, returns (price_lots, size_lots)."""
+        prices = self.price_lots
+        if len(prices) == 0 or depth <= 0:
+            return prices[:0], self.quantity[:0]
+        level_starts = np.flatnonzero(np.concatenate(([True], prices[1:] != prices[:-1])))
+        end = level_starts[depth] if len(level_starts) > depth else len(prices)
+        level_starts = level_starts[:depth]
+        return prices[level_starts], np.add.reduceat(self.quantity[:end], level_starts)
+
+    def get_l2(self, depth: int) -> List[t.OrderInfo]:
+        """Get the Level 2 market information, same as `OrderBook.get_l2`."""
+        price_lots, size_lots = self.l2_arrays(depth)
+        prices = self._market_state.price_lots_to_number_array(price_lots)
+        sizes = self._market_state.base_size_lots_to_number_array(size_lots)
+        return [
+            t.OrderInfo(price=float(price), size=float(size), price_lots=int(p_lots), size_lots=int(s_lots))
+            for price, size, p_lots, s_lots in zip(prices, sizes, price_lots, size_lots)
+        ]
+
+
+def _gather_queue(buffer: bytes, dtype: np.dtype, history: Optional[int]) -> Tuple[Container, np.ndarray]:
+    """Map the ring of a queue as a record array and gather the slots in the same order as `decode_event_queue`."""
+    header = compiled(QUEUE_HEADER_LAYOUT).parse(buffer)
+    start = QUEUE_HEADER_LAYOUT.sizeof()
+    alloc_len = (len(buffer) - start) // dtype.itemsize
+    ring = np.frombuffer(buffer, dtype=dtype, count=alloc_len, offset=start)
+    if history:
+        slots = (header.head + header.count + alloc_len - 1 - np.arange(min(history, alloc_len))) % alloc_len
+    else:
+        slots = (header.head + np.arange(header.count)) % alloc_len
+    return header, ring[slots]
+
+
+class _QueueColumns(ABC):
+    """Records of a queue as NumPy columns, `Event`/`Request` objects are only built when indexed or iterated."""
+
+    def __init__(self, records: np.ndarray) -> None:
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator:
+        return (self[i] for i in range(len(self._records)))
+
+    def __getitem__(self, index):
+        """An `Event`/`Request` for an integer index, a new set of columns for a slice or boolean mask."""
+        if isinstance(index, (int, np.integer)):
+            return self._materialize(self._records[index])
+        return type(self)(self._records[index])
+
+    @abstractmethod
+    def _materialize(self, record: np.void):
+        """Build the `Event`/`Request` of one record."""
+
+    def _flag(self, mask: int) -> np.ndarray:
+        return (self._records["flags"] & mask) != 0
+
+    @property
+    def open_order_slot(self) -> np.ndarray:
+        return self._records["open_order_slot"]
+
+    @property
+    def fee_tier(self) -> np.ndarray:
+        return self._records["fee_tier"]
+
+    @property
+    def client_order_id(self) -> np.ndarray:
+        return self._records["client_order_id"]
+
+    def order_ids(self) -> List[int]:
+        """128-bit order ids, which do not fit in a NumPy integer column."""
+        return [(int(hi) << 64) | int(lo) for hi, lo in zip(self._records["order_id_hi"], self._records["order_id_lo"])]
+
+
+class EventQueueColumns(_QueueColumns):
+    @staticmethod
+    def from_events(events: Sequence[t.Event]) -> EventQueueColumns:
+        records = np.zeros(len(events), dtype=EVENT_DTYPE)
+        records["flags"] = [
+            (EVENT_FILL_FLAG if e.event_flags.fill else 0)
+            | (EVENT_OUT_FLAG if e.event_flags.out else 0)
+            | (EVENT_BID_FLAG if e.event_flags.bid else 0)
+            | (EVENT_MAKER_FLAG if e.event_flags.maker else 0)
+            for e in events
+        ]
+        for name in (
+            "open_order_slot",
+            "fee_tier",
+            "native_quantity_released",
+            "native_quantity_paid",
+            "native_fee_or_rebate",
+            "client_order_id",
+        ):
+            records[name] = [getattr(e, name) for e in events]
+        records["order_id_lo"] = [e.order_id & 0xFFFFFFFFFFFFFFFF for e in events]
+        records["order_id_hi"] = [e.order_id >> 64 for e in events]
+        if events:
+            records["public_key"] = [list(bytes(e.public_key)) for e in events]
+        return EventQueueColumns(records)
+
+    @property
+    def fill(self) -> np.ndarray:
+        return self._flag(EVENT_FILL_FLAG)
+
+    @property
+    def out(self) -> np.ndarray:
+        return self._flag(EVENT_OUT_FLAG)
+
+    @property
+    def bid(self) -> np.ndarray:
+        return self._flag(EVENT_BID_FLAG)
+
+    @property
+    def maker(self) -> np.ndarray:
+        return self._flag(EVENT_MAKER_FLAG)
+
+    @property
+    def native_quantity_released(self) -> np.ndarray:
+        return self._records["native_quantity_released"]
+
+    @property
+    def native_quantity_paid(self) -> np.ndarray:
+        return self._records["native_quantity_paid"]
+
+    @property
+    def native_fee_or_rebate(self) -> np.ndarray:
+        return self._records["native_fee_or_rebate"]
+
+    @property
+    def public_key(self) -> np.ndarray:
+        """Raw 32 bytes of the open orders account of each event, as a (n, 32) uint8 array."""
+        return self._records["public_key"]
+
+    def _materialize(self, record: np.void) -> t.Event:
+        return t.Event(
+            event_flags=decode_event_flags(int(record["flags"])),
+            open_order_slot=int(record["open_order_slot"]),
+            fee_tier=int(record["fee_tier"]),
+            native_quantity_released=int(record["native_quantity_released"]),
+            native_quantity_paid=int(record["native_quantity_paid"]),
+            native_fee_or_rebate=int(record["native_fee_or_rebate"]),
+            order_id=(int(record["order_id_hi"]) << 64) | int(record["order_id_lo"]),
+            public_key=PublicKey(record["public_key"].tobytes()),
+            client_order_id=int(record["client_order_id"]),
+        )
+
+
+class RequestQueueColumns(_QueueColumns):
+    @property
+    def new_order(self) -> np.ndarray:
+        return self._flag(REQUEST_NEW_ORDER_FLAG)
+
+    @property
+    def cancel_order(self) -> np.ndarray:
+        return self._flag(REQUEST_CANCEL_ORDER_FLAG)
+
+    @property
+    def bid(self) -> np.ndarray:
+        return self._flag(REQUEST_BID_FLAG)
+
+    @property
+    def post_only(self) -> np.ndarray:
+        return self._flag(REQUEST_POST_ONLY_FLAG)
+
+    @property
+    def ioc(self) -> np.ndarray:
+        return self._flag(REQUEST_IOC_FLAG)
+
+    @property
+    def max_base_size_or_cancel_id(self) -> np.ndarray:
+        return self._records["max_base_size_or_cancel_id"]
+
+    @property
+    def native_quote_quantity_locked(self) -> np.ndarray:
+        return self._records["native_quote_quantity_locked"]
+
+    @property
+    def open_orders(self) -> np.ndarray:
+        """Raw 32 bytes of the open orders account of each request, as a (n, 32) uint8 array."""
+        return self._records["open_orders"]
+
+    def _materialize(self, record: np.void) -> t.Request:
+        return t.Request(
+            request_flags=decode_request_flags(int(record["flags"])),
+            open_order_slot=int(record["open_order_slot"]),
+            fee_tier=int(record["fee_tier"]),
+            max_base_size_or_cancel_id=int(record["max_base_size_or_cancel_id"]),
+            native_quote_quantity_locked=int(record["native_quote_quantity_locked"]),
+            order_id=(int(record["order_id_hi"]) << 64) | int(record["order_id_lo"]),
+            open_orders=PublicKey(record["open_orders"].tobytes()),
+            client_order_id=int(record["client_order_id"]),
+        )
+
+
+def decode_event_queue_columns(buffer: bytes, history: Optional[int] = None) -> EventQueueColumns:
+    """Vectorized `decode_event_queue`, the events come back in the same order."""
+    header, records = _gather_queue(buffer, EVENT_DTYPE, history)
+    if not header.account_flags.initialized or not header.account_flags.event_queue:
+        raise Exception("Invalid events queue, either not initialized or not a event queue.")
+    return EventQueueColumns(records)
+
+
+def decode_request_queue_columns(buffer: bytes, history: Optional[int] = None) -> RequestQueueColumns:
+    """Vectorized `decode_request_queue`, the requests come back in the same order."""
+    header, records = _gather_queue(buffer, REQUEST_DTYPE, history)
+    if not header.account_flags.initialized or not header.account_flags.request_queue:
+        raise Exception("Invalid requests queue, either not initialized or not a request queue.")
+    return RequestQueueColumns(records)
+
+
+class FilledOrderColumns(NamedTuple):
+    order_id: List[int]
+    """"""
+    side: np.ndarray
+    """"""
+    price_before_fees: np.ndarray
+    """"""
+    price: np.ndarray
+    """"""
+    size: np.ndarray
+    """"""
+    fee_cost: np.ndarray
+    """"""
+
+    def __len__(self) -> int:  # type: ignore
+        return len(self.order_id)
+
+    def to_filled_orders(self) -> List[t.FilledOrder]:
+        return [
+            t.FilledOrder(
+                order_id=order_id, side=Side(int(side)), price=float(price), size=float(size), fee_cost=int(fee)
+            )
+            for order_id, side, price, size, fee in zip(self.order_id, self.side, self.price, self.size, self.fee_cost)
+        ]
+
+
+def parse_fill_events(
+    market_state: MarketState, events: Union[EventQueueColumns, Sequence[t.Event]]
+) -> FilledOrderColumns:
+    """Vectorized `Market.parse_fill_event` over many fill events.
+
+    The result is identical to the scalar path: products that do not fit exactly in a float64 are recomputed with
+    Python integers.
+    """
+    columns = events if isinstance(events, EventQueueColumns) else EventQueueColumns.from_events(events)
+    if np.any(columns.native_quantity_paid == 0):
+        raise ZeroDivisionError("Fill events must have a non zero native_quantity_paid.")
+    is_bid = columns.bid
+    is_maker = columns.maker
+    released = columns.native_quantity_released.astype(np.int64)
+    fee = columns.native_fee_or_rebate.astype(np.int64)
+    # Bid makers and ask takers add the fee back, the other two subtract it.
+    price_before_fees = np.where(is_bid == is_maker, released + fee, released - fee)
+    base_multiplier = market_state.base_spl_token_multiplier()
+    quote_multiplier = market_state.quote_spl_token_multiplier()
+    paid = columns.native_quantity_paid
+    numerator = price_before_fees.astype(np.float64) * float(base_multiplier)
+    denominator = paid.astype(np.float64) * float(quote_multiplier)
+    price = numerator / denominator
+    size = paid.astype(np.float64) / float(base_multiplier)
+    inexact = np.flatnonzero((np.abs(numerator) >= _EXACT_FLOAT_BOUND) | (denominator >= _EXACT_FLOAT_BOUND))
+    for i in inexact:
+        price[i] = (int(price_before_fees[i]) * base_multiplier) / (quote_multiplier * int(paid[i]))
+        size[i] = int(paid[i]) / base_multiplier
+    return FilledOrderColumns(
+        order_id=columns.order_ids(),
+        side=np.where(is_bid, Side.BUY, Side.SELL).astype(np.uint8),
+        price_before_fees=price_before_fees,
+        price=price,
+        size=size,
+        fee_cost=np.where(is_maker, fee, -fee),
+    )
+
+
+class TakerFillColumns(NamedTuple):
+    size_lots: np.ndarray
+    """"""
+    quote_size_lots: np.ndarray
+    """"""
+    native_fee: np.ndarray
+    """"""
+    leftover_lots: np.ndarray
+    """"""
+    size: np.ndarray
+    """"""
+    quote_size: np.ndarray
+    """"""
+    average_price: np.ndarray
+    """NaN when nothing is filled."""
+    fee: np.ndarray
+    """"""
+
+
+def simulate_taker_fills(  # pylint: disable=too-many-arguments,too-many-locals
+    market_state: MarketState,
+    is_bids: bool,
+    prices: Sequence[int],
+    cumulative_sizes: Sequence[int],
+    cumulative_quote_sizes: Sequence[int],
+    limit_price_lots: int,
+    max_quantities: np.ndarray,
+    fee_rate: Fraction,
+) -> TakerFillColumns:
+    """Vectorized `PriceLevelIndex.simulate_taker_lots` over the levels up to the limit price.
+
+    Every size is located with one `searchsorted` on the cumulative sums. Python integers are used instead of int64
+    when the quote budgets could overflow.
+    """
+    base_lot_size, quote_lot_size = market_state.base_lot_size(), market_state.quote_lot_size()
+    # Same rounding as `MarketState.base_size_number_to_lots`.
+    sizes = np.floor(
+        np.floor(np.asarray(max_quantities, dtype=np.float64) * market_state.base_spl_token_multiplier())
+        / base_lot_size
+    )
+    count = len(prices)
+    bound = (int(sizes.max(initial=0)) + 1) * quote_lot_size * max(limit_price_lots, 1) * fee_rate.denominator
+    dtype = np.int64 if bound < 2 ** 62 else object
+    sizes = sizes.astype(np.int64).astype(dtype)
+    cum_sizes = np.asarray(cumulative_sizes, dtype=dtype)
+    cum_quote_sizes = np.asarray(cumulative_quote_sizes, dtype=dtype)
+    if count == 0:
+        size_lots = np.zeros(len(sizes), dtype=dtype)
+        quote_size_lots = np.zeros(len(sizes), dtype=dtype)
+    else:
+        price_lots = np.asarray(prices, dtype=dtype)
+        end = np.searchsorted(cum_sizes, sizes, side="left")
+        if not is_bids:
+            numerator, denominator = fee_rate.numerator, fee_rate.denominator
+            native_budgets = sizes * (quote_lot_size * limit_price_lots * denominator) // (denominator + numerator)
+            budgets = native_budgets // quote_lot_size
+            end = np.minimum(end, np.searchsorted(cum_quote_sizes, budgets, side="right"))
+        end = np.maximum(end, 1)
+        full = end > count
+        level = np.minimum(end, count) - 1
+        partial = sizes - cum_sizes[level]
+        if not is_bids:
+            partial = np.minimum(partial, (budgets - cum_quote_sizes[level]) // price_lots[level])
+        size_lots = np.where(full, cum_sizes[count], cum_sizes[level] + partial)
+        quote_size_lots = np.where(full, cum_quote_sizes[count], cum_quote_sizes[level] + partial * price_lots[level])
+    native_fee = -((-quote_size_lots * (quote_lot_size * fee_rate.numerator)) // fee_rate.denominator)
+    size_float = np.asarray(size_lots, dtype=np.float64)
+    quote_float = np.asarray(quote_size_lots, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_price_lots = np.where(size_float > 0, quote_float / size_float, np.nan)
+    return TakerFillColumns(
+        size_lots=size_lots,
+        quote_size_lots=quote_size_lots,
+        native_fee=native_fee,
+        leftover_lots=sizes - size_lots,
+        size=lots_to_number(size_float, base_lot_size, market_state.base_spl_token_multiplier()),
+        quote_size=lots_to_number(quote_float, quote_lot_size, market_state.quote_spl_token_multiplier()),
+        average_price=average_price_lots * float(market_state.price_lots_to_fraction(1)),
+        fee=np.asarray(native_fee, dtype=np.float64) / market_state.quote_spl_token_multiplier(),
+    )
@@ -0,0 +1,722 @@
+"""Market logic shared by the blocking and the asyncio APIs, everything here is free of I/O."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar, Union, cast
+
+from solana.account import Account
+from solana.blockhash import Blockhash
+from solana.publickey import PublicKey
+from solana.rpc.commitment import Max
+from solana.rpc.types import RPCMethod, RPCResponse
+from solana.system_program import CreateAccountParams, create_account
+from solana.transaction import Transaction, TransactionInstruction
+from spl.token.constants import ACCOUNT_LEN, TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT  # type: ignore # TODO: Remove ignore.
+from spl.token.instructions import CloseAccountParams  # type: ignore
+from spl.token.instructions import InitializeAccountParams, close_account, initialize_account
+
+import pyserum.instructions as instructions
+import pyserum.market.types as t
+
+from .._layouts.open_orders import OPEN_ORDERS_LAYOUT
+from ..account_cache import AccountCache
+from ..enums import OrderType, SelfTradeBehavior, Side
+from ..open_orders_account import OpenOrdersAccount, make_create_account_instruction
+from ..single_flight import SingleFlight
+from ..utils import RPCError, account_info_params, parse_bytes_data
+from ._internal.queue import (
+    QUEUE_HEADER_SIZE,
+    decode_event_queue,
+    decode_event_queue_header,
+    decode_recent_events,
+    decode_request_queue,
+    event_queue_alloc_len,
+    recent_event_slices,
+)
+from .decode_cache import DecodeCache
+from .orderbook import OrderBook
+from .snapshot import MarketSnapshot
+from .state import MarketState
+from .two_sided_book import TwoSidedBook
+
+if TYPE_CHECKING:
+    from construct import Container  # type: ignore
+
+    from .columnar import EventQueueColumns, FilledOrderColumns  # pylint: disable=cyclic-import
+
+LAMPORTS_PER_SOL = 1000000000
+
+# Times `load_recent_events` reads the slots of the newest events again when events were pushed over them while they
+# were read, before falling back to reading the whole queue.
+RECENT_EVENTS_ATTEMPTS = 3
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+
+@dataclass(frozen=True)
+class AccountLoad(Generic[T]):
+    """An account a market loads and how its data is decoded."""
+
+    address: PublicKey
+    account_kind: str
+    """Picks the time to live of the account data in the account cache."""
+    kind: str
+    """Tells apart different decodings of the same account."""
+    parse: Callable[[bytes], T]
+
+
+# pylint: disable=too-many-public-methods
+class MarketCore:
+    """Decoding and transaction building of a Serum market, `Market` and `AsyncMarket` add the RPC calls."""
+
+    logger = logging.getLogger("pyserum.market.Market")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        market_state: MarketState,
+        force_use_request_queue: bool = False,
+        decode_cache: Optional[DecodeCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> None:
+        self.state = market_state
+        self.force_use_request_queue = force_use_request_queue
+        self.decode_cache = decode_cache
+        self.single_flight = single_flight
+        self.account_cache = account_cache
+        # Number of slots in the ring of the event queue, known after `load_recent_events` read the whole queue once.
+        self._event_queue_alloc_len: Optional[int] = None
+
+    def _use_request_queue(self) -> bool:
+        return (
+            # DEX Version 1
+            self.state.program_id == PublicKey("4ckmDgGdxQoPDLUkDT3vHgSAkzA3QRdNq5ywwY4sUSJn")
+            or
+            # DEX Version 1
+            self.state.program_id == PublicKey("BJ3jrUzddfuSrZHXSCxMUUQsjKEyLmuuyZebkcaFp2fg")
+            or
+            # DEX Version 2
+            self.state.program_id == PublicKey("EUqojwWA2rd19FZrzeBncJsm38Jm1hEhE3zsmX3bRc2o")
+            or self.force_use_request_queue
+        )
+
+    def _decode(self, address: Optional[PublicKey], kind: str, bytes_data: bytes, decode: Callable[[bytes], T]) -> T:
+        if self.decode_cache is None or address is None:
+            return decode(bytes_data)
+        return self.decode_cache.get_or_decode(address, kind, bytes_data, decode)
+
+    def _invalidate_written_accounts(self, transaction: Transaction) -> None:
+        """Drop the cached data of the accounts a transaction that was sent writes to."""
+        if self.account_cache is not None:
+            self.account_cache.invalidate_transaction(transaction)
+
+    def _load_bytes_options(self, account_kind: str, min_slot: Optional[int]) -> Dict[str, Any]:
+        """Keyword arguments of `load_bytes_data` for an account of the market."""
+        return {
+            "single_flight": self.single_flight,
+            "cache": self.account_cache,
+            "kind": account_kind,
+            "min_slot": min_slot,
+        }
+
+    @staticmethod
+    def _single_flight_key(load: AccountLoad, min_slot: Optional[int]) -> Tuple[Any, ...]:
+        return str(load.address), Max, load.kind, min_slot
+
+    def _order_book_load(self, address: PublicKey, lazy: bool) -> AccountLoad[OrderBook]:
+        return AccountLoad(
+            address,
+            "order_book",
+            "lazy_order_book" if lazy else "order_book",
+            lambda bytes_data: self._parse_bids_or_asks(bytes_data, lazy, address),
+        )
+
+    def _event_queue_load(self) -> AccountLoad[List[t.Event]]:
+        return AccountLoad(self.state.event_queue(), "event_queue", "event_queue", self._parse_event_queue)
+
+    def _request_queue_load(self) -> AccountLoad[List[t.Request]]:
+        return AccountLoad(self.state.request_queue(), "request_queue", "request_queue", self._parse_request_queue)
+
+    def _fills_load(self, limit: int) -> AccountLoad[List[t.FilledOrder]]:
+        return AccountLoad(
+            self.state.event_queue(), "event_queue", "fills_%d" % limit, lambda data: self._parse_fills(data, limit)
+        )
+
+    def _parse_bids_or_asks(
+        self, bytes_data: bytes, lazy: bool = False, address: Optional[PublicKey] = None
+    ) -> OrderBook:
+        """Decode an order book, `address` enables the decode cache."""
+        return self._decode(
+            address,
+            "lazy_order_book" if lazy else "order_book",
+            bytes_data,
+            lambda data: OrderBook.from_bytes(self.state, data, lazy),
+        )
+
+    def _parse_event_queue(self, bytes_data: bytes) -> List[t.Event]:
+        return self._decode(self.state.event_queue(), "event_queue", bytes_data, decode_event_queue)
+
+    def _parse_request_queue(self, bytes_data: bytes) -> List[t.Request]:
+        return self._decode(self.state.request_queue(), "request_queue", bytes_data, decode_request_queue)
+
+    @staticmethod
+    def _filter_orders_for_owner(
+        bids: OrderBook, asks: OrderBook, open_orders_accounts: List[OpenOrdersAccount]
+    ) -> List[t.Order]:
+        if not open_orders_accounts:
+            return []
+
+        open_orders_addresses = [o.address for o in open_orders_accounts]
+        return bids.orders_for_owners(open_orders_addresses) + asks.orders_for_owners(open_orders_addresses)
+
+    def _parse_two_sided_book(self, slot: int, datas: List[Optional[bytes]]) -> TwoSidedBook:
+        bids_data, asks_data = datas
+        if bids_data is None or asks_data is None:
+            raise RPCError("Cannot load byte data.")
+        bids = self._parse_bids_or_asks(bids_data, lazy=True, address=self.state.bids())
+        asks = self._parse_bids_or_asks(asks_data, lazy=True, address=self.state.asks())
+        return TwoSidedBook(self.state, bids, asks, slot)
+
+    def _snapshot_addresses(self, open_orders_addresses: Sequence[PublicKey]) -> List[PublicKey]:
+        return [
+            self.state.public_key(),
+            self.state.bids(),
+            self.state.asks(),
+            self.state.event_queue(),
+            self.state.request_queue(),
+            *open_orders_addresses,
+        ]
+
+    def _parse_snapshot(
+        self, slot: int, datas: List[Optional[bytes]], open_orders_addresses: Sequence[PublicKey]
+    ) -> MarketSnapshot:
+        if any(data is None for data in datas):
+            raise RPCError("Cannot load byte data.")
+        market_data, bids_data, asks_data, event_queue_data, request_queue_data, *open_orders_datas = cast(
+            List[bytes], datas
+        )
+        state = MarketState.from_bytes(
+            self.state.program_id(),
+            self.state.base_spl_token_decimals(),
+            self.state.quote_spl_token_decimals(),
+            market_data,
+        )
+        return MarketSnapshot(
+            slot=slot,
+            state=state,
+            bids=OrderBook.from_bytes(state, bids_data),
+            asks=OrderBook.from_bytes(state, asks_data),
+            event_queue=decode_event_queue(event_queue_data),
+            request_queue=decode_request_queue(request_queue_data),
+            open_orders_accounts=OpenOrdersAccount.from_many(open_orders_addresses, open_orders_datas),
+        )
+
+    def _recent_events_attempts(self, limit: int) -> int:
+        """Number of times `load_recent_events` reads only the slots of the newest events, 0 until the size of the
+        queue is known."""
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+        return 0 if self._event_queue_alloc_len is None else RECENT_EVENTS_ATTEMPTS
+
+    def _parse_whole_event_queue(self, bytes_data: bytes, limit: int) -> List[t.Event]:
+        """The `limit` newest events of the whole event queue, the size of its ring is remembered."""
+        self._event_queue_alloc_len = event_queue_alloc_len(len(bytes_data))
+        return decode_event_queue(bytes_data, limit)
+
+    def _recent_event_requests(self, header: Container, limit: int) -> List[Tuple[RPCMethod, Tuple[Any, ...]]]:
+        """The reads of `load_recent_events` once the event queue header is known, sent as one batch: the slots of
+        the `limit` newest events, then the header again to check that no event was pushed over them meanwhile."""
+        if self._event_queue_alloc_len is None:
+            raise ValueError("The size of the event queue is not known yet.")
+        slices = recent_event_slices(header, self._event_queue_alloc_len, limit) + [(0, QUEUE_HEADER_SIZE)]
+        return [
+            (RPCMethod("getAccountInfo"), account_info_params(self.state.event_queue(), Max, data_slice))
+            for data_slice in slices
+        ]
+
+    def _parse_recent_events(self, header: Container, responses: Sequence[RPCResponse]) -> Optional[List[t.Event]]:
+        """Events of the responses to `_recent_event_requests`, None if some of them may have been overwritten."""
+        if self._event_queue_alloc_len is None:
+            raise ValueError("The size of the event queue is not known yet.")
+        datas = [parse_bytes_data(response) for response in responses]
+        later_header = decode_event_queue_header(datas[-1])
+        return decode_recent_events(header, later_header, self._event_queue_alloc_len, datas[:-1])
+
+    def _parse_fills(self, bytes_data: bytes, limit: int) -> List[t.FilledOrder]:
+        return self._fills_from_events(decode_event_queue(bytes_data, limit))
+
+    def _fills_from_events(self, events: Sequence[t.Event]) -> List[t.FilledOrder]:
+        return [
+            self.parse_fill_event(event)
+            for event in events
+            if event.event_flags.fill and event.native_quantity_paid > 0
+        ]
+
+    def parse_fill_event(self, event) -> t.FilledOrder:
+        if event.event_flags.bid:
+            side = Side.BUY
+            price_before_fees = (
+                event.native_quantity_released + event.native_fee_or_rebate
+                if event.event_flags.maker
+                else event.native_quantity_released - event.native_fee_or_rebate
+            )
+        else:
+            side = Side.SELL
+            price_before_fees = (
+                event.native_quantity_released - event.native_fee_or_rebate
+                if event.event_flags.maker
+                else event.native_quantity_released + event.native_fee_or_rebate
+            )
+
+        price = (price_before_fees * self.state.base_spl_token_multiplier()) / (
+            self.state.quote_spl_token_multiplier() * event.native_quantity_paid
+        )
+        size = event.native_quantity_paid / self.state.base_spl_token_multiplier()
+        return t.FilledOrder(
+            order_id=event.order_id,
+            side=side,
+            price=price,
+            size=size,
+            fee_cost=event.native_fee_or_rebate * (1 if event.event_flags.maker else -1),
+        )
+
+    def parse_fill_events(self, events: Union[EventQueueColumns, Sequence[t.Event]]) -> FilledOrderColumns:
+        """Vectorized `parse_fill_event` for many fill events at once, requires numpy.
+
+        :param events: Fill events, either as a list of `Event` or as columns from `decode_event_queue_columns`.
+        """
+        from .columnar import parse_fill_events  # pylint: disable=import-outside-toplevel
+
+        return parse_fill_events(self.state, events)
+
+    def _place_order_requests(self, owner: PublicKey) -> List[Tuple[RPCMethod, Tuple[Any, ...]]]:
+        """The reads `place_order` needs, sent as one batch: the owner's open orders accounts, the rent of a new one
+        in case there are none, and the blockhash to sign with."""
+        return [
+            (
+                RPCMethod("getProgramAccounts"),
+                OpenOrdersAccount._find_for_market_and_owner_params(  # pylint: disable=protected-access
+                    self.state.public_key(), owner, self.state.program_id()
+                ),
+            ),
+            (RPCMethod("getMinimumBalanceForRentExemption"), (OPEN_ORDERS_LAYOUT.sizeof(), {"commitment": Max})),
+            (RPCMethod("getRecentBlockhash"), ({"commitment": Max},)),
+        ]
+
+    def _settle_funds_requests(self) -> List[Tuple[RPCMethod, Tuple[Any, ...]]]:
+        """The reads `settle_funds` needs, sent as one batch: the blockhash, then the rent of a wrapped SOL account."""
+        requests: List[Tuple[RPCMethod, Tuple[Any, ...]]] = [(RPCMethod("getRecentBlockhash"), ({"commitment": Max},))]
+        if self._settle_funds_should_wrap_sol():
+            requests.append((RPCMethod("getMinimumBalanceForRentExemption"), (ACCOUNT_LEN, {"commitment": Max})))
+        return requests
+
+    def _build_place_order_tx(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        payer: PublicKey,
+        owner: Account,
+        order_type: OrderType,
+        side: Side,
+        limit_price: float,
+        max_quantity: float,
+        client_id: int,
+        responses: Sequence[RPCResponse],
+    ) -> Transaction:
+        """Signed order transaction, from the responses to `_place_order_requests`."""
+        accounts_resp, mbfre_resp, blockhash_resp = responses
+        transaction = Transaction()
+        signers: List[Account] = [owner]
+        open_order_accounts = OpenOrdersAccount._process_get_program_accounts_resp(  # pylint: disable=protected-access
+            accounts_resp
+        )
+        if not open_order_accounts:
+            place_order_open_order_account = self._prepare_new_oo_account(
+                transaction, owner, mbfre_resp["result"], signers, self.state.program_id()
+            )
+        else:
+            place_order_open_order_account = open_order_accounts[0].address
+        self._prepare_order_transaction(
+            transaction,
+            payer,
+            owner,
+            order_type,
+            side,
+            signers,
+            limit_price,
+            max_quantity,
+            client_id,
+            open_order_accounts,
+            place_order_open_order_account,
+        )
+        self._sign_transaction(transaction, signers, blockhash_resp)
+        return transaction
+
+    def _build_signed_settle_funds_tx(
+        self,
+        owner: Account,
+        open_orders: OpenOrdersAccount,
+        base_wallet: PublicKey,
+        quote_wallet: PublicKey,
+        responses: Sequence[RPCResponse],
+    ) -> Transaction:
+        """Signed settle funds transaction, from the responses to `_settle_funds_requests`."""
+        min_bal_for_rent_exemption = responses[1]["result"] if len(responses) > 1 else None
+        transaction = self._build_settle_funds_tx(
+            owner, open_orders, base_wallet, quote_wallet, min_bal_for_rent_exemption
+        )
+        self._sign_transaction(transaction, [owner], responses[0])
+        return transaction
+
+    @staticmethod
+    def _sign_transaction(transaction: Transaction, signers: Sequence[Account], blockhash_resp: RPCResponse) -> None:
+        """Sign with the blockhash of a getRecentBlockhash response, as `Client.send_transaction` does."""
+        try:
+            transaction.recent_blockhash = Blockhash(blockhash_resp["result"]["value"]["blockhash"])
+        except (KeyError, TypeError) as err:
+            raise RuntimeError("failed to get recent blockhash") from err
+        transaction.sign(*signers)
+
+    @staticmethod
+    def _prepare_new_oo_account(
+        transaction: Transaction, owner: Account, balance_needed: int, signers: List[Account], program_id: PublicKey
+    ) -> PublicKey:
+        new_open_orders_account = Account()
+        transaction.add(
+            make_create_account_instruction(
+                owner_address=owner.public_key(),
+                new_account_address=new_open_orders_account.public_key(),
+                lamports=balance_needed,
+                program_id=program_id,
+            )
+        )
+        signers.append(new_open_orders_account)
+        # TODO: Cache new_open_orders_account
+        return new_open_orders_account.public_key()
+
+    def _prepare_order_transaction(  # pylint: disable=too-many-arguments
+        self,
+        transaction: Transaction,
+        payer: PublicKey,
+        owner: Account,
+        order_type: OrderType,
+        side: Side,
+        signers: List[Account],
+        limit_price: float,
+        max_quantity: float,
+        client_id: int,
+        open_order_accounts: List[OpenOrdersAccount],
+        place_order_open_order_account: PublicKey,
+    ) -> None:
+        # TODO: Handle fee_discount_pubkey
+
+        # unwrapped SOL cannot be used for payment
+        if payer == owner.public_key():
+            raise ValueError("Invalid payer account. Cannot use unwrapped SOL.")
+
+        # TODO: add integration test for SOL wrapping.
+        should_wrap_sol = (side == Side.BUY and self.state.quote_mint() == WRAPPED_SOL_MINT) or (
+            side == Side.SELL and self.state.base_mint() == WRAPPED_SOL_MINT
+        )
+
+        if should_wrap_sol:
+            wrapped_sol_account = Account()
+            payer = wrapped_sol_account.public_key()
+            signers.append(wrapped_sol_account)
+            transaction.add(
+                create_account(
+                    CreateAccountParams(
+                        from_pubkey=owner.public_key(),
+                        new_account_pubkey=wrapped_sol_account.public_key(),
+                        lamports=MarketCore._get_lamport_need_for_sol_wrapping(
+                            limit_price, max_quantity, side, open_order_accounts
+                        ),
+                        space=ACCOUNT_LEN,
+                        program_id=TOKEN_PROGRAM_ID,
+                    )
+                )
+            )
+            transaction.add(
+                initialize_account(
+                    InitializeAccountParams(
+                        account=wrapped_sol_account.public_key(),
+                        mint=WRAPPED_SOL_MINT,
+                        owner=owner.public_key(),
+                        program_id=TOKEN_PROGRAM_ID,
+                    )
+                )
+            )
+
+        transaction.add(
+            self.make_place_order_instruction(
+                payer=payer,
+                owner=owner,
+                order_type=order_type,
+                side=side,
+                limit_price=limit_price,
+                max_quantity=max_quantity,
+                client_id=client_id,
+                open_order_account=place_order_open_order_account,
+            )
+        )
+
+        if should_wrap_sol:
+            transaction.add(
+                close_account(
+                    CloseAccountParams(
+                        account=wrapped_sol_account.public_key(),
+                        owner=owner.public_key(),
+                        dest=owner.public_key(),
+                        program_id=TOKEN_PROGRAM_ID,
+                    )
+                )
+            )
+        # TODO: extract `make_place_order_transaction`.
+
+    @staticmethod
+    def _get_lamport_need_for_sol_wrapping(
+        price: float, size: float, side: Side, open_orders_accounts: List[OpenOrdersAccount]
+    ) -> int:
+        lamports = 0
+        if side == Side.BUY:
+            lamports = round(price * size * 1.01 * LAMPORTS_PER_SOL)
+            if open_orders_accounts:
+                lamports -= open_orders_accounts[0].quote_token_free
+        else:
+            lamports = round(size * LAMPORTS_PER_SOL)
+            if open_orders_accounts:
+                lamports -= open_orders_accounts[0].base_token_free
+
+        return max(lamports, 0) + 10000000
+
+    def make_place_order_instruction(  # pylint: disable=too-many-arguments
+        self,
+        payer: PublicKey,
+        owner: Account,
+        order_type: OrderType,
+        side: Side,
+        limit_price: float,
+        max_quantity: float,
+        client_id: int,
+        open_order_account: PublicKey,
+        fee_discount_pubkey: Optional[PublicKey] = None,
+    ) -> TransactionInstruction:
+        if self.state.base_size_number_to_lots(max_quantity) < 0:
+            raise Exception("Size lot %d is too small" % max_quantity)
+        if self.state.price_number_to_lots(limit_price) < 0:
+            raise Exception("Price lot %d is too small" % limit_price)
+        if self._use_request_queue():
+            return instructions.new_order(
+                instructions.NewOrderParams(
+                    market=self.state.public_key(),
+                    open_orders=open_order_account,
+                    payer=payer,
+                    owner=owner.public_key(),
+                    request_queue=self.state.request_queue(),
+                    base_vault=self.state.base_vault(),
+                    quote_vault=self.state.quote_vault(),
+                    side=side,
+                    limit_price=self.state.price_number_to_lots(limit_price),
+                    max_quantity=self.state.base_size_number_to_lots(max_quantity),
+                    order_type=order_type,
+                    client_id=client_id,
+                    program_id=self.state.program_id(),
+                )
+            )
+        return instructions.new_order_v3(
+            instructions.NewOrderV3Params(
+                market=self.state.public_key(),
+                open_orders=open_order_account,
+                payer=payer,
+                owner=owner.public_key(),
+                request_queue=self.state.request_queue(),
+                event_queue=self.state.event_queue(),
+                bids=self.state.bids(),
+                asks=self.state.asks(),
+                base_vault=self.state.base_vault(),
+                quote_vault=self.state.quote_vault(),
+                side=side,
+                limit_price=self.state.price_number_to_lots(limit_price),
+                max_base_quantity=self.state.base_size_number_to_lots(max_quantity),
+                max_quote_quantity=self.state.base_size_number_to_lots(max_quantity)
+                * self.state.quote_lot_size()
+                * self.state.price_number_to_lots(limit_price),
+                order_type=order_type,
+                client_id=client_id,
+                program_id=self.state.program_id(),
+                self_trade_behavior=SelfTradeBehavior.DECREMENT_TAKE,
+                fee_discount_pubkey=fee_discount_pubkey,
+                limit=65535,
+            )
+        )
+
+    def make_cancel_order_by_client_id_instruction(
+        self, owner: Account, open_orders_account: PublicKey, client_id: int
+    ) -> TransactionInstruction:
+        if self._use_request_queue():
+            return instructions.cancel_order_by_client_id(
+                instructions.CancelOrderByClientIDParams(
+                    market=self.state.public_key(),
+                    owner=owner.public_key(),
+                    open_orders=open_orders_account,
+                    request_queue=self.state.request_queue(),
+                    client_id=client_id,
+                    program_id=self.state.program_id(),
+                )
+            )
+        return instructions.cancel_order_by_client_id_v2(
+            instructions.CancelOrderByClientIDV2Params(
+                market=self.state.public_key(),
+                owner=owner.public_key(),
+                open_orders=open_orders_account,
+                bids=self.state.bids(),
+                asks=self.state.asks(),
+                event_queue=self.state.event_queue(),
+                client_id=client_id,
+                program_id=self.state.program_id(),
+            )
+        )
+
+    def make_cancel_order_instruction(self, owner: PublicKey, order: t.Order) -> TransactionInstruction:
+        if self._use_request_queue():
+            return instructions.cancel_order(
+                instructions.CancelOrderParams(
+                    market=self.state.public_key(),
+                    owner=owner,
+                    open_orders=order.open_order_address,
+                    request_queue=self.state.request_queue(),
+                    side=order.side,
+                    order_id=order.order_id,
+                    open_orders_slot=order.open_order_slot,
+                    program_id=self.state.program_id(),
+                )
+            )
+        return instructions.cancel_order_v2(
+            instructions.CancelOrderV2Params(
+                market=self.state.public_key(),
+                owner=owner,
+                open_orders=order.open_order_address,
+                bids=self.state.bids(),
+                asks=self.state.asks(),
+                event_queue=self.state.event_queue(),
+                side=order.side,
+                order_id=order.order_id,
+                open_orders_slot=order.open_order_slot,
+                program_id=self.state.program_id(),
+            )
+        )
+
+    def make_match_orders_instruction(self, limit: int) -> TransactionInstruction:
+        params = instructions.MatchOrdersParams(
+            market=self.state.public_key(),
+            request_queue=self.state.request_queue(),
+            event_queue=self.state.event_queue(),
+            bids=self.state.bids(),
+            asks=self.state.asks(),
+            base_vault=self.state.base_vault(),
+            quote_vault=self.state.quote_vault(),
+            limit=limit,
+            program_id=self.state.program_id(),
+        )
+        return instructions.match_orders(params)
+
+    def _settle_funds_should_wrap_sol(self) -> bool:
+        return (self.state.quote_mint() == WRAPPED_SOL_MINT) or (self.state.base_mint() == WRAPPED_SOL_MINT)
+
+    def _build_settle_funds_tx(  # pylint: disable=too-many-arguments
+        self,
+        owner: Account,
+        open_orders: OpenOrdersAccount,
+        base_wallet: PublicKey,
+        quote_wallet: PublicKey,
+        min_bal_for_rent_exemption: Optional[int],
+    ) -> Transaction:
+        """Settle funds transaction, `min_bal_for_rent_exemption` is only needed to wrap SOL."""
+        # TODO: Handle wrapped sol accounts
+        if open_orders.owner != owner.public_key():
+            raise Exception("Invalid open orders account")
+        vault_signer = PublicKey.create_program_address(
+            [bytes(self.state.public_key()), self.state.vault_signer_nonce().to_bytes(8, byteorder="little")],
+            self.state.program_id(),
+        )
+        transaction = Transaction()
+        signers: List[Account] = [owner]
+
+        should_wrap_sol = self._settle_funds_should_wrap_sol()
+        if should_wrap_sol:
+            if min_bal_for_rent_exemption is None:
+                raise ValueError("The rent exemption of a wrapped SOL account is needed to settle SOL.")
+            wrapped_sol_account = Account()
+            signers.append(wrapped_sol_account)
+            # make a wrapped SOL account with enough balance to
+            # fund the trade, run the program, then send itself back home
+            transaction.add(
+                create_account(
+                    CreateAccountParams(
+                        from_pubkey=owner.public_key(),
+                        new_account_pubkey=wrapped_sol_account.public_key(),
+                        lamports=min_bal_for_rent_exemption,
+                        space=ACCOUNT_LEN,
+                        program_id=TOKEN_PROGRAM_ID,
+                    )
+                )
+            )
+            # this was also broken upstream. it should be minting wrapped SOL, and using the token program ID
+            transaction.add(
+                initialize_account(
+                    InitializeAccountParams(
+                        account=wrapped_sol_account.public_key(),
+                        mint=WRAPPED_SOL_MINT,
+                        owner=owner.public_key(),
+                        program_id=TOKEN_PROGRAM_ID,
+                    )
+                )
+            )
+
+        transaction.add(
+            self.make_settle_funds_instruction(
+                open_orders,
+                base_wallet if self.state.base_mint() != WRAPPED_SOL_MINT else wrapped_sol_account.public_key(),
+                quote_wallet if self.state.quote_mint() != WRAPPED_SOL_MINT else wrapped_sol_account.public_key(),
+                vault_signer,
+            )
+        )
+
+        if should_wrap_sol:
+            # close out the account and send the funds home when the trade is completed/cancelled
+            transaction.add(
+                close_account(
+                    CloseAccountParams(
+                        account=wrapped_sol_account.public_key(),
+                        owner=owner.public_key(),
+                        dest=owner.public_key(),
+                        program_id=TOKEN_PROGRAM_ID,
+                    )
+                )
+            )
+        return transaction
+
+    def make_settle_funds_instruction(
+        self,
+        open_orders_account: OpenOrdersAccount,
+        base_wallet: PublicKey,
+        quote_wallet: PublicKey,
+        vault_signer: PublicKey,
+    ) -> TransactionInstruction:
+        if base_wallet == self.state.base_vault():
+            raise ValueError("base_wallet should not be a vault address")
+        if quote_wallet == self.state.quote_vault():
+            raise ValueError("quote_wallet should not be a vault address")
+
+        return instructions.settle_funds(
+            instructions.SettleFundsParams(
+                market=self.state.public_key(),
+                open_orders=open_orders_account.address,
+                owner=open_orders_account.owner,
+                base_vault=self.state.base_vault(),
+                quote_vault=self.state.quote_vault(),
+                base_wallet=base_wallet,
+                quote_wallet=quote_wallet,
+                vault_signer=vault_signer,
+                program_id=self.state.program_id(),
+            )
+        )
@@ -0,0 +1,95 @@
+"""Cache of decoded accounts, so that polling an account that did not change does not decode it again."""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple, TypeVar
+
+from solana.publickey import PublicKey
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+
+class DecodeCacheStats(NamedTuple):
+    hits: int
+    """"""
+    misses: int
+    """"""
+    evictions: int
+    """"""
+    size: int
+    """Number of decoded accounts held."""
+    bytes_saved: int
+    """Total size of the account data that did not need to be decoded."""
+
+
+class _Entry(NamedTuple):
+    digest: bytes
+    value: Any
+
+
+class DecodeCache:
+    """LRU cache of decoded accounts keyed by account address, holding a digest of the raw data of each entry.
+
+    An account is decoded again only when its data changed. Decoded values are shared between the callers that get
+    them from the cache, so they must not be modified.
+
+    :param max_size: Number of accounts kept, the least recently used account is evicted first.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self._max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes_saved = 0
+
+    @staticmethod
+    def _digest(buffer: bytes) -> bytes:
+        return hashlib.blake2b(buffer, digest_size=16).digest()
+
+    def get_or_decode(self, address: PublicKey, kind: str, buffer: bytes, decode: Callable[[bytes], T]) -> T:
+        """The value of `decode(buffer)`, from the cache if the data of `address` decoded as `kind` did not change.
+
+        :param kind: Tells apart different decodings of the same account, e.g. eager and lazy order books.
+        """
+        key = (str(address), kind)
+        digest = self._digest(buffer)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.digest == digest:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._bytes_saved += len(buffer)
+                return entry.value
+            self._misses += 1
+        value = decode(buffer)
+        with self._lock:
+            self._entries[key] = _Entry(digest, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def invalidate(self, address: Optional[PublicKey] = None) -> None:
+        """Drop the entries of `address`, or every entry."""
+        with self._lock:
+            if address is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == str(address)]:
+                    del self._entries[key]
+
+    def stats(self) -> DecodeCacheStats:
+        with self._lock:
+            return DecodeCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                bytes_saved=self._bytes_saved,
+            )
@@ -0,0 +1,220 @@
+"""Price levels of one side of an order book with cumulative sums, for depth and fill price queries."""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
+
+import pyserum.market.types as t
+
+from .state import ExactNumber, MarketState
+
+if TYPE_CHECKING:
+    import numpy as np  # pylint: disable=unused-import # noqa:F401
+
+    from .columnar import TakerFillColumns  # pylint: disable=cyclic-import
+
+Number = Union[float, ExactNumber]
+
+
+def _exact(value: Number) -> Fraction:
+    # Floats are read from their shortest repr, so that 0.1 matches a level at exactly 0.1.
+    return Fraction(repr(value)) if isinstance(value, float) else Fraction(value)
+
+
+class PriceLevelIndex:
+    """Price levels of one side of a book, best price first, with the cumulative base size and quote size from the
+    best level.
+
+    Each query bisects the levels once. Inputs ending in `_lots` are in lots, the others in UI units, and every result
+    carries both.
+    """
+
+    def __init__(self, market_state: MarketState, is_bids: bool, levels: Iterable[Tuple[int, int]]) -> None:
+        """
+        :param levels: Pairs of price lots and size lots, best price first and one pair per price.
+        """
+        self._market_state = market_state
+        self._is_bids = is_bids
+        self._prices: List[int] = []
+        # Keys ascend from the best price, the prices of bids are negated.
+        self._keys: List[int] = []
+        self._cumulative_sizes = [0]
+        self._cumulative_quote_sizes = [0]
+        for price_lots, size_lots in levels:
+            self._prices.append(price_lots)
+            self._keys.append(-price_lots if is_bids else price_lots)
+            self._cumulative_sizes.append(self._cumulative_sizes[-1] + size_lots)
+            self._cumulative_quote_sizes.append(self._cumulative_quote_sizes[-1] + price_lots * size_lots)
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    @property
+    def is_bids(self) -> bool:
+        return self._is_bids
+
+    def best_price_lots(self) -> Optional[int]:
+        return self._prices[0] if self._prices else None
+
+    def levels(self) -> List[t.OrderInfo]:
+        """The levels like `OrderBook.get_l2` without a depth limit."""
+        sizes = self._cumulative_sizes
+        return [
+            t.OrderInfo(
+                price=self._market_state.price_lots_to_number(price_lots),
+                size=self._market_state.base_size_lots_to_number(sizes[i + 1] - sizes[i]),
+                price_lots=price_lots,
+                size_lots=sizes[i + 1] - sizes[i],
+            )
+            for i, price_lots in enumerate(self._prices)
+        ]
+
+    def depth_lots(self, price_lots: Number) -> t.Depth:
+        """Size of the levels at `price_lots` or better."""
+        price = _exact(price_lots)
+        count = bisect_right(self._keys, -price if self._is_bids else price)
+        return self.__depth(count)
+
+    def depth(self, price: Number) -> t.Depth:
+        """Size of the levels at `price` or better."""
+        return self.depth_lots(self.__price_to_lots(price))
+
+    def depth_within_bps(self, mid_price_lots: Number, bps: Number) -> t.Depth:
+        """Size of the levels within `bps` basis points of the mid price, e.g. `Fraction(best_bid + best_ask, 2)`."""
+        band = _exact(bps) / 10000
+        edge = _exact(mid_price_lots) * (1 - band if self._is_bids else 1 + band)
+        return self.depth_lots(edge)
+
+    def fill_lots(self, size_lots: int) -> Optional[t.FillEstimate]:
+        """Average and impact prices of a taker order of `size_lots` walking this side, None if the book is too thin."""
+        if size_lots <= 0:
+            raise ValueError("size_lots must be positive.")
+        count = bisect_left(self._cumulative_sizes, size_lots)
+        if count > len(self._prices):
+            return None
+        impact_price_lots = self._prices[count - 1]
+        quote_size_lots = (
+            self._cumulative_quote_sizes[count - 1]
+            + (size_lots - self._cumulative_sizes[count - 1]) * impact_price_lots
+        )
+        average_price_lots = Fraction(quote_size_lots, size_lots)
+        state = self._market_state
+        return t.FillEstimate(
+            size=state.base_size_lots_to_number(size_lots),
+            size_lots=size_lots,
+            quote_size=state.quote_size_lots_to_number(quote_size_lots),
+            quote_size_lots=quote_size_lots,
+            average_price=float(average_price_lots * state.price_lots_to_fraction(1)),
+            average_price_lots=average_price_lots,
+            impact_price=state.price_lots_to_number(impact_price_lots),
+            impact_price_lots=impact_price_lots,
+            levels=count,
+        )
+
+    def fill(self, size: Number) -> Optional[t.FillEstimate]:
+        """`fill_lots` for a base size, rounded down to lots."""
+        return self.fill_lots(self._market_state.base_size_exact_to_lots(_exact(size)))
+
+    def simulate_taker_lots(
+        self, limit_price_lots: int, max_quantity_lots: int, fee_rate_bps: Optional[Number] = None
+    ) -> t.TakerFill:
+        """Fill of an IOC order taking liquidity from this side, i.e. a buy against asks or a sell against bids.
+
+        Like the DEX, a buy spends at most `max_quantity_lots * limit_price_lots` quote lots including the taker fee,
+        so the fee can cut the filled size, and the fee is the traded quote amount times the fee rate rounded up.
+
+        :param fee_rate_bps: Taker fee rate, the `fee_rate_bps` of the market by default.
+        """
+        rate = self.__fee_rate(fee_rate_bps)
+        count = self.depth_lots(limit_price_lots).levels
+        sizes, quote_sizes = self._cumulative_sizes, self._cumulative_quote_sizes
+        end = bisect_left(sizes, max_quantity_lots, 0, count + 1)
+        budget = None
+        if not self._is_bids:
+            budget = self.__quote_budget(max_quantity_lots, limit_price_lots, rate)
+            end = min(end, bisect_right(quote_sizes, budget, 0, count + 1))
+        end = max(end, 1)
+        if end > count:
+            size_lots, quote_size_lots = sizes[count], quote_sizes[count]
+        else:
+            price_lots = self._prices[end - 1]
+            partial = max_quantity_lots - sizes[end - 1]
+            if budget is not None:
+                partial = min(partial, (budget - quote_sizes[end - 1]) // price_lots)
+            size_lots = sizes[end - 1] + partial
+            quote_size_lots = quote_sizes[end - 1] + partial * price_lots
+        return self.__taker_fill(size_lots, quote_size_lots, max_quantity_lots - size_lots, rate)
+
+    def simulate_taker(
+        self, limit_price: float, max_quantity: float, fee_rate_bps: Optional[Number] = None
+    ) -> t.TakerFill:
+        """`simulate_taker_lots` with the price and size rounded to lots like `Market.place_order` does."""
+        return self.simulate_taker_lots(
+            self._market_state.price_number_to_lots(limit_price),
+            self._market_state.base_size_number_to_lots(max_quantity),
+            fee_rate_bps,
+        )
+
+    def simulate_taker_array(
+        self, limit_price: float, max_quantities: "np.ndarray", fee_rate_bps: Optional[Number] = None
+    ) -> TakerFillColumns:
+        """Vectorized `simulate_taker` over many candidate sizes at the same limit price, requires numpy."""
+        from .columnar import simulate_taker_fills  # pylint: disable=import-outside-toplevel
+
+        state = self._market_state
+        limit_price_lots = state.price_number_to_lots(limit_price)
+        count = self.depth_lots(limit_price_lots).levels
+        return simulate_taker_fills(
+            state,
+            self._is_bids,
+            self._prices[:count],
+            self._cumulative_sizes[: count + 1],
+            self._cumulative_quote_sizes[: count + 1],
+            limit_price_lots,
+            max_quantities,
+            self.__fee_rate(fee_rate_bps),
+        )
+
+    def __fee_rate(self, fee_rate_bps: Optional[Number]) -> Fraction:
+        return _exact(self._market_state.fee_rate_bps() if fee_rate_bps is None else fee_rate_bps) / 10000
+
+    def __quote_budget(self, max_quantity_lots: int, limit_price_lots: int, rate: Fraction) -> int:
+        """Quote lots a buy can trade once the taker fee is set aside from its maximum quote quantity."""
+        quote_lot_size = self._market_state.quote_lot_size()
+        native_budget = max_quantity_lots * quote_lot_size * limit_price_lots
+        return math.floor(native_budget / (1 + rate)) // quote_lot_size
+
+    def __taker_fill(self, size_lots: int, quote_size_lots: int, leftover_lots: int, rate: Fraction) -> t.TakerFill:
+        state = self._market_state
+        native_fee = math.ceil(quote_size_lots * state.quote_lot_size() * rate)
+        average_price_lots = Fraction(quote_size_lots, size_lots) if size_lots else None
+        return t.TakerFill(
+            size=state.base_size_lots_to_number(size_lots),
+            size_lots=size_lots,
+            quote_size=state.quote_size_lots_to_number(quote_size_lots),
+            quote_size_lots=quote_size_lots,
+            average_price=(
+                float(average_price_lots * state.price_lots_to_fraction(1)) if average_price_lots is not None else None
+            ),
+            average_price_lots=average_price_lots,
+            fee=state.quote_spl_size_to_number(native_fee),
+            native_fee=native_fee,
+            leftover=state.base_size_lots_to_number(leftover_lots),
+            leftover_lots=leftover_lots,
+        )
+
+    def __depth(self, count: int) -> t.Depth:
+        size_lots = self._cumulative_sizes[count]
+        quote_size_lots = self._cumulative_quote_sizes[count]
+        return t.Depth(
+            size=self._market_state.base_size_lots_to_number(size_lots),
+            size_lots=size_lots,
+            quote_size=self._market_state.quote_size_lots_to_number(quote_size_lots),
+            quote_size_lots=quote_size_lots,
+            levels=count,
+        )
+
+    def __price_to_lots(self, price: Number) -> Fraction:
+        return _exact(price) / self._market_state.price_lots_to_fraction(1)
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence, Union
+import heapq
+import itertools
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from solana.publickey import PublicKey
 
 import pyserum.market.types as t
 
+from .._layouts.slab import SLAB_HEADER_STRUCT
 from ..enums import Side
-from ._internal.slab import Slab, SlabInnerNode, SlabLeafNode
+from ._internal.slab import Slab, SlabHeader, SlabInnerNode, SlabLeafNode
+from .levels import PriceLevelIndex
 from .state import MarketState
 
+if TYPE_CHECKING:
+    from .columnar import ColumnarOrderBook  # pylint: disable=cyclic-import
+
+
+# Number of bytes at the start of an order book account holding the account flags and the slab header.
+ORDER_BOOK_HEADER_SIZE = 13 + SLAB_HEADER_STRUCT.size
+
 
 class OrderBook:
     """Represents an order book."""
@@ -15,6 +28,8 @@ class OrderBook:
     _market_state: MarketState
     _is_bids: bool
     _slab: Slab
+    _owner_index: Optional[Dict[bytes, List[SlabLeafNode]]]
+    _price_levels: Optional[PriceLevelIndex]
 
     def __init__(self, market_state: MarketState, account_flags: t.AccountFlags, slab: Slab) -> None:
         if not account_flags.initialized or not account_flags.bids ^ account_flags.asks:
@@ -22,6 +37,8 @@ class OrderBook:
         self._market_state = market_state
         self._is_bids = account_flags.bids
         self._slab = slab
+        self._owner_index = None
+        self._price_levels = None
 
     @staticmethod
     def __get_price_from_slab(node: Union[SlabInnerNode, SlabLeafNode]) -> int:
@@ -32,14 +49,42 @@ class OrderBook:
         return node.key >> 64
 
     @staticmethod
-    def from_bytes(market_state: MarketState, buffer: Sequence[int]) -> OrderBook:
-        """Decode the given buffer into an order book."""
+    def from_bytes(market_state: MarketState, buffer: Sequence[int], lazy: bool = False) -> OrderBook:
+        """Decode the given buffer into an order book.
+
+        With `lazy` the slab nodes are decoded on demand, which is much cheaper when only the top of the book is read
+        with `get_l2`.
+        """
         # This is a bit hacky at the moment. The first 5 bytes are padding, the
         # total length is 8 bytes which is 5 + 8 = 13 bytes.
         account_flags = t.AccountFlags.from_bytes(buffer[5:13])
-        slab = Slab.from_bytes(buffer[13:])
+        slab = Slab.from_bytes(buffer[13:], lazy)
         return OrderBook(market_state, account_flags, slab)
 
+    @staticmethod
+    def header_from_bytes(buffer: Sequence[int]) -> SlabHeader:
+        """Decode the slab header of an order book from the first `ORDER_BOOK_HEADER_SIZE` bytes of its account, e.g.
+        to check `leaf_count` or `bump_index` before loading the whole book."""
+        account_flags = t.AccountFlags.from_bytes(buffer[5:13])
+        if not account_flags.initialized or not account_flags.bids ^ account_flags.asks:
+            raise Exception("Invalid order book, either not initialized or neither of bids or asks")
+        return Slab.header_from_bytes(buffer[13:ORDER_BOOK_HEADER_SIZE])
+
+    def header(self) -> SlabHeader:
+        return self._slab.header()
+
+    def is_bids(self) -> bool:
+        return self._is_bids
+
+    def best_order(self) -> Optional[t.Order]:
+        """The order with the best price and the highest time priority, found with a single descent of the slab."""
+        node = self._slab.find_max() if self._is_bids else self._slab.find_min()
+        return None if node is None else self.to_order(node)
+
+    def best_price_lots(self) -> Optional[int]:
+        node = self._slab.find_max() if self._is_bids else self._slab.find_min()
+        return None if node is None else self.__get_price_from_slab(node)
+
     def get_l2(self, depth: int) -> List[t.OrderInfo]:
         """Get the Level 2 market information."""
         descending = self._is_bids
@@ -63,25 +108,143 @@ class OrderBook:
             for price_lots, size_lots in levels
         ]
 
+    def price_levels(self) -> PriceLevelIndex:
+        """Index of the price levels of this book for depth, average price and impact price queries.
+
+        It is built on the first call and kept with the book.
+        """
+        if self._price_levels is None:
+            nodes = self._slab.items(self._is_bids)
+            levels = (
+                (price_lots, sum(node.quantity for node in level))
+                for price_lots, level in itertools.groupby(nodes, key=self.__get_price_from_slab)
+            )
+            self._price_levels = PriceLevelIndex(self._market_state, self._is_bids, levels)
+        return self._price_levels
+
+    def to_arrays(self) -> ColumnarOrderBook:
+        """Columnar view of the orders in this book, requires numpy."""
+        from .columnar import ColumnarOrderBook  # pylint: disable=import-outside-toplevel
+
+        return ColumnarOrderBook.from_slab(self._market_state, self._is_bids, self._slab)
+
     def __iter__(self) -> Iterable[t.Order]:
         return self.orders()
 
     def orders(self) -> Iterable[t.Order]:
         for node in self._slab.items():
-            price = self.__get_price_from_slab(node)
-            open_orders_address = node.owner
-
-            yield t.Order(
-                order_id=node.key,
-                client_id=node.client_order_id,
-                open_order_address=open_orders_address,
-                fee_tier=node.fee_tier,
-                info=t.OrderInfo(
-                    price=self._market_state.price_lots_to_number(price),
-                    price_lots=price,
-                    size=self._market_state.base_size_lots_to_number(node.quantity),
-                    size_lots=node.quantity,
-                ),
-                side=Side.BUY if self._is_bids else Side.SELL,
-                open_order_slot=node.owner_slot,
-            )
+            yield self.to_order(node)
+
+    def orders_for_owner(self, open_orders_address: PublicKey) -> List[t.Order]:
+        """Orders of one open orders account, in the order of `orders`."""
+        return self.orders_for_owners([open_orders_address])
+
+    def orders_for_owners(self, open_orders_addresses: Iterable[PublicKey]) -> List[t.Order]:
+        """Orders of the given open orders accounts, in the order of `orders`.
+
+        The first call indexes the leaves of the book by the raw bytes of their owner, later calls only convert the
+        orders of the requested accounts.
+        """
+        index = self.__owner_index()
+        owned = [index[owner] for owner in {bytes(address) for address in open_orders_addresses} if owner in index]
+        if len(owned) == 1:
+            nodes: Iterable[SlabLeafNode] = owned[0]
+        else:
+            nodes = heapq.merge(*owned, key=lambda node: node.key)
+        return [self.to_order(node) for node in nodes]
+
+    def __owner_index(self) -> Dict[bytes, List[SlabLeafNode]]:
+        if self._owner_index is None:
+            index: Dict[bytes, List[SlabLeafNode]] = {}
+            for node in self._slab.items():
+                index.setdefault(bytes(node.owner), []).append(node)
+            self._owner_index = index
+        return self._owner_index
+
+    def to_order(self, node: SlabLeafNode) -> t.Order:
+        """Order of a leaf node of this book's slab."""
+        price = self.__get_price_from_slab(node)
+        open_orders_address = node.owner
+
+        return t.Order(
+            order_id=node.key,
+            client_id=node.client_order_id,
+            open_order_address=open_orders_address,
+            fee_tier=node.fee_tier,
+            info=t.OrderInfo(
+                price=self._market_state.price_lots_to_number(price),
+                price_lots=price,
+                size=self._market_state.base_size_lots_to_number(node.quantity),
+                size_lots=node.quantity,
+            ),
+            side=Side.BUY if self._is_bids else Side.SELL,
+            open_order_slot=node.owner_slot,
+        )
+
+    @staticmethod
+    def __pair_price(pair: Tuple[Optional[SlabLeafNode], Optional[SlabLeafNode]]) -> int:
+        node = pair[0] if pair[0] is not None else pair[1]
+        assert node is not None
+        return node.key >> 64
+
+    @staticmethod
+    def __merge(
+        old_nodes: Iterator[SlabLeafNode], new_nodes: Iterator[SlabLeafNode]
+    ) -> Iterator[Tuple[Optional[SlabLeafNode], Optional[SlabLeafNode]]]:
+        """Pairs of nodes with the same key from two key-sorted sequences, None on the side missing the key."""
+        old_node = next(old_nodes, None)
+        new_node = next(new_nodes, None)
+        while old_node is not None or new_node is not None:
+            if new_node is None or (old_node is not None and old_node.key < new_node.key):
+                yield old_node, None
+                old_node = next(old_nodes, None)
+            elif old_node is None or new_node.key < old_node.key:
+                yield None, new_node
+                new_node = next(new_nodes, None)
+            else:
+                yield old_node, new_node
+                old_node = next(old_nodes, None)
+                new_node = next(new_nodes, None)
+
+    def diff(self, previous: OrderBook) -> t.OrderBookDiff:
+        """Orders added, removed and modified since the `previous` book of the same side, with the L2 levels that
+        changed.
+
+        Both slabs are walked in ascending key order and merged in a single pass. Orders are matched by their 128-bit
+        order id, and only the orders that changed are converted.
+        """
+        if previous.is_bids() != self._is_bids:
+            raise ValueError("Cannot diff order books of different sides.")
+        added: List[t.Order] = []
+        removed: List[t.Order] = []
+        modified: List[t.OrderModification] = []
+        levels: List[t.L2Delta] = []
+        previous_nodes = iter(previous._slab.items())  # pylint: disable=protected-access
+        pairs = OrderBook.__merge(previous_nodes, iter(self._slab.items()))
+        for price_lots, level in itertools.groupby(pairs, key=OrderBook.__pair_price):
+            previous_size = size = 0
+            for old_node, new_node in level:
+                if old_node is not None:
+                    previous_size += old_node.quantity
+                if new_node is not None:
+                    size += new_node.quantity
+                if old_node is not None and new_node is not None:
+                    if old_node.quantity != new_node.quantity:
+                        modified.append(t.OrderModification(previous.to_order(old_node), self.to_order(new_node)))
+                elif old_node is not None:
+                    removed.append(previous.to_order(old_node))
+                elif new_node is not None:
+                    added.append(self.to_order(new_node))
+            if previous_size != size:
+                levels.append(
+                    t.L2Delta(
+                        price=self._market_state.price_lots_to_number(price_lots),
+                        size=self._market_state.base_size_lots_to_number(size),
+                        price_lots=price_lots,
+                        size_lots=size,
+                        previous_size_lots=previous_size,
+                    )
+                )
+        if self._is_bids:
+            levels.reverse()
+        return t.OrderBookDiff(added=added, removed=removed, modified=modified, levels=levels)
@@ -0,0 +1,242 @@
+"""Concurrent polling of the order books of many markets."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from solana.publickey import PublicKey
+
+import pyserum.market.types as t
+
+from .. import async_utils
+from ..async_utils import AsyncClient
+from ..utils import MAX_MULTIPLE_ACCOUNTS
+from .core import MarketCore
+from .orderbook import OrderBook
+
+
+class MarketBookUpdate(NamedTuple):
+    """Order books of a market read at `slot`, `event_queue` is only set when the poller loads it."""
+
+    market: MarketCore
+    slot: int
+    bids: OrderBook
+    asks: OrderBook
+    event_queue: Optional[List[t.Event]]
+
+
+class MarketPollStats(NamedTuple):
+    """Polling statistics of a market, rates are per second since the poller started."""
+
+    target_interval: float
+    refreshes: int
+    errors: int
+    refresh_rate: float
+    mean_latency: float
+    last_slot: Optional[int]
+
+
+class _PollCounters:
+    def __init__(self) -> None:
+        self.refreshes = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.last_slot: Optional[int] = None
+
+    def record_refresh(self, latency: float, slot: int) -> None:
+        self.refreshes += 1
+        self.total_latency += latency
+        self.last_slot = slot
+
+    def record_error(self) -> None:
+        self.errors += 1
+
+    def stats(self, target_interval: float, elapsed: float) -> MarketPollStats:
+        return MarketPollStats(
+            target_interval=target_interval,
+            refreshes=self.refreshes,
+            errors=self.errors,
+            refresh_rate=self.refreshes / elapsed if elapsed > 0 else 0.0,
+            mean_latency=self.total_latency / self.refreshes if self.refreshes else 0.0,
+            last_slot=self.last_slot,
+        )
+
+
+class _ScheduledMarket:
+    def __init__(self, market: MarketCore, interval: float, due: float) -> None:
+        self.market = market
+        self.interval = interval
+        self.next_due = due
+        self.in_flight = False
+        self.counters = _PollCounters()
+
+    def is_due(self, now: float) -> bool:
+        return not self.in_flight and self.next_due <= now
+
+    def reschedule(self, started: float) -> None:
+        # Keep the cadence, a market that fell behind is due right away and is polled before the others.
+        self.next_due = max(self.next_due + self.interval, started)
+        self.in_flight = False
+
+
+# The attributes are the options of the poller, the markets and the state of the loop that polls them.
+class MarketPoller:  # pylint: disable=too-many-instance-attributes
+    """Poll the bids, asks and optionally the event queue of many markets from one event loop.
+
+    Every market has its own refresh interval. The accounts of the markets that are due are fetched with as few
+    getMultipleAccounts requests as possible, the most overdue markets first, with at most `max_in_flight` requests
+    pending at once. The accounts of one market always go in the same request, so its books are read at one slot.
+
+    :param conn: The asyncio connection, see `AsyncMarket`.
+    :param on_update: Called with a `MarketBookUpdate` for every refresh, it may be a coroutine function.
+    :param max_in_flight: Maximum number of concurrent requests.
+    :param include_event_queue: Load and decode the event queue along with the books.
+    :param chunk_size: Maximum number of accounts per request.
+    """
+
+    logger = logging.getLogger("pyserum.market.MarketPoller")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        conn: AsyncClient,
+        on_update: Callable[[MarketBookUpdate], Any],
+        max_in_flight: int = 4,
+        include_event_queue: bool = False,
+        chunk_size: int = MAX_MULTIPLE_ACCOUNTS,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        self._conn = conn
+        self._on_update = on_update
+        self._max_in_flight = max_in_flight
+        self._include_event_queue = include_event_queue
+        if chunk_size < self._accounts_per_market:
+            raise ValueError("chunk_size must fit the accounts of one market.")
+        self._chunk_size = min(chunk_size, MAX_MULTIPLE_ACCOUNTS)
+        self._markets: Dict[str, _ScheduledMarket] = {}
+        # Semaphores are bound to the event loop they are first used in, a new one is made for every loop.
+        self._semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        self._started: Optional[float] = None
+        # Set while `run` is polling, `stop` clears it.
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def _accounts_per_market(self) -> int:
+        return 3 if self._include_event_queue else 2
+
+    def add(self, market: MarketCore, interval: float) -> None:
+        """Poll `market` every `interval` seconds, starting right away."""
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        self._markets[str(market.state.public_key())] = _ScheduledMarket(market, interval, time.monotonic())
+        if self._wake is not None:
+            self._wake.set()
+
+    def remove(self, market_address: PublicKey) -> None:
+        self._markets.pop(str(market_address), None)
+
+    def stats(self) -> Dict[str, MarketPollStats]:
+        """Statistics of every market, keyed by market address."""
+        elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+        return {
+            address: scheduled.counters.stats(scheduled.interval, elapsed)
+            for address, scheduled in self._markets.items()
+        }
+
+    async def poll_once(self) -> int:
+        """Refresh the markets that are due now and wait for them, returns the number of markets refreshed."""
+        tasks = self._dispatch(time.monotonic())
+        await asyncio.gather(*tasks)
+        return sum(len(chunk) for chunk in tasks.values())
+
+    async def run(self) -> None:
+        """Poll until `stop` is called."""
+        running = self._wake = asyncio.Event()
+        pending: Set[asyncio.Future] = set()
+        try:
+            while self._wake is running:
+                now = time.monotonic()
+                pending.update(self._dispatch(now))
+                idle = [scheduled.next_due for scheduled in self._markets.values() if not scheduled.in_flight]
+                timeout = max(min(idle) - now, 0.0) if idle else None
+                running.clear()
+                wake = asyncio.ensure_future(running.wait())
+                done, _ = await asyncio.wait(pending | {wake}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                wake.cancel()
+                pending -= done
+        finally:
+            if self._wake is running:
+                self._wake = None
+            if pending:
+                await asyncio.gather(*pending)
+
+    def stop(self) -> None:
+        wake, self._wake = self._wake, None
+        if wake is not None:
+            wake.set()
+
+    def _dispatch(self, now: float) -> Dict[asyncio.Future, List[_ScheduledMarket]]:
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self._max_in_flight))
+        if self._started is None:
+            self._started = now
+        due = sorted((s for s in self._markets.values() if s.is_due(now)), key=lambda s: s.next_due)
+        markets_per_chunk = self._chunk_size // self._accounts_per_market
+        tasks: Dict[asyncio.Future, List[_ScheduledMarket]] = {}
+        for start in range(0, len(due), markets_per_chunk):
+            chunk = due[start : start + markets_per_chunk]  # noqa: E203
+            for scheduled in chunk:
+                scheduled.in_flight = True
+            tasks[asyncio.ensure_future(self._poll_chunk(chunk))] = chunk
+        return tasks
+
+    def _addresses(self, market: MarketCore) -> List[PublicKey]:
+        addresses = [market.state.bids(), market.state.asks()]
+        if self._include_event_queue:
+            addresses.append(market.state.event_queue())
+        return addresses
+
+    async def _poll_chunk(self, chunk: List[_ScheduledMarket]) -> None:
+        assert self._semaphore is not None
+        async with self._semaphore[1]:
+            started = time.monotonic()
+            addresses = [address for scheduled in chunk for address in self._addresses(scheduled.market)]
+            try:
+                slot, datas = await async_utils.load_multiple_bytes_data(addresses, self._conn)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception("Failed to poll %d markets.", len(chunk))
+                for scheduled in chunk:
+                    scheduled.counters.record_error()
+                    scheduled.reschedule(started)
+                return
+            latency = time.monotonic() - started
+        count = self._accounts_per_market
+        for i, scheduled in enumerate(chunk):
+            market_datas = [data for data in datas[i * count : (i + 1) * count] if data is not None]  # noqa: E203
+            scheduled.reschedule(started)
+            if len(market_datas) < count:
+                scheduled.counters.record_error()
+                self.logger.error("Missing account data for market %s.", scheduled.market.state.public_key())
+                continue
+            scheduled.counters.record_refresh(latency, slot)
+            await self._notify(scheduled.market, slot, market_datas)
+
+    async def _notify(self, market: MarketCore, slot: int, datas: List[bytes]) -> None:
+        # pylint: disable=protected-access
+        try:
+            update = MarketBookUpdate(
+                market=market,
+                slot=slot,
+                bids=market._parse_bids_or_asks(datas[0], address=market.state.bids()),
+                asks=market._parse_bids_or_asks(datas[1], address=market.state.asks()),
+                event_queue=market._parse_event_queue(datas[2]) if self._include_event_queue else None,
+            )
+            result = self._on_update(update)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("Failed to handle the update of market %s.", market.state.public_key())
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import List, NamedTuple
+
+import pyserum.market.types as t
+
+from ..open_orders_account import OpenOrdersAccount
+from .orderbook import OrderBook
+from .state import MarketState
+
+
+class MarketSnapshot(NamedTuple):
+    """Market accounts read together at the same slot."""
+
+    slot: int
+    state: MarketState
+    bids: OrderBook
+    asks: OrderBook
+    event_queue: List[t.Event]
+    request_queue: List[t.Request]
+    open_orders_accounts: List[OpenOrdersAccount]
@@ -1,26 +1,107 @@
 from __future__ import annotations
 
 import math
-from typing import Sequence
+from decimal import Decimal
+from fractions import Fraction
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Union
 
 from construct import Container, Struct  # type: ignore
 from solana.publickey import PublicKey
 from solana.rpc.api import Client
 
-from pyserum.utils import get_mint_decimals, load_bytes_data
+from pyserum import async_utils
+from pyserum.account_cache import AccountCache
+from pyserum.async_utils import AsyncClient
+from pyserum.utils import RPCError, load_bytes_data, load_many_bytes_data
 
+from .._layouts.compiled import compiled
 from .._layouts.market import MARKET_LAYOUT
+from ..mint_decimals import MINT_DECIMALS, MintDecimalsRegistry
 from .types import AccountFlags
 
+if TYPE_CHECKING:
+    import numpy as np  # pylint: disable=unused-import # noqa:F401
+
+
+# Fields of the market layout holding a public key, converted once when the state is created.
+_PUBLIC_KEY_FIELDS = (
+    "own_address",
+    "base_mint",
+    "quote_mint",
+    "base_vault",
+    "quote_vault",
+    "request_queue",
+    "event_queue",
+    "bids",
+    "asks",
+)
+
+ExactNumber = Union[int, Fraction, Decimal, str]
+
+
+class MarketState:  # pylint: disable=too-many-public-methods,too-many-instance-attributes
+    """Decoded market account.
+
+    The state is immutable: public keys and conversion factors are computed once when it is created.
+    """
+
+    __slots__ = (
+        "_decoded",
+        "_program_id",
+        "_base_mint_decimals",
+        "_quote_mint_decimals",
+        "_account_flags",
+        "_public_keys",
+        "_base_lot_size",
+        "_quote_lot_size",
+        "_base_multiplier",
+        "_quote_multiplier",
+        "_price_numerator",
+        "_price_denominator",
+        "_price_to_lots_denominator",
+    )
+
+    _decoded: Container
+    _program_id: PublicKey
+    _base_mint_decimals: int
+    _quote_mint_decimals: int
+    _account_flags: AccountFlags
+    _public_keys: Dict[str, PublicKey]
+    _base_lot_size: int
+    _quote_lot_size: int
+    _base_multiplier: int
+    _quote_multiplier: int
+    _price_numerator: int
+    _price_denominator: int
+    _price_to_lots_denominator: int
 
-class MarketState:  # pylint: disable=too-many-public-methods
     def __init__(
         self, parsed_market: Container, program_id: PublicKey, base_mint_decimals: int, quote_mint_decimals: int
     ) -> None:
-        self._decoded = parsed_market
-        self._program_id = program_id
-        self._base_mint_decimals = base_mint_decimals
-        self._quote_mint_decimals = quote_mint_decimals
+        init = super().__setattr__
+        init("_decoded", parsed_market)
+        init("_program_id", program_id)
+        init("_base_mint_decimals", base_mint_decimals)
+        init("_quote_mint_decimals", quote_mint_decimals)
+        flags = parsed_market.account_flags
+        init("_account_flags", AccountFlags(*(getattr(flags, field) for field in AccountFlags._fields)))
+        public_keys: Dict[str, PublicKey] = {
+            field: PublicKey(parsed_market[field]) for field in _PUBLIC_KEY_FIELDS if field in parsed_market
+        }
+        init("_public_keys", public_keys)
+        base_lot_size, quote_lot_size = parsed_market.base_lot_size, parsed_market.quote_lot_size
+        base_multiplier, quote_multiplier = 10 ** base_mint_decimals, 10 ** quote_mint_decimals
+        init("_base_lot_size", base_lot_size)
+        init("_quote_lot_size", quote_lot_size)
+        init("_base_multiplier", base_multiplier)
+        init("_quote_multiplier", quote_multiplier)
+        # price = price_lots * price_numerator / price_denominator
+        init("_price_numerator", quote_lot_size * base_multiplier)
+        init("_price_denominator", base_lot_size * quote_multiplier)
+        init("_price_to_lots_denominator", base_multiplier * quote_lot_size)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("MarketState is immutable.")
 
     @staticmethod
     def LAYOUT() -> Struct:  # pylint: disable=invalid-name
@@ -28,68 +109,146 @@ class MarketState:  # pylint: disable=too-many-public-methods
         return MARKET_LAYOUT
 
     @staticmethod
-    def load(conn: Client, market_address: PublicKey, program_id: PublicKey) -> MarketState:
-        bytes_data = load_bytes_data(market_address, conn)
-        parsed_market = MARKET_LAYOUT.parse(bytes_data)
+    def __parse(buffer: Sequence[int]) -> Container:
+        parsed_market = compiled(MARKET_LAYOUT).parse(buffer)
         # TODO: add ownAddress check!
 
         if not parsed_market.account_flags.initialized or not parsed_market.account_flags.market:
             raise Exception("Invalid market")
+        return parsed_market
 
-        base_mint_decimals = get_mint_decimals(conn, PublicKey(parsed_market.base_mint))
-        quote_mint_decimals = get_mint_decimals(conn, PublicKey(parsed_market.quote_mint))
-        return MarketState(parsed_market, program_id, base_mint_decimals, quote_mint_decimals)
+    @staticmethod
+    def __parse_many(datas: List[Optional[bytes]]) -> List[Container]:
+        parsed_markets = []
+        for data in datas:
+            if data is None:
+                raise RPCError("Cannot load byte data.")
+            parsed_markets.append(MarketState.__parse(data))
+        return parsed_markets
 
     @staticmethod
-    def from_bytes(
-        program_id: PublicKey, base_mint_decimals: int, quote_mint_decimals: int, buffer: Sequence[int]
+    def __mints(parsed_markets: List[Container]) -> List[PublicKey]:
+        return [PublicKey(mint) for market in parsed_markets for mint in (market.base_mint, market.quote_mint)]
+
+    @staticmethod
+    def __from_parsed_many(
+        parsed_markets: List[Container], program_id: PublicKey, decimals: List[int]
+    ) -> List[MarketState]:
+        return [
+            MarketState(parsed_market, program_id, decimals[2 * i], decimals[2 * i + 1])
+            for i, parsed_market in enumerate(parsed_markets)
+        ]
+
+    @staticmethod
+    def load(
+        conn: Client,
+        market_address: PublicKey,
+        program_id: PublicKey,
+        registry: Optional[MintDecimalsRegistry] = None,
+        account_cache: Optional[AccountCache] = None,
     ) -> MarketState:
-        parsed_market = MARKET_LAYOUT.parse(buffer)
-        # TODO: add ownAddress check!
+        """Load a market, the decimals of its mints are read from `registry` (the process-wide one by default) and
+        fetched in a single request when missing.
+
+        :param account_cache: Where the market account is kept, for the time to live of "market" accounts.
+        """
+        parsed_market = MarketState.__parse(load_bytes_data(market_address, conn, cache=account_cache, kind="market"))
+        registry = MINT_DECIMALS if registry is None else registry
+        base_mint_decimals, quote_mint_decimals = registry.load(
+            conn, [PublicKey(parsed_market.base_mint), PublicKey(parsed_market.quote_mint)]
+        )
+        return MarketState(parsed_market, program_id, base_mint_decimals, quote_mint_decimals)
 
-        if not parsed_market.account_flags.initialized or not parsed_market.account_flags.market:
-            raise Exception("Invalid market")
+    @staticmethod
+    def load_many(
+        conn: Client,
+        market_addresses: Sequence[PublicKey],
+        program_id: PublicKey,
+        registry: Optional[MintDecimalsRegistry] = None,
+    ) -> List[MarketState]:
+        """Load many markets with one getMultipleAccounts request per 100 markets, plus the requests for the mints
+        that are not in `registry` yet.
+        """
+        parsed_markets = MarketState.__parse_many(load_many_bytes_data(market_addresses, conn))
+        registry = MINT_DECIMALS if registry is None else registry
+        decimals = registry.load(conn, MarketState.__mints(parsed_markets))
+        return MarketState.__from_parsed_many(parsed_markets, program_id, decimals)
 
+    @staticmethod
+    async def async_load(
+        conn: AsyncClient,
+        market_address: PublicKey,
+        program_id: PublicKey,
+        registry: Optional[MintDecimalsRegistry] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> MarketState:
+        """Awaitable version of `load`."""
+        parsed_market = MarketState.__parse(
+            await async_utils.load_bytes_data(market_address, conn, cache=account_cache, kind="market")
+        )
+        registry = MINT_DECIMALS if registry is None else registry
+        base_mint_decimals, quote_mint_decimals = await registry.async_load(
+            conn, [PublicKey(parsed_market.base_mint), PublicKey(parsed_market.quote_mint)]
+        )
         return MarketState(parsed_market, program_id, base_mint_decimals, quote_mint_decimals)
 
+    @staticmethod
+    async def async_load_many(
+        conn: AsyncClient,
+        market_addresses: Sequence[PublicKey],
+        program_id: PublicKey,
+        registry: Optional[MintDecimalsRegistry] = None,
+    ) -> List[MarketState]:
+        """Awaitable version of `load_many`."""
+        parsed_markets = MarketState.__parse_many(await async_utils.load_many_bytes_data(market_addresses, conn))
+        registry = MINT_DECIMALS if registry is None else registry
+        decimals = await registry.async_load(conn, MarketState.__mints(parsed_markets))
+        return MarketState.__from_parsed_many(parsed_markets, program_id, decimals)
+
+    @staticmethod
+    def from_bytes(
+        program_id: PublicKey, base_mint_decimals: int, quote_mint_decimals: int, buffer: Sequence[int]
+    ) -> MarketState:
+        return MarketState(MarketState.__parse(buffer), program_id, base_mint_decimals, quote_mint_decimals)
+
     def program_id(self) -> PublicKey:
         return self._program_id
 
     def public_key(self) -> PublicKey:
-        return PublicKey(self._decoded.own_address)
+        return self._public_keys["own_address"]
 
     def account_flags(self) -> AccountFlags:
-        return AccountFlags(**self._decoded.account_flags)
+        return self._account_flags
 
     def asks(self) -> PublicKey:
-        return PublicKey(self._decoded.asks)
+        return self._public_keys["asks"]
 
     def bids(self) -> PublicKey:
-        return PublicKey(self._decoded.bids)
+        return self._public_keys["bids"]
 
     def fee_rate_bps(self) -> int:
         return self._decoded.fee_rate_bps
 
     def event_queue(self) -> PublicKey:
-        return PublicKey(self._decoded.event_queue)
+        return self._public_keys["event_queue"]
 
     def request_queue(self) -> PublicKey:
-        return PublicKey(self._decoded.request_queue)
+        return self._public_keys["request_queue"]
 
     def vault_signer_nonce(self) -> int:
         return self._decoded.vault_signer_nonce
 
     def base_mint(self) -> PublicKey:
-        return PublicKey(self._decoded.base_mint)
+        return self._public_keys["base_mint"]
 
     def quote_mint(self) -> PublicKey:
-        return PublicKey(self._decoded.quote_mint)
+        return self._public_keys["quote_mint"]
 
     def base_vault(self) -> PublicKey:
-        return PublicKey(self._decoded.base_vault)
+        return self._public_keys["base_vault"]
 
     def quote_vault(self) -> PublicKey:
-        return PublicKey(self._decoded.quote_vault)
+        return self._public_keys["quote_vault"]
 
     def base_deposits_total(self) -> int:
         return self._decoded.base_deposits_total
@@ -113,44 +272,104 @@ class MarketState:  # pylint: disable=too-many-public-methods
         return self._quote_mint_decimals
 
     def base_spl_token_multiplier(self) -> int:
-        return 10 ** self._base_mint_decimals
+        return self._base_multiplier
 
     def quote_spl_token_multiplier(self) -> int:
-        return 10 ** self._quote_mint_decimals
+        return self._quote_multiplier
 
     def base_spl_size_to_number(self, size: int) -> float:
-        return size / self.base_spl_token_multiplier()
+        return size / self._base_multiplier
 
     def quote_spl_size_to_number(self, size: int) -> float:
-        return size / self.quote_spl_token_multiplier()
+        return size / self._quote_multiplier
 
     def base_lot_size(self) -> int:
-        return self._decoded.base_lot_size
+        return self._base_lot_size
 
     def quote_lot_size(self) -> int:
-        return self._decoded.quote_lot_size
+        return self._quote_lot_size
 
     def price_lots_to_number(self, price: int) -> float:
-        return float(price * self.quote_lot_size() * self.base_spl_token_multiplier()) / (
-            self.base_lot_size() * self.quote_spl_token_multiplier()
-        )
+        return float(price * self._price_numerator) / self._price_denominator
+
+    def price_lots_to_numbers(self, prices: Iterable[int]) -> List[float]:
+        numerator, denominator = self._price_numerator, self._price_denominator
+        return [float(price * numerator) / denominator for price in prices]
+
+    def price_lots_to_fraction(self, price: int) -> Fraction:
+        """Exact price of `price` lots."""
+        return Fraction(price * self._price_numerator, self._price_denominator)
+
+    def price_lots_to_number_array(self, prices: "np.ndarray") -> "np.ndarray":
+        """Vectorized `price_lots_to_number`, requires numpy."""
+        from ._internal.numeric import lots_to_number  # pylint: disable=import-outside-toplevel
+
+        return lots_to_number(prices, self._price_numerator, self._price_denominator)
 
     def price_number_to_lots(self, price: float) -> int:
-        return int(
-            round(
-                (price * self.quote_spl_token_multiplier() * self.base_lot_size())
-                / (self.base_spl_token_multiplier() * self.quote_lot_size())
-            )
-        )
+        return int(round((price * self._quote_multiplier * self._base_lot_size) / self._price_to_lots_denominator))
+
+    def price_numbers_to_lots(self, prices: Iterable[float]) -> List[int]:
+        quote_multiplier, base_lot_size = self._quote_multiplier, self._base_lot_size
+        denominator = self._price_to_lots_denominator
+        return [int(round((price * quote_multiplier * base_lot_size) / denominator)) for price in prices]
+
+    def price_exact_to_lots(self, price: ExactNumber) -> int:
+        """Price in lots computed with rational arithmetic, rounded half to even like `price_number_to_lots`."""
+        return round(Fraction(price) * self._quote_multiplier * self._base_lot_size / self._price_to_lots_denominator)
 
     def base_size_lots_to_number(self, size: int) -> float:
-        return float(size * self.base_lot_size()) / self.base_spl_token_multiplier()
+        return float(size * self._base_lot_size) / self._base_multiplier
+
+    def base_size_lots_to_numbers(self, sizes: Iterable[int]) -> List[float]:
+        base_lot_size, base_multiplier = self._base_lot_size, self._base_multiplier
+        return [float(size * base_lot_size) / base_multiplier for size in sizes]
+
+    def base_size_lots_to_fraction(self, size: int) -> Fraction:
+        """Exact base size of `size` lots."""
+        return Fraction(size * self._base_lot_size, self._base_multiplier)
+
+    def base_size_lots_to_number_array(self, sizes: "np.ndarray") -> "np.ndarray":
+        """Vectorized `base_size_lots_to_number`, requires numpy."""
+        from ._internal.numeric import lots_to_number  # pylint: disable=import-outside-toplevel
+
+        return lots_to_number(sizes, self._base_lot_size, self._base_multiplier)
 
     def base_size_number_to_lots(self, size: float) -> int:
-        return int(math.floor(size * self.base_spl_token_multiplier()) / self.base_lot_size())
+        return int(math.floor(size * self._base_multiplier) / self._base_lot_size)
+
+    def base_size_numbers_to_lots(self, sizes: Iterable[float]) -> List[int]:
+        base_multiplier, base_lot_size = self._base_multiplier, self._base_lot_size
+        return [int(math.floor(size * base_multiplier) / base_lot_size) for size in sizes]
+
+    def base_size_exact_to_lots(self, size: ExactNumber) -> int:
+        """Base size in lots computed with rational arithmetic, rounded down."""
+        return math.floor(Fraction(size) * self._base_multiplier / self._base_lot_size)
 
     def quote_size_lots_to_number(self, size: int) -> float:
-        return float(size * self.quote_lot_size()) / self.quote_spl_token_multiplier()
+        return float(size * self._quote_lot_size) / self._quote_multiplier
+
+    def quote_size_lots_to_numbers(self, sizes: Iterable[int]) -> List[float]:
+        quote_lot_size, quote_multiplier = self._quote_lot_size, self._quote_multiplier
+        return [float(size * quote_lot_size) / quote_multiplier for size in sizes]
+
+    def quote_size_lots_to_fraction(self, size: int) -> Fraction:
+        """Exact quote size of `size` lots."""
+        return Fraction(size * self._quote_lot_size, self._quote_multiplier)
+
+    def quote_size_lots_to_number_array(self, sizes: "np.ndarray") -> "np.ndarray":
+        """Vectorized `quote_size_lots_to_number`, requires numpy."""
+        from ._internal.numeric import lots_to_number  # pylint: disable=import-outside-toplevel
+
+        return lots_to_number(sizes, self._quote_lot_size, self._quote_multiplier)
 
     def quote_size_number_to_lots(self, size: float) -> int:
-        return int(math.floor(size * self.quote_spl_token_multiplier()) / self.quote_lot_size())
+        return int(math.floor(size * self._quote_multiplier) / self._quote_lot_size)
+
+    def quote_size_numbers_to_lots(self, sizes: Iterable[float]) -> List[int]:
+        quote_multiplier, quote_lot_size = self._quote_multiplier, self._quote_lot_size
+        return [int(math.floor(size * quote_multiplier) / quote_lot_size) for size in sizes]
+
+    def quote_size_exact_to_lots(self, size: ExactNumber) -> int:
+        """Quote size in lots computed with rational arithmetic, rounded down."""
+        return math.floor(Fraction(size) * self._quote_multiplier / self._quote_lot_size)
@@ -0,0 +1,146 @@
+"""Streaming of order book and event queue updates over the RPC websocket, requires websockets."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Union
+
+from solana.rpc.commitment import Commitment, Recent
+
+import pyserum.market.types as t
+
+from ..utils import RPCError
+from .core import MarketCore
+from .orderbook import OrderBook
+
+BIDS = "bids"
+ASKS = "asks"
+EVENT_QUEUE = "event_queue"
+
+
+class MarketStreamUpdate(NamedTuple):
+    """The `account` of the market (`BIDS`, `ASKS` or `EVENT_QUEUE`) changed at `slot`, `value` is its new content."""
+
+    account: str
+    slot: int
+    value: Union[OrderBook, List[t.Event]]
+
+
+class _ConnectionOptions(NamedTuple):
+    endpoint: str
+    max_message_size: Optional[int]
+    reconnect_delay: float
+    max_reconnect_delay: float
+
+
+class MarketStream:
+    """Async iterator over the updates of a market's accounts, pushed by `accountSubscribe` notifications.
+
+    The connection is opened when iteration starts. When it drops, the stream reconnects with exponential backoff and
+    subscribes again, so iteration only ends with `close`. A subscription rejected by the node is not retried, the
+    iteration raises `RPCError`.
+
+    :param market: The market to follow, `Market` or `AsyncMarket`.
+    :param endpoint: Websocket URL of the RPC node, e.g. `wss://api.mainnet-beta.solana.com`.
+    :param accounts: The accounts to subscribe to among `BIDS`, `ASKS` and `EVENT_QUEUE`.
+    :param max_message_size: Largest notification accepted, unlimited by default since a full event queue notification
+        is above 1MB.
+    """
+
+    logger = logging.getLogger("pyserum.market.MarketStream")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        market: MarketCore,
+        endpoint: str,
+        accounts: Sequence[str] = (BIDS, ASKS, EVENT_QUEUE),
+        commitment: Commitment = Recent,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        max_message_size: Optional[int] = None,
+    ) -> None:
+        unknown = set(accounts) - {BIDS, ASKS, EVENT_QUEUE}
+        if unknown:
+            raise ValueError("Unknown accounts %s." % sorted(unknown))
+        self._market = market
+        self._accounts = list(accounts)
+        self._commitment = commitment
+        self._options = _ConnectionOptions(endpoint, max_message_size, reconnect_delay, max_reconnect_delay)
+        self._websocket: Optional[Any] = None
+        self._closed = False
+        self.connections = 0
+
+    def __aiter__(self) -> AsyncIterator[MarketStreamUpdate]:
+        return self.updates()
+
+    async def updates(self) -> AsyncIterator[MarketStreamUpdate]:
+        import websockets  # pylint: disable=import-outside-toplevel
+
+        options = self._options
+        delay = options.reconnect_delay
+        while not self._closed:
+            try:
+                async with websockets.connect(options.endpoint, max_size=options.max_message_size) as websocket:
+                    self._websocket = websocket
+                    self.connections += 1
+                    # Maps request ids to accounts until the subscription ids are known.
+                    requests: Dict[int, str] = {}
+                    subscriptions: Dict[int, str] = {}
+                    for request_id, account in enumerate(self._accounts, 1):
+                        requests[request_id] = account
+                        await websocket.send(self._subscribe_request(request_id, account))
+                    async for message in websocket:
+                        update = self._handle(json.loads(message), requests, subscriptions)
+                        if update is not None:
+                            delay = options.reconnect_delay
+                            yield update
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as err:
+                if self._closed:
+                    break
+                self.logger.warning("Market stream connection failed: %s.", err)
+            finally:
+                self._websocket = None
+            if not self._closed:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, options.max_reconnect_delay)
+
+    async def close(self) -> None:
+        """Stop the stream, the iteration ends after the update being processed."""
+        self._closed = True
+        if self._websocket is not None:
+            await self._websocket.close()
+
+    def _subscribe_request(self, request_id: int, account: str) -> str:
+        address = getattr(self._market.state, account)()
+        params = [str(address), {"encoding": "base64", "commitment": self._commitment}]
+        return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "accountSubscribe", "params": params})
+
+    def _handle(
+        self, message: Dict[str, Any], requests: Dict[int, str], subscriptions: Dict[int, str]
+    ) -> Optional[MarketStreamUpdate]:
+        if "id" in message:
+            requested = requests.pop(message["id"], None)
+            if requested is None:
+                return None
+            if "error" in message:
+                raise RPCError("Cannot subscribe to %s: %s" % (requested, message["error"]), message)
+            subscriptions[message["result"]] = requested
+            return None
+        if message.get("method") != "accountNotification":
+            return None
+        params = message["params"]
+        account = subscriptions.get(params["subscription"])
+        if account is None:
+            return None
+        result = params["result"]
+        data = base64.b64decode(result["value"]["data"][0])
+        value: Union[OrderBook, List[t.Event]] = (
+            self._market._parse_event_queue(data)  # pylint: disable=protected-access
+            if account == EVENT_QUEUE
+            else self._market._parse_bids_or_asks(  # pylint: disable=protected-access
+                data, address=getattr(self._market.state, account)()
+            )
+        )
+        return MarketStreamUpdate(account=account, slot=result["context"]["slot"], value=value)
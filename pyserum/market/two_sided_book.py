@@ -0,0 +1,132 @@
+"""Bids and asks of a market read at the same slot, with cached top of book statistics."""
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pyserum.market.types as t
+
+from .orderbook import OrderBook
+from .snapshot import MarketSnapshot
+from .state import MarketState
+
+
+class TwoSidedBook:
+    """Both sides of a market with the best prices, spread, mid price, microprice and imbalance computed on demand.
+
+    Results are cached until either side is replaced. Best prices come from a single descent of each slab, and the
+    statistics at a depth only walk the first `depth` levels of each side.
+    """
+
+    def __init__(self, market_state: MarketState, bids: OrderBook, asks: OrderBook, slot: Optional[int] = None):
+        if not bids.is_bids() or asks.is_bids():
+            raise ValueError("Expected a bid book and an ask book.")
+        self._market_state = market_state
+        self._bids = bids
+        self._asks = asks
+        self._slot = slot
+        self._cache: Dict[Tuple[Any, ...], Any] = {}
+
+    @staticmethod
+    def from_snapshot(snapshot: MarketSnapshot) -> TwoSidedBook:
+        return TwoSidedBook(snapshot.state, snapshot.bids, snapshot.asks, snapshot.slot)
+
+    @property
+    def bids(self) -> OrderBook:
+        return self._bids
+
+    @property
+    def asks(self) -> OrderBook:
+        return self._asks
+
+    @property
+    def slot(self) -> Optional[int]:
+        return self._slot
+
+    def update(
+        self, bids: Optional[OrderBook] = None, asks: Optional[OrderBook] = None, slot: Optional[int] = None
+    ) -> None:
+        """Replace one or both sides and drop the cached results."""
+        if bids is not None:
+            if not bids.is_bids():
+                raise ValueError("Expected a bid book.")
+            self._bids = bids
+        if asks is not None:
+            if asks.is_bids():
+                raise ValueError("Expected an ask book.")
+            self._asks = asks
+        if slot is not None:
+            self._slot = slot
+        self._cache.clear()
+
+    def __cached(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def best_bid_price_lots(self) -> Optional[int]:
+        return self.__cached(("best_bid",), self._bids.best_price_lots)
+
+    def best_ask_price_lots(self) -> Optional[int]:
+        return self.__cached(("best_ask",), self._asks.best_price_lots)
+
+    def best_bid(self) -> Optional[t.OrderInfo]:
+        """The best bid level with its total size."""
+        levels = self.levels(1)[0]
+        return levels[0] if levels else None
+
+    def best_ask(self) -> Optional[t.OrderInfo]:
+        """The best ask level with its total size."""
+        levels = self.levels(1)[1]
+        return levels[0] if levels else None
+
+    def levels(self, depth: int) -> Tuple[List[t.OrderInfo], List[t.OrderInfo]]:
+        """The first `depth` bid and ask levels, like `OrderBook.get_l2`."""
+        return self.__cached(("levels", depth), lambda: (self._bids.get_l2(depth), self._asks.get_l2(depth)))
+
+    def spread_lots(self) -> Optional[int]:
+        """None when either side is empty, negative when the book is crossed."""
+        bid, ask = self.best_bid_price_lots(), self.best_ask_price_lots()
+        return None if bid is None or ask is None else ask - bid
+
+    def spread(self) -> Optional[float]:
+        spread_lots = self.spread_lots()
+        return None if spread_lots is None else self._market_state.price_lots_to_number(spread_lots)
+
+    def mid_price_lots(self) -> Optional[Fraction]:
+        bid, ask = self.best_bid_price_lots(), self.best_ask_price_lots()
+        return None if bid is None or ask is None else Fraction(bid + ask, 2)
+
+    def mid_price(self) -> Optional[float]:
+        mid_price_lots = self.mid_price_lots()
+        if mid_price_lots is None:
+            return None
+        return float(mid_price_lots * self._market_state.price_lots_to_fraction(1))
+
+    def __sizes_lots(self, depth: int) -> Tuple[int, int]:
+        def compute() -> Tuple[int, int]:
+            bids, asks = self.levels(depth)
+            return sum(level.size_lots for level in bids), sum(level.size_lots for level in asks)
+
+        return self.__cached(("sizes", depth), compute)
+
+    def microprice_lots(self, depth: int = 1) -> Optional[Fraction]:
+        """Best bid and ask prices weighted by the size of the opposite side over the first `depth` levels."""
+        bid, ask = self.best_bid_price_lots(), self.best_ask_price_lots()
+        if bid is None or ask is None:
+            return None
+        bid_size, ask_size = self.__sizes_lots(depth)
+        return Fraction(bid * ask_size + ask * bid_size, bid_size + ask_size)
+
+    def microprice(self, depth: int = 1) -> Optional[float]:
+        microprice_lots = self.microprice_lots(depth)
+        if microprice_lots is None:
+            return None
+        return float(microprice_lots * self._market_state.price_lots_to_fraction(1))
+
+    def imbalance(self, depth: int = 1) -> Optional[float]:
+        """`(bid size - ask size) / (bid size + ask size)` over the first `depth` levels, None if both are empty."""
+        bid_size, ask_size = self.__sizes_lots(depth)
+        if bid_size + ask_size == 0:
+            return None
+        return (bid_size - ask_size) / (bid_size + ask_size)
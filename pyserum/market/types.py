@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import NamedTuple, Sequence
+from fractions import Fraction
+from typing import List, NamedTuple, Optional, Sequence
 
 from solana.publickey import PublicKey
 
 from .._layouts.account_flags import ACCOUNT_FLAGS_LAYOUT
+from .._layouts.compiled import compiled
 from ..enums import Side
 
 
@@ -26,7 +28,7 @@ class AccountFlags(NamedTuple):
 
     @staticmethod
     def from_bytes(buffer: Sequence[int]) -> AccountFlags:
-        con = ACCOUNT_FLAGS_LAYOUT.parse(buffer)
+        con = compiled(ACCOUNT_FLAGS_LAYOUT).parse(buffer)
         return AccountFlags(
             initialized=con.initialized,
             market=con.market,
@@ -79,6 +81,97 @@ class Order(NamedTuple):
     """"""
 
 
+class OrderModification(NamedTuple):
+    previous: Order
+    """The order in the previous book."""
+    order: Order
+    """The same order, with its remaining quantity, in the current book."""
+
+
+class L2Delta(NamedTuple):
+    price: float
+    """"""
+    size: float
+    """Size of the level in the current book, 0 if it was removed."""
+    price_lots: int
+    """"""
+    size_lots: int
+    """"""
+    previous_size_lots: int
+    """Size of the level in the previous book, 0 if it was added."""
+
+
+class OrderBookDiff(NamedTuple):
+    added: List[Order]
+    """Orders only in the current book."""
+    removed: List[Order]
+    """Orders only in the previous book."""
+    modified: List[OrderModification]
+    """Orders in both books with a different quantity."""
+    levels: List[L2Delta]
+    """Price levels whose size changed, in book order."""
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.modified)
+
+
+class Depth(NamedTuple):
+    size: float
+    """"""
+    size_lots: int
+    """"""
+    quote_size: float
+    """Value of the size at the prices of the levels."""
+    quote_size_lots: int
+    """"""
+    levels: int
+    """Number of price levels included."""
+
+
+class FillEstimate(NamedTuple):
+    size: float
+    """"""
+    size_lots: int
+    """"""
+    quote_size: float
+    """"""
+    quote_size_lots: int
+    """"""
+    average_price: float
+    """Volume weighted average price of the fill."""
+    average_price_lots: Fraction
+    """"""
+    impact_price: float
+    """Price of the last level reached by the fill."""
+    impact_price_lots: int
+    """"""
+    levels: int
+    """Number of price levels reached by the fill."""
+
+
+class TakerFill(NamedTuple):
+    size: float
+    """Filled base size."""
+    size_lots: int
+    """"""
+    quote_size: float
+    """Traded quote size before fees."""
+    quote_size_lots: int
+    """"""
+    average_price: Optional[float]
+    """None when nothing is filled."""
+    average_price_lots: Optional[Fraction]
+    """"""
+    fee: float
+    """Taker fee in quote tokens, paid on top of the quote size by bids and taken from it by asks."""
+    native_fee: int
+    """"""
+    leftover: float
+    """Base size of the order that is not filled."""
+    leftover_lots: int
+    """"""
+
+
 class ReuqestFlags(NamedTuple):
     new_order: bool
     cancel_order: bool
@@ -0,0 +1,104 @@
+"""Registry of the decimals of token mints."""
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from solana.publickey import PublicKey
+from solana.rpc.api import Client
+from spl.token.constants import WRAPPED_SOL_MINT  # type: ignore # TODO: Remove ignore.
+
+from . import async_utils
+from ._layouts.compiled import compiled
+from ._layouts.market import MINT_LAYOUT
+from .async_utils import AsyncClient
+from .utils import RPCError, load_many_bytes_data
+
+
+class MintDecimalsRegistry:
+    """Thread safe cache of mint decimals, which never change once a mint is created.
+
+    :param path: Optional JSON file the registry is read from and written back to whenever new mints are loaded, so
+        that a restarted process does not need to fetch them again.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._lock = threading.Lock()
+        # Serializes the writes of the file, which happen outside `_lock` so that lookups do not wait for them.
+        self._save_lock = threading.Lock()
+        self._decimals: Dict[str, int] = {str(WRAPPED_SOL_MINT): 9}
+        self._path: Optional[str] = None
+        if path is not None:
+            self.attach(path)
+
+    def __len__(self) -> int:
+        return len(self._decimals)
+
+    def __contains__(self, mint: object) -> bool:
+        return str(mint) in self._decimals
+
+    def attach(self, path: str) -> None:
+        """Read the decimals stored in `path`, if it exists, and persist new entries to it from now on."""
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as input_file:
+                stored = json.load(input_file)
+            with self._lock:
+                self._decimals.update((mint, int(decimals)) for mint, decimals in stored.items())
+        with self._lock:
+            self._path = path
+
+    def get(self, mint: PublicKey) -> Optional[int]:
+        return self._decimals.get(str(mint))
+
+    def set(self, mint: PublicKey, decimals: int) -> None:
+        self.update({str(mint): decimals})
+
+    def update(self, decimals: Dict[str, int]) -> None:
+        """Add the decimals of several mints, keyed by base58 address."""
+        with self._lock:
+            self._decimals.update(decimals)
+        self._save()
+
+    def load(self, conn: Client, mints: Iterable[PublicKey]) -> List[int]:
+        """Decimals of `mints`, the mints that are not in the registry yet are fetched with getMultipleAccounts."""
+        mints = list(mints)
+        missing = self._missing(mints)
+        if missing:
+            self._store(missing, load_many_bytes_data(list(missing.values()), conn))
+        return [self._decimals[str(mint)] for mint in mints]
+
+    async def async_load(self, conn: AsyncClient, mints: Iterable[PublicKey]) -> List[int]:
+        """Awaitable version of `load`."""
+        mints = list(mints)
+        missing = self._missing(mints)
+        if missing:
+            self._store(missing, await async_utils.load_many_bytes_data(list(missing.values()), conn))
+        return [self._decimals[str(mint)] for mint in mints]
+
+    def _missing(self, mints: List[PublicKey]) -> Dict[str, PublicKey]:
+        return {str(mint): mint for mint in mints if str(mint) not in self._decimals}
+
+    def _store(self, missing: Dict[str, PublicKey], datas: List[Optional[bytes]]) -> None:
+        loaded: Dict[str, int] = {}
+        for mint, data in zip(missing, datas):
+            if data is None:
+                raise RPCError("Cannot load byte data.")
+            loaded[mint] = compiled(MINT_LAYOUT).parse(data).decimals
+        self.update(loaded)
+
+    def _save(self) -> None:
+        with self._save_lock:
+            # The snapshot is taken once the previous write is done, so the last write holds every update.
+            with self._lock:
+                path = self._path
+                decimals = dict(self._decimals)
+            if path is None:
+                return
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as output_file:
+                json.dump(decimals, output_file, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+
+
+# Registry shared by the whole process, attach a file with `MINT_DECIMALS.attach(path)` to keep it across restarts.
+MINT_DECIMALS = MintDecimalsRegistry()
@@ -1,18 +1,31 @@
 from __future__ import annotations
 
 import base64
-from typing import List, NamedTuple, Sequence
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from solana.publickey import PublicKey
 from solana.rpc.api import Client
-from solana.rpc.commitment import Recent
-from solana.rpc.types import Commitment, MemcmpOpts
+from solana.rpc.commitment import Max, Recent
+from solana.rpc.types import Commitment, MemcmpOpts, RPCResponse
 from solana.system_program import CreateAccountParams, create_account
 from solana.transaction import TransactionInstruction
 
-from ._layouts.open_orders import OPEN_ORDERS_LAYOUT
+from ._layouts.account_flags import INITIALIZED_FLAG, OPEN_ORDERS_FLAG
+from ._layouts.open_orders import (
+    OPEN_ORDERS_CLIENT_ID_STRUCT,
+    OPEN_ORDERS_CLIENT_IDS_OFFSET,
+    OPEN_ORDERS_HEADER_STRUCT,
+    OPEN_ORDERS_LAYOUT,
+    OPEN_ORDERS_ORDER_STRUCT,
+    OPEN_ORDERS_ORDERS_OFFSET,
+    OPEN_ORDERS_SLOTS,
+)
+from .account_cache import AccountCache
 from .instructions import DEFAULT_DEX_PROGRAM_ID
-from .utils import load_bytes_data
+from .single_flight import SingleFlight
+from .utils import as_memoryview, load_bytes_data
+
+_ALL_SLOTS_MASK = (1 << OPEN_ORDERS_SLOTS) - 1
 
 
 class ProgramAccount(NamedTuple):
@@ -23,6 +36,22 @@ class ProgramAccount(NamedTuple):
     owner: PublicKey
 
 
+class _OpenOrdersHeader(NamedTuple):
+    """Fields of `OPEN_ORDERS_HEADER_STRUCT`."""
+
+    account_flags: int
+    market: bytes
+    owner: bytes
+    base_token_free: int
+    base_token_total: int
+    quote_token_free: int
+    quote_token_total: int
+    free_slot_bits_lo: int
+    free_slot_bits_hi: int
+    is_bid_bits_lo: int
+    is_bid_bits_hi: int
+
+
 class OpenOrdersAccount:
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-instance-attributes
@@ -54,29 +83,78 @@ class OpenOrdersAccount:
 
     @staticmethod
     def from_bytes(address: PublicKey, buffer: Sequence[int]) -> OpenOrdersAccount:
-        open_order_decoded = OPEN_ORDERS_LAYOUT.parse(buffer)
-        if not open_order_decoded.account_flags.open_orders or not open_order_decoded.account_flags.initialized:
+        """Decode an open orders account.
+
+        The fixed offsets are read with precompiled structs and only the slots in use according to `free_slot_bits`
+        are decoded, `orders` and `client_ids` are 0 for free slots.
+        """
+        return OpenOrdersAccount.__decode(address, buffer, {})
+
+    @staticmethod
+    def from_many(addresses: Sequence[PublicKey], buffers: Sequence[Sequence[int]]) -> List[OpenOrdersAccount]:
+        """Decode many open orders accounts, e.g. the result of `getProgramAccounts`.
+
+        The market and owner public keys are shared between the accounts that have the same ones.
+        """
+        if len(addresses) != len(buffers):
+            raise ValueError("Expected as many addresses as buffers.")
+        keys: Dict[bytes, PublicKey] = {}
+        return [OpenOrdersAccount.__decode(address, buffer, keys) for address, buffer in zip(addresses, buffers)]
+
+    @staticmethod
+    def __decode(address: PublicKey, buffer: Sequence[int], keys: Dict[bytes, PublicKey]) -> OpenOrdersAccount:
+        view = as_memoryview(buffer)
+        if len(view) < OPEN_ORDERS_LAYOUT.sizeof():
+            raise ValueError("Open orders account data is too short.")
+        header = _OpenOrdersHeader._make(OPEN_ORDERS_HEADER_STRUCT.unpack_from(view))
+        if not header.account_flags & OPEN_ORDERS_FLAG or not header.account_flags & INITIALIZED_FLAG:
             raise Exception("Not an open order account or not initialized.")
 
+        free_slot_bits = (header.free_slot_bits_hi << 64) | header.free_slot_bits_lo
+        orders, client_ids = OpenOrdersAccount.__decode_used_slots(view, free_slot_bits)
         return OpenOrdersAccount(
             address=address,
-            market=PublicKey(open_order_decoded.market),
-            owner=PublicKey(open_order_decoded.owner),
-            base_token_free=open_order_decoded.base_token_free,
-            base_token_total=open_order_decoded.base_token_total,
-            quote_token_free=open_order_decoded.quote_token_free,
-            quote_token_total=open_order_decoded.quote_token_total,
-            free_slot_bits=int.from_bytes(open_order_decoded.free_slot_bits, "little"),
-            is_bid_bits=int.from_bytes(open_order_decoded.is_bid_bits, "little"),
-            orders=[int.from_bytes(order, "little") for order in open_order_decoded.orders],
-            client_ids=open_order_decoded.client_ids,
+            market=OpenOrdersAccount.__public_key(header.market, keys),
+            owner=OpenOrdersAccount.__public_key(header.owner, keys),
+            base_token_free=header.base_token_free,
+            base_token_total=header.base_token_total,
+            quote_token_free=header.quote_token_free,
+            quote_token_total=header.quote_token_total,
+            free_slot_bits=free_slot_bits,
+            is_bid_bits=(header.is_bid_bits_hi << 64) | header.is_bid_bits_lo,
+            orders=orders,
+            client_ids=client_ids,
         )
 
     @staticmethod
-    def find_for_market_and_owner(
-        conn: Client, market: PublicKey, owner: PublicKey, program_id: PublicKey, commitment: Commitment = Recent
-    ) -> List[OpenOrdersAccount]:
-        filters = [
+    def __decode_used_slots(view: memoryview, free_slot_bits: int) -> Tuple[List[int], List[int]]:
+        """Order ids and client ids of the slots in use, walking the used slot bits from the lowest one."""
+        orders = [0] * OPEN_ORDERS_SLOTS
+        client_ids = [0] * OPEN_ORDERS_SLOTS
+        used_slot_bits = ~free_slot_bits & _ALL_SLOTS_MASK
+        while used_slot_bits:
+            lowest_bit = used_slot_bits & -used_slot_bits
+            slot = lowest_bit.bit_length() - 1
+            used_slot_bits ^= lowest_bit
+            order_lo, order_hi = OPEN_ORDERS_ORDER_STRUCT.unpack_from(
+                view, OPEN_ORDERS_ORDERS_OFFSET + slot * OPEN_ORDERS_ORDER_STRUCT.size
+            )
+            orders[slot] = (order_hi << 64) | order_lo
+            client_ids[slot] = OPEN_ORDERS_CLIENT_ID_STRUCT.unpack_from(
+                view, OPEN_ORDERS_CLIENT_IDS_OFFSET + slot * OPEN_ORDERS_CLIENT_ID_STRUCT.size
+            )[0]
+        return orders, client_ids
+
+    @staticmethod
+    def __public_key(raw: bytes, keys: Dict[bytes, PublicKey]) -> PublicKey:
+        key: Optional[PublicKey] = keys.get(raw)
+        if key is None:
+            key = keys[raw] = PublicKey(raw)
+        return key
+
+    @staticmethod
+    def _market_and_owner_filters(market: PublicKey, owner: PublicKey) -> List[MemcmpOpts]:
+        return [
             MemcmpOpts(
                 offset=5 + 8,  # 5 bytes of padding, 8 bytes of account flag
                 bytes=str(market),
@@ -86,13 +164,20 @@ class OpenOrdersAccount:
                 bytes=str(owner),
             ),
         ]
-        resp = conn.get_program_accounts(
-            program_id,
-            commitment=commitment,
-            encoding="base64",
-            memcmp_opts=filters,
-            data_size=OPEN_ORDERS_LAYOUT.sizeof(),
-        )
+
+    @staticmethod
+    def _find_for_market_and_owner_params(
+        market: PublicKey, owner: PublicKey, program_id: PublicKey, commitment: Commitment = Recent
+    ) -> Tuple[Any, ...]:
+        """Parameters of the getProgramAccounts request of `find_for_market_and_owner`, to send it in a batch."""
+        filters: List[Dict[str, Any]] = [
+            {"memcmp": dict(opt._asdict())} for opt in OpenOrdersAccount._market_and_owner_filters(market, owner)
+        ]
+        filters.append({"dataSize": OPEN_ORDERS_LAYOUT.sizeof()})
+        return str(program_id), {"filters": filters, "encoding": "base64", "commitment": commitment}
+
+    @staticmethod
+    def _process_get_program_accounts_resp(resp: RPCResponse) -> List[OpenOrdersAccount]:
         accounts = []
         for account in resp["result"]:
             account_details = account["account"]
@@ -106,13 +191,43 @@ class OpenOrdersAccount:
                 )
             )
 
-        return [OpenOrdersAccount.from_bytes(account.public_key, account.data) for account in accounts]
+        return OpenOrdersAccount.from_many(
+            [account.public_key for account in accounts], [account.data for account in accounts]
+        )
+
+    @staticmethod
+    def find_for_market_and_owner(
+        conn: Client, market: PublicKey, owner: PublicKey, program_id: PublicKey, commitment: Commitment = Recent
+    ) -> List[OpenOrdersAccount]:
+        resp = conn.get_program_accounts(
+            program_id,
+            commitment=commitment,
+            encoding="base64",
+            memcmp_opts=OpenOrdersAccount._market_and_owner_filters(market, owner),
+            data_size=OPEN_ORDERS_LAYOUT.sizeof(),
+        )
+        return OpenOrdersAccount._process_get_program_accounts_resp(resp)
 
     @staticmethod
-    def load(conn: Client, address: str) -> OpenOrdersAccount:
+    def load(
+        conn: Client,
+        address: str,
+        single_flight: Optional[SingleFlight] = None,
+        account_cache: Optional[AccountCache] = None,
+    ) -> OpenOrdersAccount:
+        """Load an open orders account, with `single_flight` concurrent loads of it share one request and one decode.
+
+        :param account_cache: Where the account data is kept, for the time to live of "open_orders" accounts.
+        """
         addr_pub_key = PublicKey(address)
-        bytes_data = load_bytes_data(addr_pub_key, conn)
-        return OpenOrdersAccount.from_bytes(addr_pub_key, bytes_data)
+
+        def load() -> OpenOrdersAccount:
+            bytes_data = load_bytes_data(addr_pub_key, conn, cache=account_cache, kind="open_orders")
+            return OpenOrdersAccount.from_bytes(addr_pub_key, bytes_data)
+
+        if single_flight is None:
+            return load()
+        return single_flight.run((str(addr_pub_key), Max, "open_orders"), load)
 
 
 def make_create_account_instruction(
@@ -0,0 +1,135 @@
+"""Request coalescing: concurrent loads of the same account share one RPC call and one decoded result."""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+# Result of an asyncio call whose task was cancelled, the tasks waiting for it make the call again.
+_CANCELLED = object()
+
+
+class SingleFlightStats(NamedTuple):
+    calls: int
+    """Calls made through the single flight, by threads and coroutines."""
+    coalesced: int
+    """Calls that waited for the result of a call already in flight instead of making their own."""
+    in_flight: int
+    """Keys with a call running now."""
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+    def finish(self) -> None:
+        """Wake the callers waiting for the result, `value` or `error` is set."""
+        self.done.set()
+
+    def result(self) -> Any:
+        """Wait for the call to finish and return its value or raise its exception."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """Run at most one call per key at a time, callers arriving while it runs get its result or its exception.
+
+    Nothing is kept once a call returns, so a later call runs again: this only merges calls that overlap. Results are
+    shared between the callers that get them, so they must not be modified.
+
+    `run` coalesces calls from threads and `run_async` calls from coroutines of the same event loop, one `SingleFlight`
+    can serve both.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._call_count = 0
+        self._coalesced = 0
+
+    def run(self, key: Hashable, load: Callable[[], T]) -> T:
+        """The result of `load()`, or of the call with the same key running in another thread."""
+        with self._lock:
+            self._call_count += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._coalesced += 1
+        assert call is not None
+        if not leader:
+            return call.result()
+        try:
+            call.value = load()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.finish()
+        return call.value
+
+    async def run_async(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """The result of `await load()`, or of the call with the same key awaited by another task.
+
+        When the task making the call is cancelled, one of the tasks waiting for it makes the call again.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._call_count += 1
+        waited = False
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                leader = future is None or future.get_loop() is not loop
+                if leader:
+                    future = self._futures[key] = loop.create_future()
+                    if waited:
+                        self._coalesced -= 1
+                elif not waited:
+                    self._coalesced += 1
+                    waited = True
+            assert future is not None
+            if leader:
+                return await self._lead_async(key, future, load)
+            # A waiter being cancelled must not cancel the call the other waiters share.
+            value = await asyncio.shield(future)
+            if value is not _CANCELLED:
+                return value
+
+    async def _lead_async(self, key: Hashable, future: "asyncio.Future[Any]", load: Callable[[], Awaitable[T]]) -> T:
+        try:
+            value = await load()
+        except asyncio.CancelledError:
+            # The waiters are not cancelled with the leader, they make the call again.
+            future.set_result(_CANCELLED)
+            raise
+        except BaseException as err:
+            future.set_exception(err)
+            future.exception()  # Retrieved, there may be no other waiter.
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+        return value
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                calls=self._call_count,
+                coalesced=self._coalesced,
+                in_flight=len(self._calls) + len(self._futures),
+            )
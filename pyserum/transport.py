@@ -0,0 +1,271 @@
+"""Pooled HTTP transport for the JSON RPC API, with retries, hedged reads and per endpoint statistics."""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from solana.rpc.api import Client
+from solana.rpc.providers.http import HTTPProvider
+from solana.rpc.types import RPCMethod, RPCResponse
+
+from .utils import RPCError
+
+# Hedging a method that changes state would only race two copies of the same transaction.
+_UNHEDGED_METHODS = frozenset(("sendTransaction", "requestAirdrop"))
+_RETRIABLE_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class TransportError(RPCError):
+    """Every attempt of a request failed before a JSON RPC response came back."""
+
+
+class _RetriableError(Exception):
+    pass
+
+
+class EndpointStats(NamedTuple):
+    endpoint: str
+    """"""
+    requests: int
+    """Attempts sent to the endpoint, including hedged ones."""
+    errors: int
+    """Attempts that failed."""
+    hedges: int
+    """Attempts sent to the endpoint because another one was slow."""
+    mean_latency: Optional[float]
+    """Mean latency of the successful attempts in seconds, None before the first one."""
+    recent_latency: Optional[float]
+    """Exponentially weighted latency of the successful attempts, used to pick the primary endpoint."""
+    last_error: Optional[str]
+    """"""
+
+
+class _Endpoint:  # pylint: disable=too-many-instance-attributes
+    """An RPC endpoint, its connection pool and the statistics of the attempts sent to it.
+
+    The provider holds its lock while it updates the statistics.
+    """
+
+    def __init__(self, url: str, pool_size: int) -> None:
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.successes = 0
+        self.total_latency = 0.0
+        self.recent_latency: Optional[float] = None
+        self.consecutive_errors = 0
+        self.last_error: Optional[str] = None
+
+    def rank(self) -> Tuple[bool, float]:
+        """Sort key of the endpoint, healthy and fast endpoints first."""
+        return self.consecutive_errors > 0, self.recent_latency or 0.0
+
+    def record_success(self, latency: float, latency_weight: float) -> None:
+        self.successes += 1
+        self.total_latency += latency
+        self.consecutive_errors = 0
+        self.recent_latency = (
+            latency
+            if self.recent_latency is None
+            else self.recent_latency + latency_weight * (latency - self.recent_latency)
+        )
+
+    def record_error(self, error: str) -> None:
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.last_error = error
+
+    def stats(self) -> EndpointStats:
+        return EndpointStats(
+            endpoint=self.url,
+            requests=self.requests,
+            errors=self.errors,
+            hedges=self.hedges,
+            mean_latency=self.total_latency / self.successes if self.successes else None,
+            recent_latency=self.recent_latency,
+            last_error=self.last_error,
+        )
+
+
+class PooledHTTPProvider(HTTPProvider):  # pylint: disable=too-many-instance-attributes
+    """Drop-in replacement of the HTTP provider of `solana.rpc.api.Client`, see `client`.
+
+    Each endpoint keeps a pool of keep-alive connections. Connection errors, timeouts and HTTP 429 or 5xx responses
+    are retried up to `max_retries` times with jittered exponential backoff, each retry going to the next endpoint.
+    Endpoints are tried healthiest first: those whose last attempt failed come last, the others by recent latency.
+
+    With `hedge_after`, a read that is not answered within that many seconds is sent to a second endpoint as well,
+    and the first answer wins. Transactions are never hedged.
+
+    :param endpoints: One or more RPC endpoints serving the same cluster.
+    :param timeout: Timeout of each attempt in seconds.
+    :param pool_size: Connections kept alive per endpoint.
+    """
+
+    logger = logging.getLogger("pyserum.transport.PooledHTTPProvider")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        endpoints: Union[str, Sequence[str]],
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        hedge_after: Optional[float] = None,
+        pool_size: int = 8,
+        latency_weight: float = 0.2,
+    ) -> None:
+        urls = [endpoints] if isinstance(endpoints, str) else list(endpoints)
+        if not urls:
+            raise ValueError("At least one endpoint is required.")
+        super().__init__(urls[0])
+        self._endpoints = [_Endpoint(url, pool_size) for url in urls]
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._hedge_after = hedge_after
+        self._pool_size = pool_size
+        self._latency_weight = latency_weight
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return "Pooled HTTP RPC connection %s" % ", ".join(endpoint.url for endpoint in self._endpoints)
+
+    def client(self) -> Client:
+        """A `solana.rpc.api.Client` sending its requests through this provider."""
+        client = Client(self.endpoint_uri)
+        client._provider = self  # pylint: disable=protected-access
+        return client
+
+    def make_request(self, method: RPCMethod, *params: Any) -> RPCResponse:
+        request = {"jsonrpc": "2.0", "id": next(self._request_counter) + 1, "method": method, "params": params}
+        return self._post(request, hedge=method not in _UNHEDGED_METHODS)
+
+    def make_batch_request(self, batch: Sequence[Dict[str, Any]]) -> List[RPCResponse]:
+        """Send JSON RPC requests as one array body, see `pyserum.batch`. The responses may come in any order."""
+        return self._post(list(batch), hedge=all(request["method"] not in _UNHEDGED_METHODS for request in batch))
+
+    def is_connected(self) -> bool:
+        endpoint = self.__ranked()[0]
+        try:
+            response = endpoint.session.get(endpoint.url.rstrip("/") + "/health", timeout=self._timeout)
+            response.raise_for_status()
+        except (IOError, requests.HTTPError) as err:
+            self.logger.error("Health check failed with error: %s", str(err))
+            return False
+        return response.ok
+
+    def stats(self) -> List[EndpointStats]:
+        with self._lock:
+            return [endpoint.stats() for endpoint in self._endpoints]
+
+    def close(self) -> None:
+        """Close the pooled connections, requests still running on hedge threads are not waited for."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        for endpoint in self._endpoints:
+            endpoint.session.close()
+
+    def _post(self, payload: Any, hedge: bool = True) -> Any:
+        """Send a JSON RPC request or batch and return the decoded response, retrying and hedging as configured."""
+        data = json.dumps(payload)
+        error: Optional[_RetriableError] = None
+        tried: List[_Endpoint] = []
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                time.sleep(self.__backoff(attempt))
+            ranked = self.__ranked()
+            # Retries go to the endpoints this request has not tried yet, while there are some.
+            candidates = [endpoint for endpoint in ranked if endpoint not in tried] or ranked
+            primary = candidates[0]
+            others = [endpoint for endpoint in candidates[1:] + ranked if endpoint is not primary]
+            secondary = others[0] if others else None
+            tried.append(primary)
+            try:
+                if hedge and self._hedge_after is not None and secondary is not None:
+                    return self.__hedged(primary, secondary, data)
+                return self.__attempt(primary, data)
+            except _RetriableError as err:
+                error = err
+                self.logger.warning("Attempt %d of %d failed: %s", attempt + 1, self._max_retries + 1, err)
+        raise TransportError("All %d attempts failed, last error: %s" % (self._max_retries + 1, error)) from error
+
+    def __ranked(self) -> List[_Endpoint]:
+        with self._lock:
+            return sorted(self._endpoints, key=_Endpoint.rank)
+
+    def __backoff(self, attempt: int) -> float:
+        delay = min(self._max_backoff, self._backoff * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def __hedged(self, primary: _Endpoint, secondary: _Endpoint, data: str) -> Any:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=2 * self._pool_size * len(self._endpoints), thread_name_prefix="pyserum-hedge"
+                    )
+        first = self._executor.submit(self.__attempt, primary, data)
+        done, _ = wait([first], timeout=self._hedge_after)
+        if done:
+            return first.result()
+        with self._lock:
+            secondary.hedges += 1
+        pending = {first, self._executor.submit(self.__attempt, secondary, data)}
+        error: Optional[_RetriableError] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exception = future.exception()
+                if exception is None:
+                    return future.result()
+                if not isinstance(exception, _RetriableError):
+                    raise exception
+                error = exception
+        assert error is not None
+        raise error
+
+    def __attempt(self, endpoint: _Endpoint, data: str) -> Any:
+        started = time.monotonic()
+        with self._lock:
+            endpoint.requests += 1
+        try:
+            response = endpoint.session.post(
+                endpoint.url, data=data, headers={"Content-Type": "application/json"}, timeout=self._timeout
+            )
+            if response.status_code in _RETRIABLE_STATUSES:
+                raise _RetriableError("HTTP %d from %s" % (response.status_code, endpoint.url))
+            if not response.ok:
+                raise RPCError("HTTP %d from %s: %s" % (response.status_code, endpoint.url, response.text))
+            try:
+                result = response.json()
+            except ValueError as err:
+                raise _RetriableError("Invalid JSON from %s" % endpoint.url) from err
+        except requests.RequestException as err:
+            self.__failed(endpoint, "%s: %s" % (type(err).__name__, err))
+            raise _RetriableError("%s from %s" % (type(err).__name__, endpoint.url)) from err
+        except (_RetriableError, RPCError) as err:
+            self.__failed(endpoint, str(err))
+            raise
+        latency = time.monotonic() - started
+        with self._lock:
+            endpoint.record_success(latency, self._latency_weight)
+        return result
+
+    def __failed(self, endpoint: _Endpoint, error: str) -> None:
+        with self._lock:
+            endpoint.record_error(error)
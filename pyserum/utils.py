@@ -1,24 +1,185 @@
 import base64
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from solana.publickey import PublicKey
 from solana.rpc.api import Client
+from solana.rpc.commitment import Commitment, Max
+from solana.rpc.types import DataSliceOpts, RPCMethod, RPCResponse
 from spl.token.constants import WRAPPED_SOL_MINT  # type: ignore # TODO: Remove ignore.
 
+from pyserum._layouts.compiled import compiled
 from pyserum._layouts.market import MINT_LAYOUT
+from pyserum.account_cache import AccountCache
+from pyserum.single_flight import SingleFlight
 
 
-def load_bytes_data(addr: PublicKey, conn: Client):
-    res = conn.get_account_info(addr)
+class RPCError(Exception):
+    """The RPC node failed, returned an error or a response without the expected fields.
+
+    `response` is the decoded JSON RPC response when there is one.
+    """
+
+    def __init__(self, message: str, response: Optional[Any] = None) -> None:
+        super().__init__(message)
+        self.response = response
+
+
+def _cannot_load(res: RPCResponse) -> RPCError:
+    if isinstance(res, dict) and "error" in res:
+        error = res["error"]
+        message = error.get("message", error) if isinstance(error, dict) else error
+        return RPCError("Cannot load byte data: %s" % message, res)
+    return RPCError("Cannot load byte data.", res)
+
+
+def as_memoryview(buffer: Sequence[int]) -> memoryview:
+    """Zero-copy view of account data, other sequences of ints are copied into bytes first."""
+    if isinstance(buffer, memoryview):
+        return buffer
+    if isinstance(buffer, (bytes, bytearray)):
+        return memoryview(buffer)
+    return memoryview(bytes(buffer))
+
+
+def parse_bytes_data(res: RPCResponse) -> bytes:
+    """Account data of a getAccountInfo response."""
     if ("result" not in res) or ("value" not in res["result"]) or ("data" not in res["result"]["value"]):
-        raise Exception("Cannot load byte data.")
+        raise _cannot_load(res)
     data = res["result"]["value"]["data"][0]
     return base64.decodebytes(data.encode("ascii"))
 
 
+def parse_context_slot(res: RPCResponse) -> int:
+    """Slot a response was read at."""
+    try:
+        return res["result"]["context"]["slot"]
+    except (KeyError, TypeError) as err:
+        raise RPCError("Response without context slot.", res) from err
+
+
+def cached_bytes_data(
+    addr: PublicKey, commitment: Commitment, cache: Optional[AccountCache], min_slot: Optional[int]
+) -> Optional[bytes]:
+    """Data of an account kept in `cache`, None without a cache or when the data is missing or too old."""
+    if cache is None:
+        return None
+    cached = cache.get(addr, commitment, min_slot)
+    return None if cached is None else cached.data
+
+
+def parse_and_cache_bytes_data(  # pylint: disable=too-many-arguments
+    res: RPCResponse,
+    addr: PublicKey,
+    commitment: Commitment,
+    cache: Optional[AccountCache],
+    kind: Optional[str],
+    generation: Optional[int],
+) -> bytes:
+    """Account data of a getAccountInfo response, also put in `cache` when there is one.
+
+    :param generation: Generation of the cache before the request was sent.
+    """
+    data = parse_bytes_data(res)
+    if cache is not None:
+        cache.put(addr, commitment, data, parse_context_slot(res), kind, generation)
+    return data
+
+
+def load_bytes_data(  # pylint: disable=too-many-arguments
+    addr: PublicKey,
+    conn: Client,
+    commitment: Commitment = Max,
+    single_flight: Optional[SingleFlight] = None,
+    cache: Optional[AccountCache] = None,
+    kind: Optional[str] = None,
+    min_slot: Optional[int] = None,
+) -> bytes:
+    """Load the data of an account.
+
+    With `single_flight`, concurrent loads of the same account share one request. With `cache`, the data is served
+    from it while younger than the time to live of accounts of `kind` and read at `min_slot` or later.
+    """
+    cached = cached_bytes_data(addr, commitment, cache, min_slot)
+    if cached is not None:
+        return cached
+
+    def load() -> bytes:
+        generation = None if cache is None else cache.generation()
+        res = conn.get_account_info(addr, commitment)
+        return parse_and_cache_bytes_data(res, addr, commitment, cache, kind, generation)
+
+    if single_flight is None:
+        return load()
+    return single_flight.run((str(addr), commitment, min_slot), load)
+
+
+def account_info_params(
+    addr: PublicKey, commitment: Commitment = Max, data_slice: Optional[Tuple[int, int]] = None
+) -> Tuple[Any, ...]:
+    """Parameters of a getAccountInfo request, `data_slice` is the offset and length of the bytes to return."""
+    opts: Dict[str, Any] = {"encoding": "base64", "commitment": commitment}
+    if data_slice is not None:
+        opts["dataSlice"] = {"offset": data_slice[0], "length": data_slice[1]}
+    return str(addr), opts
+
+
+def load_bytes_slice(addr: PublicKey, conn: Client, offset: int, length: int, commitment: Commitment = Max) -> bytes:
+    """Load `length` bytes of the data of an account from `offset` on, the node only sends these bytes."""
+    res = conn.get_account_info(addr, commitment, data_slice=DataSliceOpts(offset=offset, length=length))
+    return parse_bytes_data(res)
+
+
+# Maximum number of accounts the RPC node accepts in one getMultipleAccounts call.
+MAX_MULTIPLE_ACCOUNTS = 100
+
+
+def multiple_accounts_params(addrs: Sequence[PublicKey], commitment: Commitment) -> Tuple[Any, ...]:
+    """Parameters of a getMultipleAccounts request for `addrs`."""
+    if len(addrs) > MAX_MULTIPLE_ACCOUNTS:
+        raise ValueError("Cannot load more than %d accounts in one request." % MAX_MULTIPLE_ACCOUNTS)
+    return [str(addr) for addr in addrs], {"encoding": "base64", "commitment": commitment}
+
+
+def parse_multiple_bytes_data(res: RPCResponse, count: int) -> Tuple[int, List[Optional[bytes]]]:
+    """Slot and account data of a getMultipleAccounts response for `count` accounts."""
+    if ("result" not in res) or ("value" not in res["result"]) or ("context" not in res["result"]):
+        raise _cannot_load(res)
+    values = res["result"]["value"]
+    if len(values) != count:
+        raise RPCError("Cannot load byte data.", res)
+    return res["result"]["context"]["slot"], [
+        None if value is None else base64.decodebytes(value["data"][0].encode("ascii")) for value in values
+    ]
+
+
+def load_multiple_bytes_data(
+    addrs: Sequence[PublicKey], conn: Client, commitment: Commitment = Max
+) -> Tuple[int, List[Optional[bytes]]]:
+    """Load the data of several accounts with one getMultipleAccounts request.
+
+    Returns the slot the accounts were read at and their data in the order of `addrs`, None for accounts that do not
+    exist.
+    """
+    params = multiple_accounts_params(addrs, commitment)
+    res = conn._provider.make_request(RPCMethod("getMultipleAccounts"), *params)  # pylint: disable=protected-access
+    return parse_multiple_bytes_data(res, len(addrs))
+
+
+def load_many_bytes_data(addrs: Sequence[PublicKey], conn: Client) -> List[Optional[bytes]]:
+    """Like `load_multiple_bytes_data` for any number of accounts, split into as few requests as possible.
+
+    Accounts of different requests may be read at different slots.
+    """
+    datas: List[Optional[bytes]] = []
+    for start in range(0, len(addrs), MAX_MULTIPLE_ACCOUNTS):
+        datas.extend(load_multiple_bytes_data(addrs[start : start + MAX_MULTIPLE_ACCOUNTS], conn)[1])  # noqa: E203
+    return datas
+
+
 def get_mint_decimals(conn: Client, mint_pub_key: PublicKey) -> int:
     """Get the mint decimals for a token mint"""
     if mint_pub_key == WRAPPED_SOL_MINT:
         return 9
 
     bytes_data = load_bytes_data(mint_pub_key, conn)
-    return MINT_LAYOUT.parse(bytes_data).decimals
+    return compiled(MINT_LAYOUT).parse(bytes_data).decimals
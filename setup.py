@@ -12,6 +12,7 @@ setup(
         "construct>=2.10.56, <3.0.0",
         "solana>=0.3.0, <1.0.0",
     ],
+    extras_require={"numpy": ["numpy"], "websockets": ["websockets"]},
     python_requires=">=3.7, <4",
     license="MIT",
     package_data={"pyserum": ["py.typed"]},
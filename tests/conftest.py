@@ -1,11 +1,42 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 import pytest
+from construct import Container
 from solana.account import Account
 from solana.publickey import PublicKey
 from solana.rpc.api import Client
 
 from pyserum.connection import conn
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import State
+from pyserum.market.types import AccountFlags
+
+from .fake_rpc import KEYS, FakeRpc, market_accounts
+
+
+@pytest.fixture(scope="session")
+def market_state() -> State:
+    """Market with lots of 100 base and 10 quote native units and 6 decimals mints, to decode order books."""
+    return State(
+        Container(account_flags=AccountFlags(initialized=True, market=True), base_lot_size=100, quote_lot_size=10),
+        program_id=DEFAULT_DEX_PROGRAM_ID,
+        base_mint_decimals=6,
+        quote_mint_decimals=6,
+    )
+
+
+@pytest.fixture(name="fake_rpc")
+def fixture_fake_rpc() -> Iterator[FakeRpc]:
+    """Fake RPC node serving the accounts of `market_accounts`."""
+    fake = FakeRpc(market_accounts(), slot=1234)
+    yield fake
+    fake.close()
+
+
+@pytest.fixture(name="recorded_state")
+def fixture_recorded_state(fake_rpc: FakeRpc) -> State:
+    """State of the market `fake_rpc` serves at `KEYS`."""
+    return State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, fake_rpc.accounts[str(KEYS["own_address"])])
 
 
 @pytest.mark.integration
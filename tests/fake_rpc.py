@@ -0,0 +1,343 @@
+"""Local JSON RPC server serving recorded account data to a real `solana.rpc.api.Client`.
+
+Also holds the accounts of the recorded market at `KEYS` that the shared fixtures serve.
+"""
+import asyncio
+import base64
+import functools
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import requests
+from base58 import b58decode
+from solana.publickey import PublicKey
+
+from pyserum._layouts.market import MARKET_LAYOUT
+from pyserum._layouts.queue import QUEUE_HEADER_LAYOUT, REQUEST_LAYOUT
+from pyserum.open_orders_account import OPEN_ORDERS_LAYOUT
+
+from .binary_file_path import ASK_ORDER_BIN_PATH, EVENT_QUEUE_BIN_PATH
+
+
+def _account_value(data: bytes) -> Dict[str, Any]:
+    return {
+        "data": [base64.b64encode(data).decode("ascii"), "base64"],
+        "executable": False,
+        "lamports": 1,
+        "owner": "11111111111111111111111111111111",
+        "rentEpoch": 0,
+    }
+
+
+def _matches(data: bytes, account_filter: Dict[str, Any]) -> bool:
+    if "dataSize" in account_filter:
+        return len(data) == account_filter["dataSize"]
+    memcmp = account_filter["memcmp"]
+    expected = b58decode(memcmp["bytes"])
+    return data[memcmp["offset"] : memcmp["offset"] + len(expected)] == expected  # noqa: E203
+
+
+class FakeRpc:
+    """Serve `accounts`, keyed by base58 address, at `endpoint` until `close` is called.
+
+    Every request received is recorded in `requests`, `round_trips` counts the HTTP requests. Responses are delayed by
+    `latency` seconds, and the next `failures` requests are answered with HTTP `failure_status`. Connections are kept
+    alive, `connections` counts them.
+    """
+
+    def __init__(self, accounts: Optional[Dict[str, bytes]] = None, slot: int = 1, latency: float = 0.0) -> None:
+        self.accounts: Dict[str, bytes] = dict(accounts or {})
+        self.slot = slot
+        self.latency = latency
+        self.failures = 0
+        self.failure_status = 503
+        self.connections = 0
+        self.round_trips = 0
+        self.rent_exemption = 2039280
+        self.requests: List[Dict[str, Any]] = []
+        self.transactions: List[str] = []
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:  # pylint: disable=protected-access
+                    fake.connections += 1
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake._lock:  # pylint: disable=protected-access
+                    fake.round_trips += 1
+                    fail = fake.failures > 0
+                    fake.failures -= fail
+                if fail:
+                    self.send_response(fake.failure_status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if isinstance(body, list):
+                    response: Any = [fake.handle(request) for request in body]
+                else:
+                    response = fake.handle(body)
+                payload = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.01,), daemon=True)
+        self._thread.start()
+
+    @property
+    def endpoint(self) -> str:
+        return "http://127.0.0.1:%d/" % self._server.server_address[1]
+
+    def methods(self) -> List[str]:
+        return [request["method"] for request in self.requests]
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests.append(request)
+        method, params = request["method"], request["params"]
+        context = {"slot": self.slot}
+        if method == "getAccountInfo":
+            data = self.accounts.get(params[0])
+            data_slice = params[1].get("dataSlice") if len(params) > 1 else None
+            if data is not None and data_slice is not None:
+                data = data[data_slice["offset"] : data_slice["offset"] + data_slice["length"]]  # noqa: E203
+            result: Any = {"context": context, "value": None if data is None else _account_value(data)}
+        elif method == "getMultipleAccounts":
+            values = [self.accounts.get(key) for key in params[0]]
+            result = {"context": context, "value": [None if data is None else _account_value(data) for data in values]}
+        elif method == "getProgramAccounts":
+            result = [
+                {"pubkey": key, "account": _account_value(data)}
+                for key, data in self.accounts.items()
+                if all(_matches(data, account_filter) for account_filter in params[1].get("filters", []))
+            ]
+        elif method == "getMinimumBalanceForRentExemption":
+            result = self.rent_exemption
+        elif method == "getRecentBlockhash":
+            result = {
+                "context": context,
+                "value": {"blockhash": str(PublicKey(0)), "feeCalculator": {"lamportsPerSignature": 5000}},
+            }
+        elif method == "sendTransaction":
+            self.transactions.append(params[0])
+            result = "signature%d" % len(self.transactions)
+        else:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _FakeAsyncSession:
+    """The `post` of an `httpx.AsyncClient`, sent with `requests` from a worker thread."""
+
+    def __init__(self) -> None:
+        self._session = requests.Session()
+
+    async def post(self, url: str, headers: Dict[str, str], content: str, timeout: float = 10.0) -> requests.Response:
+        post = functools.partial(self._session.post, url, headers=headers, data=content, timeout=timeout)
+        return await asyncio.get_running_loop().run_in_executor(None, post)
+
+
+class _FakeAsyncProvider:
+    def __init__(self, fake: FakeRpc, latency: float) -> None:
+        self.endpoint_uri = fake.endpoint
+        self.session = _FakeAsyncSession()
+        self._latency = latency
+        self._request_ids = itertools.count(1)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def make_request(self, method: str, *params: Any) -> Dict[str, Any]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._latency)
+            request = {"jsonrpc": "2.0", "id": next(self._request_ids), "method": method, "params": list(params)}
+            raw_response = await self.session.post(
+                self.endpoint_uri, {"Content-Type": "application/json"}, json.dumps(request)
+            )
+            raw_response.raise_for_status()
+            return raw_response.json()
+        finally:
+            self.in_flight -= 1
+
+
+class FakeAsyncClient:
+    """Asyncio client with the interface of `solana.rpc.async_api.AsyncClient`, sending its requests to a `FakeRpc`.
+
+    Every request waits `latency` seconds before it is sent and `_provider.max_in_flight` records how many were
+    pending at once. Batches are one POST on `_provider.session`, as with the HTTP provider of solana-py.
+    """
+
+    def __init__(self, fake: FakeRpc, latency: float = 0.0) -> None:
+        self._provider = _FakeAsyncProvider(fake, latency)
+
+    async def get_account_info(self, pubkey, commitment="max", encoding="base64", data_slice=None):
+        opts: Dict[str, Any] = {"encoding": encoding, "commitment": commitment}
+        if data_slice:
+            opts["dataSlice"] = dict(data_slice._asdict())
+        return await self._provider.make_request("getAccountInfo", str(pubkey), opts)
+
+    async def get_program_accounts(
+        self, pubkey, commitment="max", encoding=None, data_slice=None, data_size=None, memcmp_opts=None
+    ):  # pylint: disable=too-many-arguments,unused-argument
+        filters: List[Dict[str, Any]] = [{"memcmp": dict(opt._asdict())} for opt in memcmp_opts or []]
+        if data_size:
+            filters.append({"dataSize": data_size})
+        opts = {"filters": filters, "encoding": encoding, "commitment": commitment}
+        return await self._provider.make_request("getProgramAccounts", str(pubkey), opts)
+
+    async def get_minimum_balance_for_rent_exemption(self, usize, commitment="max"):
+        return await self._provider.make_request("getMinimumBalanceForRentExemption", usize, {"commitment": commitment})
+
+    async def send_transaction(self, txn, *signers, opts=None):  # pylint: disable=unused-argument
+        blockhash_resp = await self._provider.make_request("getRecentBlockhash")
+        txn.recent_blockhash = blockhash_resp["result"]["value"]["blockhash"]
+        txn.sign(*signers)
+        return await self._provider.make_request("sendTransaction", base64.b64encode(txn.serialize()).decode("ascii"))
+
+    async def send_raw_transaction(self, txn: bytes, opts=None):  # pylint: disable=unused-argument
+        return await self._provider.make_request("sendTransaction", base64.b64encode(txn).decode("ascii"))
+
+
+def market_data(keys: Dict[str, PublicKey], base_lot_size: int = 100, quote_lot_size: int = 10) -> bytes:
+    """Market account bytes with the given public keys, as stored on chain."""
+    flags = dict(
+        initialized=True,
+        market=True,
+        open_orders=False,
+        request_queue=False,
+        event_queue=False,
+        bids=False,
+        asks=False,
+    )
+    fields = ("own_address", "base_mint", "quote_mint", "base_vault", "quote_vault")
+    fields += ("request_queue", "event_queue", "bids", "asks")
+    return MARKET_LAYOUT.build(
+        dict(
+            account_flags=flags,
+            vault_signer_nonce=0,
+            base_deposits_total=0,
+            base_fees_accrued=0,
+            quote_deposits_total=0,
+            quote_fees_accrued=0,
+            quote_dust_threshold=100,
+            base_lot_size=base_lot_size,
+            quote_lot_size=quote_lot_size,
+            fee_rate_bps=0,
+            referrer_rebate_accrued=0,
+            **{field: bytes(keys.get(field, PublicKey(0))) for field in fields},
+        )
+    )
+
+
+def open_orders_data(used_slots, stale_client_id: int = 0, open_orders: bool = True) -> bytes:
+    """Open orders account bytes with orders in `used_slots`, the client ids of free slots are `stale_client_id`."""
+    free_slot_bits = (1 << 128) - 1
+    for slot in used_slots:
+        free_slot_bits ^= 1 << slot
+    return OPEN_ORDERS_LAYOUT.build(
+        dict(
+            account_flags=dict(
+                initialized=True,
+                market=False,
+                open_orders=open_orders,
+                request_queue=False,
+                event_queue=False,
+                bids=False,
+                asks=False,
+            ),
+            market=bytes(PublicKey(1)),
+            owner=bytes(PublicKey(2)),
+            base_token_free=3,
+            base_token_total=4,
+            quote_token_free=5,
+            quote_token_total=6,
+            free_slot_bits=free_slot_bits.to_bytes(16, "little"),
+            is_bid_bits=(1 << 127 | 1).to_bytes(16, "little"),
+            orders=[((slot + 1) << 64 | slot).to_bytes(16, "little") for slot in range(128)],
+            client_ids=[slot + 1000 if slot in used_slots else stale_client_id for slot in range(128)],
+            referrer_rebate_accrued=0,
+        )
+    )
+
+
+def request_queue_data() -> bytes:
+    """Request queue bytes with 5 slots, where the 4 queued requests wrap around the end of the ring."""
+    header = dict(
+        account_flags=dict(
+            initialized=True,
+            market=False,
+            open_orders=False,
+            request_queue=True,
+            event_queue=False,
+            bids=False,
+            asks=False,
+        ),
+        head=3,
+        count=4,
+        next_seq_num=9,
+    )
+    queued = [
+        dict(
+            request_flags=dict(new_order=i % 2 == 0, cancel_order=i % 2 == 1, bid=i < 2, post_only=i == 1, ioc=i == 4),
+            open_order_slot=i,
+            fee_tier=i % 3,
+            max_base_size_or_cancel_id=100 + i,
+            native_quote_quantity_locked=1000 * i,
+            order_id=((i << 64) | (2 ** 64 - 1 - i)).to_bytes(16, "little"),
+            open_orders=bytes([i]) * 32,
+            client_order_id=i * 7,
+        )
+        for i in range(5)
+    ]
+    return QUEUE_HEADER_LAYOUT.build(header) + b"".join(REQUEST_LAYOUT.build(r) for r in queued)
+
+
+KEYS = {
+    field: PublicKey(i + 1)
+    for i, field in enumerate(
+        ("own_address", "base_mint", "quote_mint", "request_queue", "event_queue", "bids", "asks")
+    )
+}
+OPEN_ORDERS_ADDRESS = PublicKey(42)
+
+
+def _read_binary(path: str) -> bytes:
+    with open(path, "r") as input_file:
+        return base64.decodebytes(input_file.read().encode("ascii"))
+
+
+def market_accounts():
+    """Accounts of a market at `KEYS`, with an open orders account at `OPEN_ORDERS_ADDRESS`."""
+    ask_data = _read_binary(ASK_ORDER_BIN_PATH)
+    # Flip the account flags from asks (bit 6) to bids (bit 5) to serve the same slab as the bid book.
+    bid_data = ask_data[:5] + bytes([ask_data[5] ^ 0b1100000]) + ask_data[6:]
+    return {
+        str(KEYS["own_address"]): market_data(KEYS),
+        str(KEYS["bids"]): bid_data,
+        str(KEYS["asks"]): ask_data,
+        str(KEYS["event_queue"]): _read_binary(EVENT_QUEUE_BIN_PATH),
+        str(KEYS["request_queue"]): request_queue_data(),
+        str(OPEN_ORDERS_ADDRESS): open_orders_data([3, 7]),
+    }
@@ -0,0 +1,72 @@
+"""Order book account bytes built from a list of orders, for tests that need books other than the recorded one."""
+from typing import List, NamedTuple, Sequence
+
+from pyserum._layouts.slab import (
+    INNER_NODE_STRUCT,
+    LEAF_NODE_STRUCT,
+    SLAB_HEADER_STRUCT,
+    SLAB_NODE_TAG_STRUCT,
+    NodeType,
+)
+
+_KEY_BITS = 128
+_U64_MASK = (1 << 64) - 1
+
+
+class BookOrder(NamedTuple):
+    price_lots: int
+    seq: int
+    quantity: int
+    owner_slot: int = 0
+    owner: bytes = bytes(32)
+    client_order_id: int = 0
+
+    def key(self, is_bids: bool) -> int:
+        # Bids store !seq so that earlier orders sort first when iterating in descending order.
+        return self.price_lots << 64 | ((_U64_MASK ^ self.seq) if is_bids else self.seq)
+
+
+def _node(tag: int, payload: bytes) -> bytes:
+    return tag.to_bytes(4, "little") + payload.ljust(SLAB_NODE_TAG_STRUCT.size - 4, b"\0")
+
+
+def order_book_data(orders: Sequence[BookOrder], is_bids: bool) -> bytes:
+    """Bytes of a bids or asks account holding `orders` in a valid crit-bit tree."""
+    leaves = sorted(((order.key(is_bids), order) for order in orders), key=lambda leaf: leaf[0])
+    nodes: List[bytes] = []
+
+    def build(start: int, end: int) -> int:
+        if end - start == 1:
+            key, order = leaves[start]
+            nodes.append(
+                _node(
+                    NodeType.LEAF_NODE,
+                    LEAF_NODE_STRUCT.pack(
+                        order.owner_slot,
+                        0,
+                        key & _U64_MASK,
+                        key >> 64,
+                        order.owner,
+                        order.quantity,
+                        order.client_order_id,
+                    ),
+                )
+            )
+            return len(nodes) - 1
+        first, last = leaves[start][0], leaves[end - 1][0]
+        prefix_len = _KEY_BITS - (first ^ last).bit_length()
+        crit_bit = _KEY_BITS - prefix_len - 1
+        split = next(i for i in range(start, end) if leaves[i][0] >> crit_bit & 1)
+        index = len(nodes)
+        nodes.append(b"")
+        left, right = build(start, split), build(split, end)
+        nodes[index] = _node(
+            NodeType.INNER_NODE, INNER_NODE_STRUCT.pack(prefix_len, first & _U64_MASK, first >> 64, left, right)
+        )
+        return index
+
+    if leaves:
+        build(0, len(leaves))
+    header = SLAB_HEADER_STRUCT.pack(len(nodes), 0, 0, 0, len(leaves))
+    flags = 1 | (1 << 5 if is_bids else 1 << 6)
+    return b"serum" + flags.to_bytes(8, "little") + header + b"".join(nodes) + b"padding"
@@ -0,0 +1,109 @@
+import asyncio
+
+from solana.account import Account
+from solana.publickey import PublicKey
+from solana.rpc.api import Client
+from solana.transaction import AccountMeta, Transaction, TransactionInstruction
+
+from pyserum.account_cache import AccountCache
+from pyserum.enums import OrderType, Side
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import AsyncMarket, Market, State
+from pyserum.mint_decimals import MintDecimalsRegistry
+
+from .fake_rpc import KEYS, FakeAsyncClient, FakeRpc
+
+ADDRESS = PublicKey(1)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_by_kind():
+    clock = FakeClock()
+    cache = AccountCache(ttls={"order_book": 0.5}, clock=clock)
+    cache.put(ADDRESS, "max", b"book", 10, "order_book")
+    cache.put(PublicKey(2), "max", b"market", 10, "market")
+    cache.put(PublicKey(3), "max", b"other", 10, None)
+    assert cache.get(ADDRESS, "max").data == b"book"
+    assert cache.get(ADDRESS, "recent") is None
+    assert cache.get(PublicKey(3), "max") is None
+    clock.now = 0.5
+    assert cache.get(ADDRESS, "max") is None
+    assert cache.get(PublicKey(2), "max").slot == 10
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expired, stats.size) == (2, 3, 1, 1)
+
+
+def test_min_slot_and_older_reads():
+    cache = AccountCache(clock=FakeClock())
+    cache.put(ADDRESS, "max", b"new", 12, "order_book")
+    cache.put(ADDRESS, "max", b"old", 11, "order_book")
+    assert cache.get(ADDRESS, "max", min_slot=12).data == b"new"
+    assert cache.get(ADDRESS, "max", min_slot=13) is None
+
+
+def test_reads_in_flight_during_an_invalidation_are_dropped():
+    cache = AccountCache(clock=FakeClock())
+    generation = cache.generation()
+    transaction = Transaction().add(
+        TransactionInstruction(
+            keys=[AccountMeta(ADDRESS, False, True), AccountMeta(PublicKey(2), False, False)],
+            program_id=DEFAULT_DEX_PROGRAM_ID,
+        )
+    )
+    cache.put(PublicKey(2), "max", b"read only", 10, "market")
+    cache.invalidate_transaction(transaction)
+    cache.put(ADDRESS, "max", b"stale", 10, "order_book", generation)
+    assert cache.get(ADDRESS, "max") is None
+    assert cache.get(PublicKey(2), "max").data == b"read only"
+    cache.put(ADDRESS, "max", b"fresh", 11, "order_book", cache.generation())
+    assert cache.get(ADDRESS, "max").data == b"fresh"
+
+
+def test_market_reads_are_cached(fake_rpc: FakeRpc, recorded_state: State):
+    clock = FakeClock()
+    cache = AccountCache(clock=clock)
+    conn = Client(fake_rpc.endpoint)
+    registry = MintDecimalsRegistry()
+    registry.update({str(KEYS["base_mint"]): 6, str(KEYS["quote_mint"]): 6})
+    for _ in range(2):
+        State.load(conn, KEYS["own_address"], DEFAULT_DEX_PROGRAM_ID, registry, account_cache=cache)
+    market = Market(conn, recorded_state, account_cache=cache)
+    assert list(market.load_bids()) == list(market.load_bids(lazy=True))
+    assert fake_rpc.methods() == ["getAccountInfo"] * 2
+    market.load_bids(min_slot=1235)
+    clock.now = 1.0
+    market.load_bids()
+    assert fake_rpc.methods() == ["getAccountInfo"] * 4
+
+
+def test_sent_transactions_invalidate_what_they_write(fake_rpc: FakeRpc, recorded_state: State):
+    cache = AccountCache(clock=FakeClock())
+    market = Market(Client(fake_rpc.endpoint), recorded_state, account_cache=cache)
+    market.load_bids()
+    market.load_event_queue()
+    market.place_order(PublicKey(99), Account(), OrderType.LIMIT, Side.BUY, 1.5, 2.0)
+    requests = len(fake_rpc.requests)
+    market.load_bids()
+    market.load_event_queue()
+    assert len(fake_rpc.requests) == requests + 2
+
+
+def test_async_market_reads_are_cached(fake_rpc: FakeRpc, recorded_state: State):
+    cache = AccountCache(clock=FakeClock())
+    market = AsyncMarket(FakeAsyncClient(fake_rpc), recorded_state, account_cache=cache)
+
+    async def run():
+        await market.load_asks()
+        await market.load_asks()
+        await market.match_orders(Account(), 10)
+        await market.load_asks()
+
+    asyncio.run(run())
+    assert fake_rpc.methods() == ["getAccountInfo", "getRecentBlockhash", "sendTransaction", "getAccountInfo"]
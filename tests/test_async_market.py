@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from solana.account import Account
+from solana.publickey import PublicKey
+from solana.rpc.api import Client
+
+from pyserum.async_open_orders_account import AsyncOpenOrdersAccount
+from pyserum.enums import OrderType, Side
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import AsyncMarket, Market, State
+from pyserum.mint_decimals import MintDecimalsRegistry
+
+from .fake_rpc import KEYS, OPEN_ORDERS_ADDRESS, FakeAsyncClient, FakeRpc
+
+
+def test_async_market_matches_market(fake_rpc: FakeRpc, recorded_state: State):
+    market = Market(Client(fake_rpc.endpoint), recorded_state)
+    async_market = AsyncMarket(FakeAsyncClient(fake_rpc), recorded_state)
+
+    async def load():
+        return await asyncio.gather(
+            async_market.load_bids(),
+            async_market.load_asks(lazy=True),
+            async_market.load_event_queue(),
+            async_market.load_request_queue(),
+            async_market.load_fills(),
+            async_market.load_snapshot([OPEN_ORDERS_ADDRESS]),
+        )
+
+    bids, asks, event_queue, request_queue, fills, snapshot = asyncio.run(load())
+    assert list(bids.orders()) == list(market.load_bids().orders())
+    assert asks.get_l2(5) == market.load_asks().get_l2(5)
+    assert event_queue == market.load_event_queue()
+    assert request_queue == market.load_request_queue()
+    assert fills == market.load_fills()
+    assert snapshot.slot == 1234
+    assert list(snapshot.asks.orders()) == list(market.load_asks().orders())
+    assert snapshot.open_orders_accounts[0].address == OPEN_ORDERS_ADDRESS
+
+
+def test_async_find_open_orders_accounts(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc)
+    accounts = asyncio.run(
+        AsyncOpenOrdersAccount.find_for_market_and_owner(conn, PublicKey(1), PublicKey(2), DEFAULT_DEX_PROGRAM_ID)
+    )
+    assert [account.address for account in accounts] == [OPEN_ORDERS_ADDRESS]
+    account = asyncio.run(AsyncOpenOrdersAccount.load(conn, str(OPEN_ORDERS_ADDRESS)))
+    assert account.market == PublicKey(1) and account.owner == PublicKey(2)
+    other_owner = AsyncOpenOrdersAccount.find_for_market_and_owner(conn, PublicKey(1), PublicKey(3), KEYS["bids"])
+    assert asyncio.run(other_owner) == []
+
+
+def test_async_loads_run_concurrently(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc, latency=0.05)
+
+    registry = MintDecimalsRegistry()
+    registry.update({str(KEYS["base_mint"]): 6, str(KEYS["quote_mint"]): 6})
+
+    async def load():
+        markets = await AsyncMarket.load_many(conn, [KEYS["own_address"]] * 40, registry=registry)
+        start = time.monotonic()
+        books = await asyncio.gather(*(market.load_asks() for market in markets))
+        return books, time.monotonic() - start
+
+    books, elapsed = asyncio.run(load())
+    assert len(books) == 40
+    assert conn._provider.max_in_flight == 40  # pylint: disable=protected-access
+    assert elapsed < 40 * 0.05 / 2
+
+
+def test_async_place_order_sends_transaction(fake_rpc: FakeRpc, recorded_state: State):
+    conn = FakeAsyncClient(fake_rpc)
+    market = AsyncMarket(conn, recorded_state)
+    resp = asyncio.run(market.place_order(PublicKey(99), Account(), OrderType.LIMIT, Side.BUY, 1.5, 2.0))
+    assert resp["result"] == "signature1"
+    assert fake_rpc.methods() == [
+        "getProgramAccounts",
+        "getMinimumBalanceForRentExemption",
+        "getRecentBlockhash",
+        "sendTransaction",
+    ]
+    # The three reads go out as one batch, then the transaction is sent.
+    assert fake_rpc.round_trips == 2
+    assert asyncio.run(market.match_orders(Account(), 10))["result"] == "signature2"
+
+
+def test_market_place_order_sends_transaction(fake_rpc: FakeRpc, recorded_state: State):
+    market = Market(Client(fake_rpc.endpoint), recorded_state)
+    resp = market.place_order(PublicKey(99), Account(), OrderType.LIMIT, Side.BUY, 1.5, 2.0)
+    assert resp["result"] == "signature1"
+    assert fake_rpc.methods() == [
+        "getProgramAccounts",
+        "getMinimumBalanceForRentExemption",
+        "getRecentBlockhash",
+        "sendTransaction",
+    ]
+    assert fake_rpc.round_trips == 2
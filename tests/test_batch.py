@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from solana.account import Account
+from solana.rpc.api import Client
+from solana.rpc.types import RPCMethod
+from spl.token.constants import WRAPPED_SOL_MINT  # type: ignore
+
+from pyserum.async_batch import AsyncRequestBatcher
+from pyserum.batch import RequestBatch, batch_request, route_batch_responses
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import AsyncMarket, Market, State
+from pyserum.open_orders_account import OpenOrdersAccount
+from pyserum.transport import PooledHTTPProvider
+from pyserum.utils import RPCError
+
+from .fake_rpc import KEYS, OPEN_ORDERS_ADDRESS, FakeAsyncClient, FakeRpc, market_data
+
+RENT = RPCMethod("getMinimumBalanceForRentExemption")
+BLOCKHASH = RPCMethod("getRecentBlockhash")
+
+
+def _open_orders(owner: Account) -> OpenOrdersAccount:
+    return OpenOrdersAccount(OPEN_ORDERS_ADDRESS, KEYS["own_address"], owner.public_key(), 0, 0, 0, 0, 0, 0, [], [])
+
+
+def test_route_batch_responses():
+    batch = [batch_request(RENT, 165), batch_request(BLOCKHASH)]
+    responses = [{"id": batch[1]["id"], "result": "b"}, {"id": batch[0]["id"], "result": "a"}]
+    assert [response["result"] for response in route_batch_responses(batch, responses)] == ["a", "b"]
+    with pytest.raises(RPCError, match="Missing"):
+        route_batch_responses(batch, responses[:1])
+    with pytest.raises(RPCError, match="Invalid"):
+        route_batch_responses(batch, {"error": {"code": -32600, "message": "Invalid request"}})
+
+
+def test_request_batch_is_one_round_trip(fake_rpc: FakeRpc):
+    pooled = PooledHTTPProvider(fake_rpc.endpoint)
+    for conn in (Client(fake_rpc.endpoint), pooled.client()):
+        round_trips = fake_rpc.round_trips
+        with RequestBatch(conn) as batch:
+            rent = batch.add(RENT, 165, {"commitment": "max"})
+            blockhash = batch.add(BLOCKHASH, {"commitment": "max"})
+            unknown = batch.add(RPCMethod("getUnknown"))
+            assert len(batch) == 3
+            with pytest.raises(RPCError):
+                rent.result()
+        assert fake_rpc.round_trips == round_trips + 1
+        assert rent.result()["result"] == fake_rpc.rent_exemption
+        assert "blockhash" in blockhash.result()["result"]["value"]
+        assert unknown.result()["error"]["message"] == "Method not found"
+    pooled.close()
+
+
+def test_settle_funds_is_one_round_trip_before_sending():
+    keys = dict(KEYS, quote_mint=WRAPPED_SOL_MINT)
+    fake = FakeRpc({str(KEYS["own_address"]): market_data(keys)})
+    try:
+        state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 9, fake.accounts[str(KEYS["own_address"])])
+        owner = Account()
+        resp = Market(Client(fake.endpoint), state).settle_funds(
+            owner, _open_orders(owner), KEYS["base_mint"], owner.public_key()
+        )
+        assert resp["result"] == "signature1"
+        assert fake.methods() == ["getRecentBlockhash", "getMinimumBalanceForRentExemption", "sendTransaction"]
+        assert fake.round_trips == 2
+    finally:
+        fake.close()
+
+
+def test_async_batcher_groups_calls_of_the_same_tick(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc, latency=0.01)
+    batcher = AsyncRequestBatcher(conn, max_batch_size=4)
+
+    async def run():
+        first = await asyncio.gather(*(batcher.request(RENT, size) for size in range(6)))
+        second = await batcher.request(BLOCKHASH)
+        return first, second
+
+    first, second = asyncio.run(run())
+    # Six calls split in batches of at most four, then one more tick, each batch is one POST.
+    assert fake_rpc.round_trips == 3
+    # The batches are sent concurrently, so the server may receive them in any order.
+    request_ids = {request["params"][0]: request["id"] for request in fake_rpc.requests[:6]}
+    assert [response["id"] for response in first] == [request_ids[size] for size in range(6)]
+    assert "blockhash" in second["result"]["value"]
+
+
+def test_async_market_settle_funds(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc)
+    state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, fake_rpc.accounts[str(KEYS["own_address"])])
+    owner = Account()
+    resp = asyncio.run(
+        AsyncMarket(conn, state).settle_funds(owner, _open_orders(owner), KEYS["base_mint"], KEYS["quote_mint"])
+    )
+    assert resp["result"] == "signature1"
+    assert fake_rpc.methods() == ["getRecentBlockhash", "sendTransaction"]
+    assert fake_rpc.round_trips == 2
@@ -0,0 +1,154 @@
+import base64
+from typing import Tuple
+
+import pytest
+from solana.publickey import PublicKey
+
+from pyserum.market import Market, OrderBook
+from pyserum.market._internal.queue import decode_event_queue, decode_request_queue
+from pyserum.market.types import Event, EventFlags
+
+np = pytest.importorskip("numpy")
+# pylint: disable=wrong-import-position
+from pyserum.market.columnar import (  # noqa: E402
+    ColumnarOrderBook,
+    EventQueueColumns,
+    decode_event_queue_columns,
+    decode_request_queue_columns,
+)
+
+from .binary_file_path import ASK_ORDER_BIN_PATH, EVENT_QUEUE_BIN_PATH  # noqa: E402
+from .fake_rpc import request_queue_data  # noqa: E402
+
+
+@pytest.fixture(scope="module", name="ask_data")
+def fixture_ask_data() -> bytes:
+    with open(ASK_ORDER_BIN_PATH, "r") as input_file:
+        return base64.decodebytes(input_file.read().encode("ascii"))
+
+
+def test_columns_match_orders(market_state, ask_data):
+    order_book = OrderBook.from_bytes(market_state, ask_data)
+    columns = order_book.to_arrays()
+    orders = list(order_book.orders())
+    assert len(columns) == len(orders) == 15
+    assert columns.order_ids() == [o.order_id for o in orders]
+    assert columns.price_lots.tolist() == [o.info.price_lots for o in orders]
+    assert columns.quantity.tolist() == [o.info.size_lots for o in orders]
+    assert columns.seq_no.tolist() == [o.order_id & 0xFFFFFFFFFFFFFFFF for o in orders]
+    assert columns.owner_slot.tolist() == [o.open_order_slot for o in orders]
+    assert columns.fee_tier.tolist() == [o.fee_tier for o in orders]
+    assert columns.client_order_id.tolist() == [o.client_id for o in orders]
+    assert [bytes(owner) for owner in columns.owner] == [bytes(o.open_order_address) for o in orders]
+
+
+def test_from_bytes_matches_to_arrays(market_state, ask_data):
+    columns = ColumnarOrderBook.from_bytes(market_state, ask_data)
+    assert columns.order_ids() == OrderBook.from_bytes(market_state, ask_data).to_arrays().order_ids()
+
+
+def test_get_l2_matches_order_book(market_state, ask_data):
+    order_book = OrderBook.from_bytes(market_state, ask_data)
+    columns = order_book.to_arrays()
+    for depth in range(0, 17):
+        assert columns.get_l2(depth) == order_book.get_l2(depth)
+
+
+def test_vectorized_conversions(market_state):
+    lots = np.array([0, 1, 117446, 40632, 2**40], dtype=np.uint64)
+    assert market_state.price_lots_to_number_array(lots).tolist() == [
+        market_state.price_lots_to_number(int(x)) for x in lots
+    ]
+    assert market_state.base_size_lots_to_number_array(lots).tolist() == [
+        market_state.base_size_lots_to_number(int(x)) for x in lots
+    ]
+    assert market_state.quote_size_lots_to_number_array(lots).tolist() == [
+        market_state.quote_size_lots_to_number(int(x)) for x in lots
+    ]
+
+
+def test_bids_are_sorted_descending(market_state, ask_data):
+    # Flip the account flags from asks (bit 6) to bids (bit 5) to read the same slab as a bid book.
+    bid_data = ask_data[:5] + bytes([ask_data[5] ^ 0b1100000]) + ask_data[6:]
+    order_book = OrderBook.from_bytes(market_state, bid_data)
+    columns = order_book.to_arrays()
+    assert columns.order_ids() == [o.order_id for o in order_book.orders()][::-1]
+    assert columns.get_l2(5) == order_book.get_l2(5)
+
+
+def test_event_queue_columns_match_decode_event_queue():
+    with open(EVENT_QUEUE_BIN_PATH, "r") as input_file:
+        data = base64.decodebytes(input_file.read().encode("ascii"))
+    for history in (None, 1, 100, 20000):
+        events = decode_event_queue(data, history)
+        columns = decode_event_queue_columns(data, history)
+        assert len(columns) == len(events)
+        assert list(columns) == events
+        assert columns.fill.tolist() == [e.event_flags.fill for e in events]
+        assert columns.out.tolist() == [e.event_flags.out for e in events]
+        assert columns.bid.tolist() == [e.event_flags.bid for e in events]
+        assert columns.maker.tolist() == [e.event_flags.maker for e in events]
+        assert columns.native_quantity_paid.tolist() == [e.native_quantity_paid for e in events]
+        assert columns.order_ids() == [e.order_id for e in events]
+
+
+def test_request_queue_columns_match_decode_request_queue():
+    data = request_queue_data()
+    requests = decode_request_queue(data)
+    columns = decode_request_queue_columns(data)
+    assert list(columns) == requests
+    assert columns.cancel_order.tolist() == [r.request_flags.cancel_order for r in requests]
+    assert columns.max_base_size_or_cancel_id.tolist() == [r.max_base_size_or_cancel_id for r in requests]
+
+
+def _fill_event(order_id: int, flags: Tuple[bool, bool], quantities: Tuple[int, int, int]) -> Event:
+    """Fill event of `order_id` with the `(bid, maker)` flags and the `(released, paid, fee)` quantities."""
+    bid, maker = flags
+    released, paid, fee = quantities
+    return Event(
+        event_flags=EventFlags(fill=True, out=False, bid=bid, maker=maker),
+        open_order_slot=1,
+        fee_tier=0,
+        native_quantity_released=released,
+        native_quantity_paid=paid,
+        native_fee_or_rebate=fee,
+        order_id=order_id,
+        public_key=PublicKey(order_id % 256),
+        client_order_id=0,
+    )
+
+
+def test_parse_fill_events_matches_parse_fill_event(market_state):
+    market = Market(None, market_state)
+    events = [
+        _fill_event(i << 70 | i, flags, quantities)
+        for i, (flags, quantities) in enumerate(
+            ((bid, maker), (released, paid, fee))
+            for bid in (True, False)
+            for maker in (True, False)
+            for released in (1, 117446, 3 * 10**12, 2**62)
+            for paid in (1, 40632, 7 * 10**11)
+            for fee in (0, 13, 99999)
+        )
+    ]
+    fills = market.parse_fill_events(events)
+    assert fills.to_filled_orders() == [market.parse_fill_event(e) for e in events]
+    assert fills.price_before_fees.tolist() == [
+        e.native_quantity_released + (1 if e.event_flags.bid == e.event_flags.maker else -1) * e.native_fee_or_rebate
+        for e in events
+    ]
+
+
+def test_parse_fill_events_from_masked_columns(market_state):
+    market = Market(None, market_state)
+    fills = [_fill_event(i, (i % 2 == 0, i % 3 == 0), (1000 + i, 10 + i, i)) for i in range(10)]
+    outs = [
+        e._replace(event_flags=EventFlags(fill=False, out=True, bid=True, maker=False), native_quantity_paid=0)
+        for e in fills
+    ]
+    columns = EventQueueColumns.from_events([e for pair in zip(fills, outs) for e in pair])
+    assert list(columns) == [e for pair in zip(fills, outs) for e in pair]
+    fill_columns = market.parse_fill_events(columns[columns.fill & (columns.native_quantity_paid > 0)])
+    assert fill_columns.to_filled_orders() == [market.parse_fill_event(e) for e in fills]
+    with pytest.raises(ZeroDivisionError):
+        market.parse_fill_events(columns)
@@ -0,0 +1,67 @@
+"""Tests for the compiled layout registry."""
+import base64
+
+import pytest
+
+from pyserum._layouts.account_flags import ACCOUNT_FLAGS_LAYOUT
+from pyserum._layouts.compiled import compiled, is_compiled
+from pyserum._layouts.instructions import INSTRUCTIONS_LAYOUT
+from pyserum._layouts.market import MARKET_LAYOUT, MINT_LAYOUT
+from pyserum._layouts.open_orders import OPEN_ORDERS_LAYOUT
+from pyserum._layouts.queue import EVENT_LAYOUT, QUEUE_HEADER_LAYOUT, REQUEST_LAYOUT
+from pyserum._layouts.slab import ORDER_BOOK_LAYOUT, SLAB_LAYOUT
+
+from .binary_file_path import ASK_ORDER_BIN_PATH, EVENT_QUEUE_BIN_PATH
+
+NEW_ORDER_DATA = bytes.fromhex("00010000000100000001000000000000000200000000000000020000000300000000000000")
+
+
+def _read(path: str) -> bytes:
+    with open(path, "r") as input_file:
+        return base64.decodebytes(input_file.read().encode("ascii"))
+
+
+@pytest.mark.parametrize(
+    "layout",
+    [
+        ACCOUNT_FLAGS_LAYOUT,
+        MARKET_LAYOUT,
+        MINT_LAYOUT,
+        OPEN_ORDERS_LAYOUT,
+        QUEUE_HEADER_LAYOUT,
+        EVENT_LAYOUT,
+        REQUEST_LAYOUT,
+        SLAB_LAYOUT,
+        ORDER_BOOK_LAYOUT,
+        INSTRUCTIONS_LAYOUT,
+    ],
+)
+def test_layout_is_compiled(layout):
+    assert is_compiled(layout)
+    assert compiled(layout) is compiled(layout)
+
+
+@pytest.mark.parametrize(
+    "layout, data",
+    [
+        (MARKET_LAYOUT, bytes(MARKET_LAYOUT.sizeof())),
+        (OPEN_ORDERS_LAYOUT, bytes(OPEN_ORDERS_LAYOUT.sizeof())),
+        (REQUEST_LAYOUT, bytes(REQUEST_LAYOUT.sizeof())),
+        (QUEUE_HEADER_LAYOUT, _read(EVENT_QUEUE_BIN_PATH)[: QUEUE_HEADER_LAYOUT.sizeof()]),
+        (EVENT_LAYOUT, _read(EVENT_QUEUE_BIN_PATH)[37 : 37 + EVENT_LAYOUT.sizeof()]),  # noqa: E203
+        (ORDER_BOOK_LAYOUT, _read(ASK_ORDER_BIN_PATH)),
+        (INSTRUCTIONS_LAYOUT, NEW_ORDER_DATA),
+    ],
+)
+def test_compiled_layout_matches_interpreted_layout(layout, data):
+    parsed = layout.parse(data)
+    assert compiled(layout).parse(data) == parsed
+    assert compiled(layout).build(parsed) == layout.build(parsed)
+
+
+def test_uncompilable_layout_falls_back():
+    from construct import Int8ul, Struct, Switch  # pylint: disable=import-outside-toplevel
+
+    layout = Struct("tag" / Int8ul, "value" / Switch(lambda this: this.tag, {1: Int8ul}))
+    assert not is_compiled(layout)
+    assert compiled(layout).parse(b"\x01\x02").value == 2
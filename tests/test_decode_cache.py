@@ -0,0 +1,70 @@
+import pytest
+from solana.publickey import PublicKey
+from solana.rpc.api import Client
+
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import DecodeCache, DecodeCacheStats, Market, State
+
+from .fake_rpc import KEYS, FakeRpc
+
+
+@pytest.fixture(name="market")
+def fixture_market(fake_rpc: FakeRpc) -> Market:
+    state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, fake_rpc.accounts[str(KEYS["own_address"])])
+    return Market(Client(fake_rpc.endpoint), state, decode_cache=DecodeCache())
+
+
+def test_get_or_decode_skips_unchanged_data():
+    cache = DecodeCache()
+    decoded = []
+
+    def decode(data: bytes):
+        decoded.append(data)
+        return [data]
+
+    first = cache.get_or_decode(PublicKey(1), "kind", b"abc", decode)
+    assert cache.get_or_decode(PublicKey(1), "kind", b"abc", decode) is first
+    assert cache.get_or_decode(PublicKey(1), "other", b"abc", decode) is not first
+    assert cache.get_or_decode(PublicKey(1), "kind", b"abd", decode) == [b"abd"]
+    assert decoded == [b"abc", b"abc", b"abd"]
+    assert cache.stats() == DecodeCacheStats(hits=1, misses=3, evictions=0, size=2, bytes_saved=3)
+
+
+def test_least_recently_used_account_is_evicted():
+    cache = DecodeCache(max_size=2)
+    for i in (1, 2, 1, 3):
+        cache.get_or_decode(PublicKey(i), "kind", b"data", bytes)
+    assert cache.stats().evictions == 1
+    cache.get_or_decode(PublicKey(1), "kind", b"data", bytes)
+    cache.get_or_decode(PublicKey(2), "kind", b"data", bytes)
+    assert cache.stats()._replace(bytes_saved=0) == DecodeCacheStats(
+        hits=2, misses=4, evictions=2, size=2, bytes_saved=0
+    )
+    with pytest.raises(ValueError):
+        DecodeCache(max_size=0)
+
+
+def test_invalidate():
+    cache = DecodeCache()
+    cache.get_or_decode(PublicKey(1), "kind", b"data", bytes)
+    cache.get_or_decode(PublicKey(2), "kind", b"data", bytes)
+    cache.invalidate(PublicKey(1))
+    assert cache.stats().size == 1
+    cache.invalidate()
+    assert cache.stats().size == 0
+
+
+def test_market_reuses_decoded_accounts(market: Market, fake_rpc: FakeRpc):
+    asks = market.load_asks()
+    assert market.load_asks() is asks
+    assert market.load_asks(lazy=True) is not asks
+    assert market.load_bids() is not asks
+    events = market.load_event_queue()
+    assert market.load_event_queue() is events
+    stats = market.decode_cache.stats()
+    assert (stats.hits, stats.misses) == (2, 4)
+
+    fake_rpc.accounts[str(KEYS["asks"])] = fake_rpc.accounts[str(KEYS["asks"])][:-1] + b"\x01"
+    assert market.load_asks() is not asks
+    assert [o.order_id for o in market.load_asks().orders()] == [o.order_id for o in asks.orders()]
+    assert market.decode_cache.stats().misses == 5
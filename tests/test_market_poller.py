@@ -0,0 +1,117 @@
+import asyncio
+from typing import List
+
+import pytest
+from solana.publickey import PublicKey
+
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import AsyncMarket, MarketBookUpdate, MarketPoller, State
+
+from .fake_rpc import KEYS, FakeAsyncClient, FakeRpc, market_accounts, market_data
+
+RECORDED = market_accounts()
+
+
+def _key(i: int) -> PublicKey:
+    return PublicKey(i.to_bytes(32, "big"))
+
+
+def _add_market(fake_rpc: FakeRpc, conn: FakeAsyncClient, i: int) -> AsyncMarket:
+    keys = dict(
+        own_address=_key(10 * i + 1), bids=_key(10 * i + 2), asks=_key(10 * i + 3), event_queue=_key(10 * i + 4)
+    )
+    fake_rpc.accounts[str(keys["bids"])] = RECORDED[str(KEYS["bids"])]
+    fake_rpc.accounts[str(keys["asks"])] = RECORDED[str(KEYS["asks"])]
+    fake_rpc.accounts[str(keys["event_queue"])] = RECORDED[str(KEYS["event_queue"])]
+    return AsyncMarket(conn, State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, market_data(keys)))
+
+
+@pytest.fixture(name="fake_rpc")
+def fixture_fake_rpc():
+    fake = FakeRpc(slot=77)
+    yield fake
+    fake.close()
+
+
+def test_poll_once_batches_due_markets(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc)
+    updates: List[MarketBookUpdate] = []
+    poller = MarketPoller(conn, updates.append)
+    markets = [_add_market(fake_rpc, conn, i) for i in range(60)]
+    for market in markets:
+        poller.add(market, 10.0)
+
+    assert asyncio.run(poller.poll_once()) == 60
+    # 120 accounts, in chunks of at most 100 accounts sent concurrently.
+    assert sorted(len(request["params"][0]) for request in fake_rpc.requests) == [20, 100]
+    assert len(updates) == 60 and {update.market for update in updates} == set(markets)
+    expected = markets[0]._parse_bids_or_asks(RECORDED[str(KEYS["asks"])])  # pylint: disable=protected-access
+    assert all(update.asks.get_l2(10) == expected.get_l2(10) for update in updates)
+    assert all(update.slot == 77 and update.event_queue is None for update in updates)
+    # Nothing is due until the interval elapsed.
+    assert asyncio.run(poller.poll_once()) == 0
+    stats = poller.stats()[str(markets[0].state.public_key())]
+    assert (stats.refreshes, stats.errors, stats.last_slot, stats.target_interval) == (1, 0, 77, 10.0)
+
+
+def test_requests_in_flight_are_bounded(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc, latency=0.01)
+    poller = MarketPoller(conn, lambda update: None, max_in_flight=3, include_event_queue=True, chunk_size=10)
+    for i in range(30):
+        poller.add(_add_market(fake_rpc, conn, i), 10.0)
+
+    assert asyncio.run(poller.poll_once()) == 30
+    # 3 markets of 3 accounts per request.
+    assert len(fake_rpc.requests) == 10
+    assert conn._provider.max_in_flight == 3  # pylint: disable=protected-access
+
+
+def test_run_follows_intervals(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc)
+    updates: List[MarketBookUpdate] = []
+
+    async def on_update(update: MarketBookUpdate):
+        updates.append(update)
+
+    poller = MarketPoller(conn, on_update, include_event_queue=True)
+    fast, slow = _add_market(fake_rpc, conn, 1), _add_market(fake_rpc, conn, 2)
+    poller.add(fast, 0.02)
+    poller.add(slow, 0.2)
+
+    async def run():
+        task = asyncio.ensure_future(poller.run())
+        await asyncio.sleep(0.5)
+        poller.stop()
+        await task
+
+    asyncio.run(run())
+    stats = poller.stats()
+    fast_stats, slow_stats = stats[str(fast.state.public_key())], stats[str(slow.state.public_key())]
+    assert 2 <= slow_stats.refreshes <= 4
+    assert fast_stats.refreshes > 3 * slow_stats.refreshes
+    assert 0 < slow_stats.refresh_rate < fast_stats.refresh_rate
+    assert updates[0].event_queue is not None
+
+
+def test_missing_accounts_are_counted_as_errors(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc)
+    updates: List[MarketBookUpdate] = []
+    poller = MarketPoller(conn, updates.append)
+    market = _add_market(fake_rpc, conn, 1)
+    del fake_rpc.accounts[str(market.state.asks())]
+    poller.add(market, 1.0)
+    poller.add(_add_market(fake_rpc, conn, 2), 1.0)
+
+    assert asyncio.run(poller.poll_once()) == 2
+    assert len(updates) == 1
+    assert poller.stats()[str(market.state.public_key())].errors == 1
+
+
+def test_invalid_arguments(fake_rpc: FakeRpc):
+    conn = FakeAsyncClient(fake_rpc)
+    with pytest.raises(ValueError):
+        MarketPoller(conn, print, max_in_flight=0)
+    with pytest.raises(ValueError):
+        MarketPoller(conn, print, include_event_queue=True, chunk_size=2)
+    with pytest.raises(ValueError):
+        MarketPoller(conn, print).add(_add_market(fake_rpc, conn, 1), 0)
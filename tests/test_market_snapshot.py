@@ -0,0 +1,44 @@
+import pytest
+from solana.rpc.api import Client
+
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import Market, MarketSnapshot, OrderBook, State
+from pyserum.market._internal.queue import decode_event_queue
+
+from .fake_rpc import KEYS, OPEN_ORDERS_ADDRESS, FakeRpc
+
+
+@pytest.fixture(name="market")
+def fixture_market(fake_rpc: FakeRpc) -> Market:
+    conn = Client(fake_rpc.endpoint)
+    state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, fake_rpc.accounts[str(KEYS["own_address"])])
+    return Market(conn, state)
+
+
+def test_load_snapshot_uses_one_request(market: Market, fake_rpc: FakeRpc):
+    snapshot = market.load_snapshot([OPEN_ORDERS_ADDRESS])
+    assert isinstance(snapshot, MarketSnapshot)
+    assert fake_rpc.methods() == ["getMultipleAccounts"]
+    assert snapshot.slot == 1234
+    assert snapshot.state.bids() == KEYS["bids"]
+    assert len(snapshot.open_orders_accounts) == 1
+    assert snapshot.open_orders_accounts[0].address == OPEN_ORDERS_ADDRESS
+    assert snapshot.open_orders_accounts[0].free_slot_bits == ((1 << 128) - 1) ^ (1 << 3) ^ (1 << 7)
+
+
+def test_load_snapshot_matches_separate_loads(market: Market, fake_rpc: FakeRpc):
+    snapshot = market.load_snapshot()
+    asks = OrderBook.from_bytes(market.state, fake_rpc.accounts[str(KEYS["asks"])])
+    assert list(snapshot.asks.orders()) == list(market.load_asks().orders()) == list(asks.orders())
+    assert list(snapshot.bids.orders()) == list(market.load_bids().orders())
+    assert snapshot.bids.get_l2(3) == market.load_bids().get_l2(3)
+    assert snapshot.event_queue == market.load_event_queue()
+    assert snapshot.event_queue == decode_event_queue(fake_rpc.accounts[str(KEYS["event_queue"])])
+    assert snapshot.request_queue == market.load_request_queue()
+    assert snapshot.open_orders_accounts == []
+
+
+def test_load_snapshot_fails_on_missing_account(market: Market, fake_rpc: FakeRpc):
+    del fake_rpc.accounts[str(KEYS["asks"])]
+    with pytest.raises(Exception, match="Cannot load byte data."):
+        market.load_snapshot()
@@ -0,0 +1,97 @@
+from fractions import Fraction
+
+import pytest
+from construct import Container
+from solana.publickey import PublicKey
+
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import State
+from pyserum.market.types import AccountFlags
+
+KEY_FIELDS = ("own_address", "base_mint", "quote_mint", "base_vault", "quote_vault", "request_queue", "event_queue")
+
+
+@pytest.fixture(scope="module")
+def market_state() -> State:
+    keys = {field: bytes([i + 1]) * 32 for i, field in enumerate(KEY_FIELDS + ("bids", "asks"))}
+    return State(
+        Container(
+            account_flags=Container(
+                _io=None,
+                initialized=True,
+                market=True,
+                open_orders=False,
+                request_queue=False,
+                event_queue=False,
+                bids=False,
+                asks=False,
+            ),
+            fee_rate_bps=22,
+            vault_signer_nonce=1,
+            base_lot_size=100000,
+            quote_lot_size=100,
+            **keys,
+        ),
+        program_id=DEFAULT_DEX_PROGRAM_ID,
+        base_mint_decimals=6,
+        quote_mint_decimals=6,
+    )
+
+
+def test_public_keys_are_cached(market_state: State):  # pylint: disable=redefined-outer-name
+    assert market_state.bids() == PublicKey(bytes([8]) * 32)
+    assert market_state.asks() == PublicKey(bytes([9]) * 32)
+    assert market_state.bids() is market_state.bids()
+    for i, field in enumerate(KEY_FIELDS):
+        accessor = "public_key" if field == "own_address" else field
+        assert getattr(market_state, accessor)() == PublicKey(bytes([i + 1]) * 32)
+
+
+def test_account_flags(market_state: State):  # pylint: disable=redefined-outer-name
+    assert market_state.account_flags() == AccountFlags(initialized=True, market=True)
+
+
+def test_state_is_immutable(market_state: State):  # pylint: disable=redefined-outer-name
+    with pytest.raises(AttributeError):
+        market_state._base_lot_size = 1  # pylint: disable=protected-access
+    with pytest.raises(AttributeError):
+        market_state.extra = 1  # pylint: disable=attribute-defined-outside-init
+    assert not hasattr(market_state, "__dict__")
+
+
+def test_conversions(market_state: State):  # pylint: disable=redefined-outer-name
+    assert market_state.base_spl_token_multiplier() == 10 ** 6
+    assert market_state.price_lots_to_number(1234) == 1.234
+    assert market_state.price_number_to_lots(1.234) == 1234
+    assert market_state.base_size_lots_to_number(15) == 1.5
+    assert market_state.base_size_number_to_lots(1.55) == 15
+    assert market_state.quote_size_lots_to_number(15) == 0.0015
+    assert market_state.quote_size_number_to_lots(0.0015) == 15
+
+
+def test_exact_conversions(market_state: State):  # pylint: disable=redefined-outer-name
+    assert market_state.price_lots_to_fraction(1234) == Fraction(617, 500)
+    assert market_state.base_size_lots_to_fraction(15) == Fraction(3, 2)
+    assert market_state.quote_size_lots_to_fraction(15) == Fraction(3, 2000)
+    assert market_state.price_exact_to_lots("1.234") == 1234
+    assert market_state.price_exact_to_lots(Fraction(617, 500)) == 1234
+    assert market_state.base_size_exact_to_lots("1.59999") == 15
+    assert market_state.quote_size_exact_to_lots("0.0015") == 15
+    # 0.0157 * 10 ** 6 is 15699.999999999998 with floats.
+    assert market_state.quote_size_exact_to_lots("0.0157") == 157
+    assert market_state.quote_size_number_to_lots(0.0157) == 156
+
+
+def test_batch_conversions(market_state: State):  # pylint: disable=redefined-outer-name
+    lots = [0, 1, 1234, 987654321]
+    assert market_state.price_lots_to_numbers(lots) == [market_state.price_lots_to_number(p) for p in lots]
+    assert market_state.base_size_lots_to_numbers(lots) == [market_state.base_size_lots_to_number(s) for s in lots]
+    assert market_state.quote_size_lots_to_numbers(lots) == [market_state.quote_size_lots_to_number(s) for s in lots]
+    numbers = [0.0, 0.1, 123.45, 0.29]
+    assert market_state.price_numbers_to_lots(numbers) == [market_state.price_number_to_lots(p) for p in numbers]
+    assert market_state.base_size_numbers_to_lots(numbers) == [
+        market_state.base_size_number_to_lots(s) for s in numbers
+    ]
+    assert market_state.quote_size_numbers_to_lots(numbers) == [
+        market_state.quote_size_number_to_lots(s) for s in numbers
+    ]
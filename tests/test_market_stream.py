@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import json
+from typing import Any, Dict, List
+
+import pytest
+from solana.rpc.api import Client
+
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import Market, MarketStream, State
+from pyserum.market._internal.queue import decode_event_queue
+from pyserum.market.stream import ASKS, BIDS, EVENT_QUEUE
+from pyserum.utils import RPCError
+
+from .fake_rpc import KEYS, market_accounts
+
+websockets = pytest.importorskip("websockets")
+
+RECORDED = market_accounts()
+
+
+def _notification(subscription: int, slot: int, data: bytes) -> str:
+    value = {
+        "data": [base64.b64encode(data).decode("ascii"), "base64"],
+        "lamports": 1,
+        "owner": "",
+        "executable": False,
+    }
+    result = {"context": {"slot": slot}, "value": value}
+    return json.dumps(
+        {"jsonrpc": "2.0", "method": "accountNotification", "params": {"result": result, "subscription": subscription}}
+    )
+
+
+class ReplayServer:
+    """Websocket stand-in of the RPC node, replies to `accountSubscribe` and replays recorded notifications.
+
+    The first connection is dropped after its notifications to exercise the reconnection.
+    """
+
+    def __init__(self) -> None:
+        self.subscribe_requests: List[Dict[str, Any]] = []
+        self.connections = 0
+
+    async def handler(self, websocket, *args):  # pylint: disable=unused-argument
+        self.connections += 1
+        subscriptions = {}
+        for _ in range(3):
+            request = json.loads(await websocket.recv())
+            self.subscribe_requests.append(request)
+            subscription = 100 * self.connections + request["id"]
+            subscriptions[request["params"][0]] = subscription
+            await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": subscription}))
+        if self.connections == 1:
+            # A notification of an unknown subscription is ignored.
+            await websocket.send(_notification(999, 9, b""))
+            for slot, key in enumerate(("bids", "asks", "event_queue"), 10):
+                await websocket.send(_notification(subscriptions[str(KEYS[key])], slot, RECORDED[str(KEYS[key])]))
+            return
+        await websocket.send(_notification(subscriptions[str(KEYS["asks"])], 13, RECORDED[str(KEYS["asks"])]))
+        await websocket.wait_closed()
+
+
+def test_stream_decodes_notifications_and_reconnects():
+    state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, RECORDED[str(KEYS["own_address"])])
+    market = Market(Client("http://stubbed_endpoint:123/"), state)
+    replay = ReplayServer()
+
+    async def run():
+        async with websockets.serve(replay.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = MarketStream(market, "ws://127.0.0.1:%d" % port, reconnect_delay=0.01)
+            updates = []
+            async for update in stream:
+                updates.append(update)
+                if len(updates) == 4:
+                    await stream.close()
+            return stream, updates
+
+    stream, updates = asyncio.run(asyncio.wait_for(run(), 10))
+    assert [(update.account, update.slot) for update in updates] == [
+        (BIDS, 10),
+        (ASKS, 11),
+        (EVENT_QUEUE, 12),
+        (ASKS, 13),
+    ]
+    expected_asks = market._parse_bids_or_asks(RECORDED[str(KEYS["asks"])])  # pylint: disable=protected-access
+    assert updates[1].value.get_l2(5) == expected_asks.get_l2(5)
+    assert list(updates[0].value.orders()) == list(
+        market._parse_bids_or_asks(RECORDED[str(KEYS["bids"])]).orders()  # pylint: disable=protected-access
+    )
+    assert updates[2].value == decode_event_queue(RECORDED[str(KEYS["event_queue"])])
+    assert stream.connections == replay.connections == 2
+    assert [request["params"][0] for request in replay.subscribe_requests] == [
+        str(KEYS[key]) for key in ("bids", "asks", "event_queue")
+    ] * 2
+    assert {request["method"] for request in replay.subscribe_requests} == {"accountSubscribe"}
+
+
+def test_stream_rejects_unknown_accounts():
+    state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, RECORDED[str(KEYS["own_address"])])
+    with pytest.raises(ValueError):
+        MarketStream(Market(Client("http://stubbed_endpoint:123/"), state), "ws://127.0.0.1:1", accounts=["vault"])
+
+
+def test_rejected_subscription_ends_the_stream():
+    state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, RECORDED[str(KEYS["own_address"])])
+    market = Market(Client("http://stubbed_endpoint:123/"), state)
+    connections = []
+
+    async def handler(websocket, *args):  # pylint: disable=unused-argument
+        connections.append(websocket)
+        request = json.loads(await websocket.recv())
+        # A response to a request the stream did not send is ignored.
+        await websocket.send(json.dumps({"jsonrpc": "2.0", "id": 999, "result": 1}))
+        error = {"code": -32602, "message": "Invalid param"}
+        await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "error": error}))
+        await websocket.wait_closed()
+
+    async def run():
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = MarketStream(market, "ws://127.0.0.1:%d" % port, accounts=[BIDS], reconnect_delay=0.01)
+            return [update async for update in stream]
+
+    with pytest.raises(RPCError, match="Cannot subscribe to bids"):
+        asyncio.run(asyncio.wait_for(run(), 10))
+    assert len(connections) == 1
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from solana.publickey import PublicKey
+from solana.rpc.api import Client
+from spl.token.constants import WRAPPED_SOL_MINT  # type: ignore
+
+from pyserum._layouts.market import MINT_LAYOUT
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import Market, State
+from pyserum.mint_decimals import MintDecimalsRegistry
+
+from .fake_rpc import FakeRpc, market_data
+
+
+def _key(i: int) -> PublicKey:
+    return PublicKey(i.to_bytes(32, "big"))
+
+
+QUOTE_MINT = _key(1000)
+
+
+def _market_keys(i: int):
+    return dict(own_address=_key(i + 1), base_mint=_key(i + 501), quote_mint=QUOTE_MINT)
+
+
+@pytest.fixture(name="fake_rpc")
+def fixture_fake_rpc():
+    accounts = {}
+    for i in range(150):
+        keys = _market_keys(i)
+        accounts[str(keys["own_address"])] = market_data(keys)
+        accounts[str(keys["base_mint"])] = MINT_LAYOUT.build(dict(decimals=i % 10))
+    accounts[str(QUOTE_MINT)] = MINT_LAYOUT.build(dict(decimals=6))
+    fake = FakeRpc(accounts)
+    yield fake
+    fake.close()
+
+
+def test_load_many_batches_markets_and_mints(fake_rpc: FakeRpc):
+    conn = Client(fake_rpc.endpoint)
+    registry = MintDecimalsRegistry()
+    markets = Market.load_many(conn, [_key(i + 1) for i in range(150)], registry=registry)
+    # Two requests for the 150 markets and two for their 151 unique mints.
+    assert fake_rpc.methods() == ["getMultipleAccounts"] * 4
+    assert [len(request["params"][0]) for request in fake_rpc.requests] == [100, 50, 100, 51]
+    assert [m.state.public_key() for m in markets] == [_key(i + 1) for i in range(150)]
+    assert [m.state.base_spl_token_decimals() for m in markets] == [i % 10 for i in range(150)]
+    assert {m.state.quote_spl_token_decimals() for m in markets} == {6}
+    assert all(m.state.program_id() == DEFAULT_DEX_PROGRAM_ID for m in markets)
+
+
+def test_warm_start_needs_no_mint_requests(fake_rpc: FakeRpc, tmp_path):
+    conn = Client(fake_rpc.endpoint)
+    path = str(tmp_path / "mint_decimals.json")
+    State.load_many(conn, [_key(i + 1) for i in range(10)], DEFAULT_DEX_PROGRAM_ID, MintDecimalsRegistry(path))
+    with open(path) as stored:
+        assert json.load(stored)[str(QUOTE_MINT)] == 6
+
+    del fake_rpc.requests[:]
+    registry = MintDecimalsRegistry(path)
+    state = State.load(conn, _key(4), DEFAULT_DEX_PROGRAM_ID, registry)
+    assert fake_rpc.methods() == ["getAccountInfo"]
+    assert state.base_spl_token_decimals() == 3
+    assert state.quote_spl_token_decimals() == 6
+
+
+def test_load_fetches_both_mints_at_once(fake_rpc: FakeRpc):
+    conn = Client(fake_rpc.endpoint)
+    state = State.load(conn, _key(8), DEFAULT_DEX_PROGRAM_ID, MintDecimalsRegistry())
+    assert fake_rpc.methods() == ["getAccountInfo", "getMultipleAccounts"]
+    assert (state.base_spl_token_decimals(), state.quote_spl_token_decimals()) == (7, 6)
+
+
+def test_registry_knows_wrapped_sol():
+    registry = MintDecimalsRegistry()
+    assert registry.get(WRAPPED_SOL_MINT) == 9
+    assert registry.load(Client("http://stubbed_endpoint:123/"), [WRAPPED_SOL_MINT]) == [9]
+    registry.set(QUOTE_MINT, 6)
+    assert QUOTE_MINT in registry and len(registry) == 2
+
+
+def test_load_many_fails_on_missing_market(fake_rpc: FakeRpc):
+    with pytest.raises(Exception, match="Cannot load byte data."):
+        Market.load_many(Client(fake_rpc.endpoint), [_key(1), _key(999)], registry=MintDecimalsRegistry())
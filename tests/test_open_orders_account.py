@@ -6,6 +6,7 @@ from solana.publickey import PublicKey
 from pyserum.open_orders_account import OPEN_ORDERS_LAYOUT, OpenOrdersAccount
 
 from .binary_file_path import OPEN_ORDER_ACCOUNT_BIN_PATH
+from .fake_rpc import open_orders_data
 
 
 # TODO: This tests is not ran due to the v1 layout to v2 layout upgrade, we
@@ -41,3 +42,38 @@ def test_decode_open_order_account():
         assert len([order for order in open_order_account.orders if order != 0]) == 3
         # the first three order are bid order
         assert open_order_account.is_bid_bits == 0b111
+
+
+def test_from_bytes_decodes_used_slots():
+    data = open_orders_data([0, 5, 127], stale_client_id=99)
+    account = OpenOrdersAccount.from_bytes(PublicKey(3), data)
+    assert account.address == PublicKey(3)
+    assert account.market == PublicKey(1)
+    assert account.owner == PublicKey(2)
+    assert (account.base_token_free, account.base_token_total) == (3, 4)
+    assert (account.quote_token_free, account.quote_token_total) == (5, 6)
+    assert account.free_slot_bits == ((1 << 128) - 1) ^ (1 << 0 | 1 << 5 | 1 << 127)
+    assert account.is_bid_bits == 1 << 127 | 1
+    assert len(account.orders) == len(account.client_ids) == 128
+    assert [slot for slot, order in enumerate(account.orders) if order] == [0, 5, 127]
+    assert account.orders[5] == 6 << 64 | 5
+    assert account.orders[127] == 128 << 64 | 127
+    # Free slots are not decoded, so stale client ids do not leak through.
+    assert [slot for slot, client_id in enumerate(account.client_ids) if client_id] == [0, 5, 127]
+    assert account.client_ids[5] == 1005
+
+
+def test_from_bytes_rejects_other_accounts():
+    with pytest.raises(Exception):
+        OpenOrdersAccount.from_bytes(PublicKey(3), open_orders_data([], open_orders=False))
+
+
+def test_from_many():
+    buffers = [open_orders_data([slot]) for slot in range(4)]
+    addresses = [PublicKey(10 + i) for i in range(4)]
+    accounts = OpenOrdersAccount.from_many(addresses, buffers)
+    assert [a.address for a in accounts] == addresses
+    assert [a.orders.index(next(o for o in a.orders if o)) for a in accounts] == [0, 1, 2, 3]
+    assert accounts[0].market is accounts[3].market
+    with pytest.raises(ValueError):
+        OpenOrdersAccount.from_many(addresses[:1], buffers)
@@ -0,0 +1,72 @@
+import pytest
+
+from pyserum.market import OrderBook, State
+from pyserum.market.types import L2Delta
+
+from .order_book_data import BookOrder, order_book_data
+
+
+def _book(market_state: State, orders, is_bids: bool = False) -> OrderBook:
+    return OrderBook.from_bytes(market_state, order_book_data(orders, is_bids))
+
+
+PREVIOUS = [
+    BookOrder(100, 1, 10),
+    BookOrder(100, 2, 20),
+    BookOrder(101, 3, 5),
+    BookOrder(103, 4, 7),
+]
+CURRENT = [
+    BookOrder(100, 2, 15),  # partially filled
+    BookOrder(101, 3, 5),  # unchanged
+    BookOrder(102, 5, 8),  # new level
+    BookOrder(103, 4, 7),  # unchanged
+    BookOrder(103, 6, 1),  # added to an existing level
+]
+
+
+@pytest.mark.parametrize("is_bids", [False, True])
+def test_diff(market_state: State, is_bids: bool):
+    previous, current = _book(market_state, PREVIOUS, is_bids), _book(market_state, CURRENT, is_bids)
+    diff = current.diff(previous)
+    keys = {order.seq: order.key(is_bids) for order in PREVIOUS + CURRENT}
+    assert [order.order_id for order in diff.removed] == [keys[1]]
+    assert diff.removed[0].info.size_lots == 10
+    assert sorted(order.order_id for order in diff.added) == sorted([keys[5], keys[6]])
+    assert [(m.previous.info.size_lots, m.order.info.size_lots) for m in diff.modified] == [(20, 15)]
+    assert diff.modified[0].order.order_id == keys[2]
+    levels = [(level.price_lots, level.previous_size_lots, level.size_lots) for level in diff.levels]
+    expected = [(100, 30, 15), (102, 0, 8), (103, 7, 8)]
+    assert levels == (expected[::-1] if is_bids else expected)
+    assert not diff.is_empty()
+
+
+def test_diff_levels_match_l2(market_state: State):
+    previous, current = _book(market_state, PREVIOUS), _book(market_state, CURRENT)
+    l2 = {level.price_lots: level.size_lots for level in previous.get_l2(10)}
+    for level in current.diff(previous).levels:
+        assert isinstance(level, L2Delta)
+        assert level.size == market_state.base_size_lots_to_number(level.size_lots)
+        if level.size_lots:
+            l2[level.price_lots] = level.size_lots
+        else:
+            del l2[level.price_lots]
+    assert l2 == {level.price_lots: level.size_lots for level in current.get_l2(10)}
+
+
+def test_diff_of_identical_books_is_empty(market_state: State):
+    diff = _book(market_state, CURRENT).diff(_book(market_state, CURRENT))
+    assert diff.is_empty() and diff.levels == []
+
+
+def test_diff_from_and_to_empty_book(market_state: State):
+    empty, book = _book(market_state, []), _book(market_state, PREVIOUS)
+    assert len(book.diff(empty).added) == 4
+    removed = empty.diff(book)
+    assert len(removed.removed) == 4
+    assert [(level.price_lots, level.size_lots) for level in removed.levels] == [(100, 0), (101, 0), (103, 0)]
+
+
+def test_diff_rejects_other_side(market_state: State):
+    with pytest.raises(ValueError):
+        _book(market_state, PREVIOUS, True).diff(_book(market_state, PREVIOUS, False))
@@ -0,0 +1,50 @@
+from solana.publickey import PublicKey
+
+from pyserum.market import OrderBook, State
+from pyserum.market.core import MarketCore
+
+from .order_book_data import BookOrder, order_book_data
+
+
+class _Account:  # pylint: disable=too-few-public-methods
+    def __init__(self, address: PublicKey) -> None:
+        self.address = address
+
+
+def _owner(i: int) -> PublicKey:
+    return PublicKey(i.to_bytes(32, "big"))
+
+
+ORDERS = [
+    BookOrder(100, 1, 10, owner=bytes(_owner(1))),
+    BookOrder(100, 2, 20, owner=bytes(_owner(2))),
+    BookOrder(101, 3, 5, owner=bytes(_owner(1))),
+    BookOrder(102, 4, 7, owner=bytes(_owner(3))),
+    BookOrder(103, 5, 8, owner=bytes(_owner(2))),
+]
+
+
+def _book(market_state: State, is_bids: bool) -> OrderBook:
+    return OrderBook.from_bytes(market_state, order_book_data(ORDERS, is_bids))
+
+
+def test_orders_for_owners_keep_book_order(market_state: State):
+    for is_bids in (False, True):
+        book = _book(market_state, is_bids)
+        orders = list(book.orders())
+        for owners in ([_owner(1)], [_owner(2), _owner(1)], [_owner(3), _owner(2), _owner(1)]):
+            expected = [o for o in orders if o.open_order_address in owners]
+            assert book.orders_for_owners(owners) == expected
+        assert book.orders_for_owner(_owner(2)) == [o for o in orders if o.open_order_address == _owner(2)]
+        assert book.orders_for_owners([_owner(4)]) == []
+        assert book.orders_for_owners([]) == []
+
+
+def test_filter_orders_for_owner(market_state: State):
+    bids = _book(market_state, True)
+    asks = _book(market_state, False)
+    accounts = [_Account(_owner(3)), _Account(_owner(1))]
+    orders = MarketCore._filter_orders_for_owner(bids, asks, accounts)  # pylint: disable=protected-access
+    owners = {str(_owner(1)), str(_owner(3))}
+    assert orders == [o for o in [*bids.orders(), *asks.orders()] if str(o.open_order_address) in owners]
+    assert MarketCore._filter_orders_for_owner(bids, asks, []) == []  # pylint: disable=protected-access
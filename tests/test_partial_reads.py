@@ -0,0 +1,55 @@
+import asyncio
+
+from solana.rpc.api import Client
+
+from pyserum.market import AsyncMarket, Market, State
+from pyserum.market._internal.queue import decode_event_queue
+
+from .fake_rpc import KEYS, FakeAsyncClient, FakeRpc
+
+
+def test_recent_events_read_only_their_slots(fake_rpc: FakeRpc, recorded_state: State):
+    market = Market(Client(fake_rpc.endpoint), recorded_state)
+    event_queue = fake_rpc.accounts[str(KEYS["event_queue"])]
+    assert market.load_recent_events(20) == decode_event_queue(event_queue, 20)
+    requests = len(fake_rpc.requests)
+    assert market.load_recent_events(20) == decode_event_queue(event_queue, 20)
+    assert market.load_recent_fills(20) == market.load_fills(20)
+    requests_of_one_load = fake_rpc.requests[requests : requests + 3]  # noqa: E203
+    assert [request["params"][1]["dataSlice"]["length"] for request in requests_of_one_load] == [37, 20 * 88, 37]
+    # One full read, then a header read and one batch per load, then the full read of `load_fills`.
+    assert fake_rpc.round_trips == 1 + 2 * 2 + 1
+
+
+def test_recent_events_across_the_end_of_the_ring(fake_rpc: FakeRpc, recorded_state: State):
+    market = Market(Client(fake_rpc.endpoint), recorded_state)
+    market.load_recent_events(1)
+    event_queue = bytearray(fake_rpc.accounts[str(KEYS["event_queue"])])
+    # head = 2 and count = 1, the 5 newest events are in the last 4 slots and the first one.
+    event_queue[13:17], event_queue[21:25] = (2).to_bytes(4, "little"), (1).to_bytes(4, "little")
+    fake_rpc.accounts[str(KEYS["event_queue"])] = bytes(event_queue)
+    requests = len(fake_rpc.requests)
+    assert market.load_recent_events(5) == decode_event_queue(bytes(event_queue), 5)
+    assert len(fake_rpc.requests) == requests + 4
+
+
+def test_order_book_headers(fake_rpc: FakeRpc, recorded_state: State):
+    market = Market(Client(fake_rpc.endpoint), recorded_state)
+    assert market.load_bids_header() == market.load_bids().header()
+    assert market.load_asks_header().leaf_count == len(list(market.load_asks()))
+    assert [request["params"][1]["dataSlice"] for request in fake_rpc.requests[::2]] == [
+        {"offset": 0, "length": 45}
+    ] * 2
+
+
+def test_async_recent_events(fake_rpc: FakeRpc, recorded_state: State):
+    market = AsyncMarket(FakeAsyncClient(fake_rpc), recorded_state)
+
+    async def run():
+        return [await market.load_recent_fills(30) for _ in range(2)], await market.load_bids_header()
+
+    fills, header = asyncio.run(run())
+    sync_market = Market(Client(fake_rpc.endpoint), recorded_state)
+    assert fills == [sync_market.load_fills(30)] * 2
+    assert header == sync_market.load_bids_header()
+    assert fake_rpc.methods()[:5] == ["getAccountInfo"] * 5
@@ -0,0 +1,146 @@
+import math
+import random
+from fractions import Fraction
+
+import pytest
+
+from pyserum.market import OrderBook, State
+from pyserum.market.types import Depth
+
+from .order_book_data import BookOrder, order_book_data
+
+ORDERS = [
+    BookOrder(100, 1, 10),
+    BookOrder(100, 2, 20),
+    BookOrder(101, 3, 5),
+    BookOrder(103, 4, 7),
+]
+
+
+def _book_of(market_state: State, orders, is_bids: bool) -> OrderBook:
+    return OrderBook.from_bytes(market_state, order_book_data(orders, is_bids))
+
+
+def _book(market_state: State, is_bids: bool) -> OrderBook:
+    return _book_of(market_state, ORDERS, is_bids)
+
+
+def test_levels_match_l2(market_state: State):
+    for is_bids in (False, True):
+        book = _book(market_state, is_bids)
+        assert book.price_levels() is book.price_levels()
+        assert book.price_levels().levels() == book.get_l2(10)
+        assert book.price_levels().best_price_lots() == (103 if is_bids else 100)
+        assert len(book.price_levels()) == 3
+
+
+def test_ask_depth(market_state: State):
+    levels = _book(market_state, False).price_levels()
+    depth = Depth(size=0.0035, size_lots=35, quote_size=0.03505, quote_size_lots=3505, levels=2)
+    assert levels.depth_lots(101) == depth
+    assert levels.depth(10.1) == levels.depth(10.15) == levels.depth(Fraction(101, 10)) == depth
+    assert levels.depth(9.9).size_lots == 0
+    assert levels.depth_lots(1000).size_lots == 42
+    assert levels.depth_within_bps(100, 100) == depth
+    assert levels.depth_within_bps(100, 99).levels == 1
+
+
+def test_bid_depth(market_state: State):
+    levels = _book(market_state, True).price_levels()
+    assert levels.depth_lots(101).size_lots == 12
+    assert levels.depth_lots(Fraction(201, 2)).size_lots == 12
+    assert levels.depth(10.0).size_lots == 42
+    assert levels.depth_within_bps(104, 300).size_lots == 12
+
+
+def test_fill(market_state: State):
+    asks = _book(market_state, False).price_levels()
+    fill = asks.fill_lots(32)
+    assert (fill.impact_price_lots, fill.quote_size_lots, fill.levels) == (101, 3202, 2)
+    assert fill.average_price_lots == Fraction(3202, 32)
+    assert fill.average_price == pytest.approx(10.00625)
+    assert fill.impact_price == pytest.approx(10.1)
+    assert asks.fill(0.0032) == fill
+    assert asks.fill_lots(30).levels == 1
+    assert asks.fill_lots(42).impact_price_lots == 103
+    assert asks.fill_lots(43) is None
+    with pytest.raises(ValueError):
+        asks.fill_lots(0)
+
+    bids = _book(market_state, True).price_levels()
+    fill = bids.fill_lots(10)
+    assert (fill.impact_price_lots, fill.quote_size_lots, fill.levels) == (101, 1024, 2)
+
+
+def _reference_fill(orders, is_bids: bool, limit_price_lots: int, max_quantity_lots: int, fee_rate: Fraction):
+    """Order by order walk of the DEX matching loop."""
+    budget = None
+    if not is_bids:
+        budget = math.floor(max_quantity_lots * 10 * limit_price_lots / (1 + fee_rate)) // 10
+    size = quote = 0
+    for order in sorted(orders, key=lambda o: o.key(is_bids), reverse=is_bids):
+        if (order.price_lots < limit_price_lots) if is_bids else (order.price_lots > limit_price_lots):
+            break
+        trade = min(order.quantity, max_quantity_lots - size)
+        if budget is not None:
+            trade = min(trade, (budget - quote) // order.price_lots)
+        if trade == 0:
+            break
+        size += trade
+        quote += trade * order.price_lots
+    return size, quote, math.ceil(quote * 10 * fee_rate)
+
+
+def test_simulate_taker(market_state: State):
+    asks = _book(market_state, False).price_levels()
+    fill = asks.simulate_taker_lots(101, 32, fee_rate_bps=0)
+    assert (fill.size_lots, fill.quote_size_lots, fill.native_fee, fill.leftover_lots) == (32, 3202, 0, 0)
+    assert fill.average_price_lots == Fraction(3202, 32)
+    # The fee set aside from the quote budget of a buy at its limit price cuts the fill.
+    fill = asks.simulate_taker_lots(100, 30, fee_rate_bps=22)
+    assert (fill.size_lots, fill.quote_size_lots, fill.native_fee, fill.leftover_lots) == (29, 2900, 64, 1)
+    assert fill.fee == pytest.approx(0.000064)
+    assert asks.simulate_taker(10.0, 0.003, fee_rate_bps=22) == fill
+    fill = asks.simulate_taker_lots(99, 30, fee_rate_bps=22)
+    assert (fill.size_lots, fill.average_price, fill.leftover_lots) == (0, None, 30)
+
+    bids = _book(market_state, True).price_levels()
+    fill = bids.simulate_taker_lots(101, 100, fee_rate_bps=Fraction(45, 2))
+    assert (fill.size_lots, fill.quote_size_lots, fill.native_fee, fill.leftover_lots) == (12, 1226, 28, 88)
+
+
+def test_simulate_taker_matches_order_walk(market_state: State):
+    rng = random.Random(7)
+    for _ in range(30):
+        orders = [BookOrder(rng.randint(90, 110), seq, rng.randint(1, 50)) for seq in range(rng.randint(0, 40))]
+        for is_bids in (False, True):
+            levels = _book_of(market_state, orders, is_bids).price_levels()
+            limit_price_lots = rng.randint(85, 115)
+            quantities = [rng.randint(0, 600) for _ in range(20)]
+            fee_rate_bps = rng.choice([0, 4, 22, Fraction(45, 2)])
+            fee_rate = Fraction(fee_rate_bps) / 10000
+            for quantity in quantities:
+                fill = levels.simulate_taker_lots(limit_price_lots, quantity, fee_rate_bps)
+                expected = _reference_fill(orders, is_bids, limit_price_lots, quantity, fee_rate)
+                assert (fill.size_lots, fill.quote_size_lots, fill.native_fee) == expected
+                assert fill.leftover_lots == quantity - fill.size_lots
+
+
+def test_simulate_taker_array(market_state: State):
+    np = pytest.importorskip("numpy")
+    rng = random.Random(11)
+    orders = [BookOrder(rng.randint(90, 110), seq, rng.randint(1, 50)) for seq in range(30)]
+    for is_bids in (False, True):
+        levels = _book_of(market_state, orders, is_bids).price_levels()
+        quantities = np.array([0.0, 0.0001, 0.0029, 0.01, 0.05, 1.0])
+        for limit_price in (8.0, 9.55, 10.0, 12.0):
+            columns = levels.simulate_taker_array(limit_price, quantities, fee_rate_bps=22)
+            fills = [levels.simulate_taker(limit_price, quantity, fee_rate_bps=22) for quantity in quantities]
+            assert columns.size_lots.tolist() == [f.size_lots for f in fills]
+            assert columns.quote_size_lots.tolist() == [f.quote_size_lots for f in fills]
+            assert columns.native_fee.tolist() == [f.native_fee for f in fills]
+            assert columns.leftover_lots.tolist() == [f.leftover_lots for f in fills]
+            assert columns.size.tolist() == [f.size for f in fills]
+            assert columns.fee.tolist() == pytest.approx([f.fee for f in fills])
+            expected_prices = [np.nan if f.average_price is None else f.average_price for f in fills]
+            assert columns.average_price.tolist() == pytest.approx(expected_prices, nan_ok=True)
@@ -1,8 +1,21 @@
 import base64
 
-from pyserum.market._internal.queue import decode_event_queue
+from solana.publickey import PublicKey
+
+from pyserum._layouts.queue import EVENT_LAYOUT, QUEUE_HEADER_LAYOUT
+from pyserum.market import EventQueueCursor
+from pyserum.market._internal.queue import (
+    decode_event_queue,
+    decode_event_queue_header,
+    decode_recent_events,
+    decode_request_queue,
+    event_queue_alloc_len,
+    recent_event_slices,
+)
+from pyserum.market.types import EventFlags, ReuqestFlags
 
 from .binary_file_path import EVENT_QUEUE_BIN_PATH
+from .fake_rpc import request_queue_data
 
 
 def test_decode_event_queue():
@@ -22,3 +35,120 @@ def test_decode_event_queue():
         assert event.open_order_slot == 17
         assert event.fee_tier == 0
         assert event.native_fee_or_rebate == 0
+
+
+def _event_queue_data() -> bytes:
+    with open(EVENT_QUEUE_BIN_PATH, "r") as input_file:
+        return base64.decodebytes(input_file.read().encode("ascii"))
+
+
+def _with_header(data: bytes, **kwargs) -> bytes:
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    header.update(kwargs)
+    return QUEUE_HEADER_LAYOUT.build(header) + data[QUEUE_HEADER_LAYOUT.sizeof() :]  # noqa: E203
+
+
+def test_event_queue_cursor_reads_new_events():
+    data = _event_queue_data()
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    cursor = EventQueueCursor(header.next_seq_num - 5)
+    update = cursor.poll(data)
+    assert update.missed == 0
+    assert update.seq_num == header.next_seq_num - 5
+    assert update.events == decode_event_queue(data, 5)[::-1]
+    assert cursor.seq_num == header.next_seq_num
+    assert cursor.poll(data).events == []
+    # Three more events were pushed.
+    newer = _with_header(data, count=header.count + 3, next_seq_num=header.next_seq_num + 3)
+    update = cursor.poll(newer)
+    assert update.seq_num == header.next_seq_num
+    assert update.events == decode_event_queue(newer, 3)[::-1]
+
+
+def test_event_queue_cursor_defaults_to_unconsumed_events():
+    data = _event_queue_data()
+    assert EventQueueCursor().poll(data).events == decode_event_queue(data)
+
+
+def test_event_queue_cursor_wraps_around_the_ring():
+    data = _event_queue_data()
+    alloc_len = (len(data) - QUEUE_HEADER_LAYOUT.sizeof()) // EVENT_LAYOUT.sizeof()
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    wrapped = _with_header(data, head=alloc_len - 2, count=4)
+    update = EventQueueCursor(header.next_seq_num - 10).poll(wrapped)
+    assert len(update.events) == 10
+    assert update.events == decode_event_queue(wrapped, 10)[::-1]
+
+
+def test_event_queue_cursor_reports_missed_events():
+    data = _event_queue_data()
+    alloc_len = (len(data) - QUEUE_HEADER_LAYOUT.sizeof()) // EVENT_LAYOUT.sizeof()
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    update = EventQueueCursor(header.next_seq_num - alloc_len - 7).poll(data)
+    assert update.missed == 7
+    assert len(update.events) == alloc_len
+    assert update.seq_num == header.next_seq_num - alloc_len
+
+
+def test_event_queue_cursor_ignores_stale_queue():
+    data = _event_queue_data()
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    cursor = EventQueueCursor(header.next_seq_num + 2)
+    assert cursor.poll(data).events == []
+    assert cursor.seq_num == header.next_seq_num + 2
+
+
+def test_recent_event_slices_match_decode_event_queue():
+    data = _event_queue_data()
+    alloc_len = event_queue_alloc_len(len(data))
+    for head in (100, alloc_len - 2):
+        wrapped = _with_header(data, head=head, count=4)
+        header = decode_event_queue_header(wrapped[: QUEUE_HEADER_LAYOUT.sizeof()])
+        slices = recent_event_slices(header, alloc_len, 10)
+        assert len(slices) == (1 if head == 100 else 2)
+        datas = [wrapped[offset : offset + length] for offset, length in slices]  # noqa: E203
+        assert decode_recent_events(header, header, alloc_len, datas) == decode_event_queue(wrapped, 10)
+
+
+def test_recent_events_pushed_over_are_dropped():
+    data = _event_queue_data()
+    alloc_len = event_queue_alloc_len(len(data))
+    header = decode_event_queue_header(data)
+    slices = recent_event_slices(header, alloc_len, 10)
+    datas = [data[offset : offset + length] for offset, length in slices]  # noqa: E203
+    later = decode_event_queue_header(_with_header(data, next_seq_num=header.next_seq_num + alloc_len - 10))
+    assert decode_recent_events(header, later, alloc_len, datas) is not None
+    later = decode_event_queue_header(_with_header(data, next_seq_num=header.next_seq_num + alloc_len - 9))
+    assert decode_recent_events(header, later, alloc_len, datas) is None
+
+
+def test_decode_event_queue_matches_construct_layout():
+    data = _event_queue_data()
+    header = QUEUE_HEADER_LAYOUT.parse(data)
+    alloc_len = (len(data) - QUEUE_HEADER_LAYOUT.sizeof()) // EVENT_LAYOUT.sizeof()
+    for i, event in enumerate(decode_event_queue(data, 50)):
+        index = (header.head + header.count + alloc_len - 1 - i) % alloc_len
+        offset = QUEUE_HEADER_LAYOUT.sizeof() + index * EVENT_LAYOUT.sizeof()
+        parsed = EVENT_LAYOUT.parse(data[offset : offset + EVENT_LAYOUT.sizeof()])  # noqa: E203
+        assert event.event_flags == EventFlags(**{k: v for k, v in parsed.event_flags.items() if k != "_io"})
+        assert event.native_quantity_released == parsed.native_quantity_released
+        assert event.native_quantity_paid == parsed.native_quantity_paid
+        assert event.native_fee_or_rebate == parsed.native_fee_or_rebate
+        assert event.order_id == int.from_bytes(parsed.order_id, "little")
+        assert bytes(event.public_key) == parsed.public_key
+        assert event.client_order_id == parsed.client_order_id
+
+
+def test_decode_request_queue():
+    requests = decode_request_queue(request_queue_data())
+    # The ring holds 5 requests, head is 3 and count is 4 so the queue wraps around.
+    assert [r.open_order_slot for r in requests] == [3, 4, 0, 1]
+    assert requests[3].request_flags == ReuqestFlags(
+        new_order=False, cancel_order=True, bid=True, post_only=True, ioc=False
+    )
+    assert requests[1].request_flags.ioc
+    assert requests[0].order_id == (3 << 64) | (2 ** 64 - 4)
+    assert requests[0].open_orders == PublicKey(bytes([3]) * 32)
+    assert requests[0].max_base_size_or_cancel_id == 103
+    assert requests[0].native_quote_quantity_locked == 3000
+    assert requests[0].client_order_id == 21
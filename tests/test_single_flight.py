@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from solana.rpc.api import Client
+
+from pyserum.async_open_orders_account import AsyncOpenOrdersAccount
+from pyserum.market import AsyncMarket, Market, State
+from pyserum.open_orders_account import OpenOrdersAccount
+from pyserum.single_flight import SingleFlight
+
+from .fake_rpc import OPEN_ORDERS_ADDRESS, FakeAsyncClient, FakeRpc, market_accounts
+
+
+@pytest.fixture(name="fake_rpc")
+def fixture_fake_rpc():
+    fake = FakeRpc(market_accounts(), slot=1234, latency=0.05)
+    yield fake
+    fake.close()
+
+
+def test_threads_share_one_request_and_one_decode(fake_rpc: FakeRpc, recorded_state: State):
+    single_flight = SingleFlight()
+    market = Market(Client(fake_rpc.endpoint), recorded_state, single_flight=single_flight)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        books = list(executor.map(lambda _: market.load_bids(), range(8)))
+    assert fake_rpc.methods() == ["getAccountInfo"]
+    assert all(book is books[0] for book in books)
+    stats = single_flight.stats()
+    # Every call goes through the decoded layer, only the leader reaches the raw data layer.
+    assert (stats.calls, stats.coalesced, stats.in_flight) == (9, 7, 0)
+
+    # Nothing is kept once the calls returned.
+    market.load_bids()
+    assert fake_rpc.methods() == ["getAccountInfo"] * 2
+
+
+def test_different_decodings_share_the_request(fake_rpc: FakeRpc, recorded_state: State):
+    market = Market(Client(fake_rpc.endpoint), recorded_state, single_flight=SingleFlight())
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        eager, lazy = executor.map(market.load_asks, (False, True))
+    assert fake_rpc.methods() == ["getAccountInfo"]
+    assert eager is not lazy and list(eager) == list(lazy)
+
+
+def test_waiters_get_the_exception():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait()
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(single_flight.run, "key", fail)
+        started.wait()
+        waiters = [executor.submit(single_flight.run, "key", fail) for _ in range(2)]
+        while single_flight.stats().coalesced < 2:
+            pass
+        release.set()
+        for future in [leader] + waiters:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+    assert single_flight.stats().in_flight == 0
+
+
+def test_tasks_share_one_request(fake_rpc: FakeRpc, recorded_state: State):
+    single_flight = SingleFlight()
+    conn = FakeAsyncClient(fake_rpc, latency=0.05)
+    market = AsyncMarket(conn, recorded_state, single_flight=single_flight)
+
+    async def load():
+        return await asyncio.gather(
+            *(market.load_event_queue() for _ in range(4)),
+            *(AsyncOpenOrdersAccount.load(conn, str(OPEN_ORDERS_ADDRESS), single_flight) for _ in range(3)),
+        )
+
+    results = asyncio.run(load())
+    assert fake_rpc.methods() == ["getAccountInfo"] * 2
+    assert all(events is results[0] for events in results[:4])
+    assert all(account is results[4] for account in results[4:])
+    assert single_flight.stats().coalesced == 3 + 2
+    sync_account = OpenOrdersAccount.load(Client(fake_rpc.endpoint), str(OPEN_ORDERS_ADDRESS), single_flight)
+    assert sync_account.address == results[4].address
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    single_flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight.run_async("key", slow))
+        waiter = asyncio.ensure_future(single_flight.run_async("key", slow))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await leader
+
+    assert asyncio.run(run()) == 42
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter():
+    single_flight = SingleFlight()
+    loads = []
+
+    async def slow():
+        loads.append(None)
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight.run_async("key", slow))
+        waiters = [asyncio.ensure_future(single_flight.run_async("key", slow)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return leader, await asyncio.gather(*waiters)
+
+    leader, values = asyncio.run(run())
+    assert leader.cancelled()
+    assert values == [42, 42]
+    # The first waiter makes the call again, the second one waits for it.
+    assert len(loads) == 2
+    stats = single_flight.stats()
+    assert (stats.calls, stats.coalesced, stats.in_flight) == (3, 1, 0)
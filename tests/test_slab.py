@@ -57,6 +57,18 @@ def test_parse_slab():
     assert slab.nodes[1].node.quantity == 321
 
 
+def test_slab_from_bytes_matches_construct_parse():
+    """The struct based decoder should produce the same nodes as the construct layout."""
+    with open(ASK_ORDER_BIN_PATH, "r") as input_file:
+        base64_res = input_file.read()
+        data = base64.decodebytes(base64_res.encode("ascii"))
+    for slab_data in (DATA, data[13:]):
+        slab = Slab.from_bytes(slab_data)
+        expected = Slab.from_container(SLAB_LAYOUT.parse(slab_data))
+        assert slab._header == expected._header  # pylint: disable=protected-access
+        assert slab._nodes == expected._nodes  # pylint: disable=protected-access
+
+
 def test_slab_get():
     slab = Slab.from_bytes(DATA)
     assert slab.get(123456789012345678901234567890).owner_slot == 1
@@ -97,3 +109,21 @@ def test_iterate_in_descending_order():
         if prev:
             assert curr_key < prev
         prev = curr_key
+
+
+def test_lazy_slab_matches_eager_slab():
+    eager = Slab.from_bytes(DATA)
+    lazy = Slab.from_bytes(DATA, lazy=True)
+    assert list(lazy.items()) == list(eager.items())
+    assert list(lazy.items(descending=True)) == list(eager.items(descending=True))
+    for key in (123456789012345678901234567890, 4, 5, 0):
+        assert lazy.get(key) == eager.get(key)
+
+
+def test_lazy_slab_only_decodes_visited_nodes():
+    with open(ASK_ORDER_BIN_PATH, "r") as input_file:
+        data = base64.decodebytes(input_file.read().encode("ascii"))
+    slab = Slab.from_bytes(data[13:], lazy=True)
+    best = next(iter(slab.items()))
+    assert best == next(iter(Slab.from_bytes(data[13:]).items()))
+    assert slab._nodes.decoded_count() < 15  # pylint: disable=protected-access
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from solana.publickey import PublicKey
+from solana.rpc.types import RPCMethod
+
+from pyserum.transport import PooledHTTPProvider, TransportError
+from pyserum.utils import RPCError, load_bytes_data, parse_bytes_data
+
+from .fake_rpc import FakeRpc
+
+ADDRESS = PublicKey(1)
+
+
+@pytest.fixture(name="fakes")
+def fixture_fakes():
+    fakes = [FakeRpc({str(ADDRESS): b"data %d" % i}) for i in range(2)]
+    yield fakes
+    for fake in fakes:
+        fake.close()
+
+
+def _provider(fakes, **kwargs) -> PooledHTTPProvider:
+    kwargs.setdefault("backoff", 0.001)
+    return PooledHTTPProvider([fake.endpoint for fake in fakes], **kwargs)
+
+
+def test_connections_are_kept_alive(fakes):
+    provider = _provider(fakes[:1])
+    conn = provider.client()
+    for _ in range(5):
+        assert load_bytes_data(ADDRESS, conn) == b"data 0"
+    provider.close()
+    assert fakes[0].connections == 1
+    assert provider.stats()[0].requests == 5
+    assert provider.stats()[0].mean_latency is not None
+
+
+def test_retries_then_gives_up(fakes):
+    provider = _provider(fakes[:1], max_retries=2)
+    fakes[0].failures = 2
+    assert load_bytes_data(ADDRESS, provider.client()) == b"data 0"
+    stats = provider.stats()[0]
+    assert (stats.requests, stats.errors) == (3, 2)
+    assert "503" in stats.last_error
+
+    fakes[0].failures = 3
+    with pytest.raises(TransportError):
+        load_bytes_data(ADDRESS, provider.client())
+    provider.close()
+
+
+def test_client_errors_are_not_retried(fakes):
+    provider = _provider(fakes[:1])
+    fakes[0].failures, fakes[0].failure_status = 1, 400
+    with pytest.raises(RPCError) as exc_info:
+        load_bytes_data(ADDRESS, provider.client())
+    assert not isinstance(exc_info.value, TransportError)
+    assert provider.stats()[0].requests == 1
+    provider.close()
+
+
+def test_retry_goes_to_the_next_endpoint(fakes):
+    provider = _provider(fakes, max_retries=1)
+    fakes[0].failures = 1
+    assert load_bytes_data(ADDRESS, provider.client()) == b"data 1"
+    # The endpoint that failed is tried last until it answers again.
+    assert load_bytes_data(ADDRESS, provider.client()) == b"data 1"
+    assert [(s.requests, s.errors) for s in provider.stats()] == [(1, 1), (2, 0)]
+    provider.close()
+
+
+def test_hedged_reads_take_the_first_answer(fakes):
+    fakes[0].latency = 0.5
+    provider = _provider(fakes, hedge_after=0.02)
+    started = time.monotonic()
+    assert load_bytes_data(ADDRESS, provider.client()) == b"data 1"
+    assert time.monotonic() - started < 0.4
+    assert [s.hedges for s in provider.stats()] == [0, 1]
+    # The slow endpoint has no latency yet, the fast one is now preferred.
+    assert load_bytes_data(ADDRESS, provider.client()) == b"data 1"
+    assert provider.stats()[1].requests == 2
+    provider.close()
+
+
+def test_transactions_are_not_hedged(fakes):
+    fakes[0].latency = 0.1
+    provider = _provider(fakes, hedge_after=0.01)
+    response = provider.make_request(RPCMethod("sendTransaction"), "transaction", {"encoding": "base64"})
+    assert response["result"] == "signature1"
+    assert (len(fakes[0].transactions), len(fakes[1].transactions)) == (1, 0)
+    provider.close()
+
+
+def test_rpc_errors_raise_rpc_error(fakes):
+    provider = _provider(fakes[:1])
+    response = provider.make_request(RPCMethod("getUnknown"))
+    with pytest.raises(RPCError, match="Method not found") as exc_info:
+        parse_bytes_data(response)
+    assert exc_info.value.response is response
+    provider.close()
@@ -0,0 +1,76 @@
+from fractions import Fraction
+
+import pytest
+from solana.rpc.api import Client
+
+from pyserum.instructions import DEFAULT_DEX_PROGRAM_ID
+from pyserum.market import Market, OrderBook, State, TwoSidedBook
+
+from .fake_rpc import KEYS, FakeRpc, market_accounts
+from .order_book_data import BookOrder, order_book_data
+
+BIDS = [BookOrder(98, 1, 10), BookOrder(99, 2, 4), BookOrder(99, 3, 6), BookOrder(97, 4, 30)]
+ASKS = [BookOrder(101, 5, 5), BookOrder(102, 6, 20), BookOrder(101, 7, 15)]
+
+
+def _book(market_state: State, orders, is_bids: bool, lazy: bool = False) -> OrderBook:
+    return OrderBook.from_bytes(market_state, order_book_data(orders, is_bids), lazy)
+
+
+def test_best_order_is_a_single_descent(market_state: State):
+    for orders, is_bids in ((BIDS, True), (ASKS, False), ([], True)):
+        book = _book(market_state, orders, is_bids, lazy=True)
+        best = book.best_order()
+        expected = next(iter(sorted(orders, key=lambda o, is_bids=is_bids: o.key(is_bids), reverse=is_bids)), None)
+        if expected is None:
+            assert best is None and book.best_price_lots() is None
+            continue
+        assert best.order_id == expected.key(is_bids)
+        assert book.best_price_lots() == expected.price_lots
+        # Only the nodes on the path from the root to the best leaf were decoded, a full walk decodes 2n - 1 nodes.
+        assert book._slab._nodes.decoded_count() <= len(orders)  # pylint: disable=protected-access
+
+
+def test_top_of_book(market_state: State):
+    book = TwoSidedBook(market_state, _book(market_state, BIDS, True), _book(market_state, ASKS, False), slot=5)
+    assert (book.best_bid_price_lots(), book.best_ask_price_lots()) == (99, 101)
+    assert book.best_bid().size_lots == 10
+    assert book.best_ask().size_lots == 20
+    assert book.spread_lots() == 2
+    assert book.spread() == pytest.approx(0.2)
+    assert book.mid_price_lots() == 100
+    assert book.mid_price() == pytest.approx(10.0)
+    assert book.microprice_lots() == Fraction(99 * 20 + 101 * 10, 30)
+    assert book.microprice_lots(2) == Fraction(99 * 40 + 101 * 20, 60)
+    assert book.microprice() == pytest.approx(float(Fraction(99 * 20 + 101 * 10, 300)))
+    assert book.imbalance() == pytest.approx(-1 / 3)
+    assert book.imbalance(3) == pytest.approx((50 - 40) / 90)
+    assert book.levels(2) is book.levels(2)
+
+
+def test_update_drops_cached_results(market_state: State):
+    book = TwoSidedBook(market_state, _book(market_state, BIDS, True), _book(market_state, ASKS, False))
+    assert book.spread_lots() == 2
+    book.update(asks=_book(market_state, [BookOrder(100, 8, 1)], False), slot=6)
+    assert (book.spread_lots(), book.slot, book.best_ask().size_lots) == (1, 6, 1)
+    book.update(bids=_book(market_state, [], True))
+    assert book.spread_lots() is None and book.mid_price() is None and book.microprice() is None
+    assert book.imbalance() == -1  # only asks are left
+    with pytest.raises(ValueError):
+        book.update(bids=_book(market_state, ASKS, False))
+    with pytest.raises(ValueError):
+        TwoSidedBook(market_state, _book(market_state, ASKS, False), _book(market_state, ASKS, False))
+
+
+def test_load_two_sided_book_uses_one_request():
+    fake = FakeRpc(market_accounts(), slot=77)
+    try:
+        state = State.from_bytes(DEFAULT_DEX_PROGRAM_ID, 6, 6, fake.accounts[str(KEYS["own_address"])])
+        market = Market(Client(fake.endpoint), state)
+        book = market.load_two_sided_book()
+        assert fake.methods() == ["getMultipleAccounts"]
+        assert book.slot == 77
+        assert book.best_ask() == market.load_asks().get_l2(1)[0]
+        assert book.best_bid() == market.load_bids().get_l2(1)[0]
+    finally:
+        fake.close()